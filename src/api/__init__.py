@@ -6,6 +6,7 @@ from api.resumes import resumes_bp
 from api.jobs import jobs_bp
 from api.match import match_bp
 from api.admin import admin_bp
+from api.search import search_bp
 
 # Create main API blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -16,3 +17,4 @@ api_bp.register_blueprint(resumes_bp)
 api_bp.register_blueprint(jobs_bp)
 api_bp.register_blueprint(match_bp)
 api_bp.register_blueprint(admin_bp)
+api_bp.register_blueprint(search_bp)
@@ -1,9 +1,10 @@
 """Admin API endpoints for backend management."""
 
 import os
-from flask import Blueprint, request, jsonify, render_template_string
+from flask import Blueprint, request, jsonify, render_template_string, current_app
 from models import db, User, Resume, JobPosting, MatchResult
 from api.auth import require_auth
+from services.file_store import release_resume_file, remove_file
 from datetime import datetime, timedelta
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -253,14 +254,15 @@ def delete_resume_admin(resume_id):
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
         
-        # Delete file from filesystem
-        import os
-        if os.path.exists(resume.filepath):
-            os.remove(resume.filepath)
+        # Release the stored file; removed from disk after the commit once no resume references it
+        released_path = release_resume_file(resume)
         
         # Delete from database
+        user_id = resume.user_id
         db.session.delete(resume)
         db.session.commit()
+        remove_file(released_path)
+        current_app.extensions['resume_index'].remove_resume(user_id, resume_id)
         
         return jsonify({'message': 'Resume deleted successfully'}), 200
     except Exception as e:
@@ -278,6 +280,7 @@ def delete_job_admin(job_id):
         # Delete from database
         db.session.delete(job)
         db.session.commit()
+        current_app.extensions['job_index'].remove(job_id)
         
         return jsonify({'message': 'Job posting deleted successfully'}), 200
     except Exception as e:
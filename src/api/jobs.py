@@ -1,13 +1,126 @@
 """Job parsing API endpoints."""
 
 from flask import Blueprint, request, jsonify
-from models import db, JobPosting
-from services.scraper import scrape_job_posting
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import db, JobPosting, FetchMetadata, Resume, MAX_URL_LENGTH
+from services.scraper import scrape_job_posting, scrape_job_postings
+from services.job_features import ensure_job_features, read_job_signature
+from services.near_duplicates import MIN_THRESHOLD, find_similar_jobs
+from services.singleflight import SingleFlight
+from services.urls import canonicalize_url
 from sockets.events import emit_parse_started, emit_parse_finished
 from api.auth import require_auth
 
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
 
+# Concurrent parses of the same canonical URL share one in-flight scrape
+scrape_flight = SingleFlight()
+
+def is_fresh(job_posting, fetch_meta, max_age):
+    """Check if a stored job posting was fetched within the freshness window."""
+    fetched_at = fetch_meta.fetched_at if fetch_meta else job_posting.created_at
+    return fetched_at is not None and datetime.utcnow() - fetched_at < timedelta(seconds=max_age)
+
+def store_job_data(url, job_data, existing_job=None, fetch_meta=None):
+    """
+    Upsert scraped job data and its fetch metadata into the session (caller commits).
+    
+    `existing_job` and `fetch_meta` are the rows stored under the URL's
+    canonical form; an existing posting keeps the URL it was first parsed from.
+    """
+    if existing_job:
+        # Update existing job
+        existing_job.title = job_data['title']
+        existing_job.company = job_data['company']
+        existing_job.description = job_data['description']
+        existing_job.skills = job_data['skills']
+        existing_job.requirements = job_data['requirements']
+        job_posting = existing_job
+    else:
+        # Create new job posting
+        job_posting = JobPosting(
+            url=url,
+            title=job_data['title'],
+            company=job_data['company'],
+            description=job_data['description'],
+            skills=job_data['skills'],
+            requirements=job_data['requirements']
+        )
+        db.session.add(job_posting)
+    
+    # Build scoring features now so matches don't re-derive them per candidate
+    ensure_job_features(job_posting)
+    
+    # Record fetch time and validators for freshness checks and conditional re-parses
+    if not fetch_meta:
+        fetch_meta = FetchMetadata(url=canonicalize_url(url))
+        db.session.add(fetch_meta)
+    fetch_meta.etag = job_data['etag']
+    fetch_meta.last_modified = job_data['last_modified']
+    fetch_meta.fetched_at = datetime.utcnow()
+    
+    return job_posting
+
+def store_job_data_fresh(url, job_data):
+    """
+    Upsert job data against the rows currently stored under the URL's canonical form.
+    
+    Used to retry after another request stored the same canonical URL first.
+    The caller commits.
+    """
+    canonical_url = canonicalize_url(url)
+    return store_job_data(
+        url,
+        job_data,
+        JobPosting.query.filter_by(canonical_url=canonical_url).first(),
+        FetchMetadata.query.filter_by(url=canonical_url).first()
+    )
+
+def scrape_and_store_job(url):
+    """
+    Scrape a job posting URL and upsert it into the database.
+    
+    Known URLs, in any variant with the same canonical form, are re-fetched
+    conditionally using stored ETag/Last-Modified values.
+    
+    Returns:
+        Tuple of (job posting id, not_modified)
+    """
+    try:
+        canonical_url = canonicalize_url(url)
+        existing_job = JobPosting.query.filter_by(canonical_url=canonical_url).first()
+        fetch_meta = FetchMetadata.query.filter_by(url=canonical_url).first()
+        validators = fetch_meta if existing_job and fetch_meta else None
+        
+        # Scrape the job posting
+        job_data = scrape_job_posting(
+            url,
+            etag=validators.etag if validators else None,
+            last_modified=validators.last_modified if validators else None
+        )
+        
+        if job_data is None:
+            # 304 Not Modified: the stored posting is current, skip parsing and writes
+            return existing_job.id, True
+        
+        job_posting = store_job_data(url, job_data, existing_job, fetch_meta)
+        
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent bulk parse stored this canonical URL first; update its row instead
+            db.session.rollback()
+            job_posting = store_job_data_fresh(url, job_data)
+            db.session.commit()
+        
+        from flask import current_app
+        current_app.extensions['job_index'].upsert(job_posting)
+        return job_posting.id, False
+    except Exception:
+        db.session.rollback()
+        raise
+
 @jobs_bp.route('/parse', methods=['POST'])
 @require_auth
 def parse_job():
@@ -23,46 +136,47 @@ def parse_job():
         if not url:
             return jsonify({'error': 'URL is required'}), 400
         
+        force = data.get('force') in (True, 'true', '1', 1) or request.args.get('force', '').lower() == 'true'
+        canonical_url = canonicalize_url(url)
+        if len(url) > MAX_URL_LENGTH or len(canonical_url) > MAX_URL_LENGTH:
+            return jsonify({'error': f'URL is longer than {MAX_URL_LENGTH} characters'}), 400
+        
         # Emit parse started event
         from flask import current_app
         socketio = current_app.extensions['socketio']
         emit_parse_started(socketio, request.user_id, url)
         
         try:
-            # Scrape the job posting
-            job_data = scrape_job_posting(url)
+            # Serve recently parsed postings without scraping again
+            if not force:
+                existing_job = JobPosting.query.filter_by(canonical_url=canonical_url).first()
+                if existing_job:
+                    fetch_meta = FetchMetadata.query.filter_by(url=canonical_url).first()
+                    if is_fresh(existing_job, fetch_meta, current_app.config['JOB_FRESHNESS_SECONDS']):
+                        emit_parse_finished(socketio, request.user_id, existing_job.to_dict(), success=True)
+                        
+                        return jsonify({
+                            'message': 'Job posting is up to date',
+                            'job_posting': existing_job.to_dict(),
+                            'cached': True
+                        }), 200
             
-            # Check if job already exists
-            existing_job = JobPosting.query.filter_by(url=url).first()
-            if existing_job:
-                # Update existing job
-                existing_job.title = job_data['title']
-                existing_job.company = job_data['company']
-                existing_job.description = job_data['description']
-                existing_job.skills = job_data['skills']
-                existing_job.requirements = job_data['requirements']
-                job_posting = existing_job
-            else:
-                # Create new job posting
-                job_posting = JobPosting(
-                    url=url,
-                    title=job_data['title'],
-                    company=job_data['company'],
-                    description=job_data['description'],
-                    skills=job_data['skills'],
-                    requirements=job_data['requirements']
-                )
-                db.session.add(job_posting)
-            
-            db.session.commit()
+            (job_id, not_modified), shared = scrape_flight.do(canonical_url, lambda: scrape_and_store_job(url))
+            job_posting = JobPosting.query.get(job_id)
             
             # Emit parse finished event
             emit_parse_finished(socketio, request.user_id, job_posting.to_dict(), success=True)
             
-            return jsonify({
-                'message': 'Job posting parsed successfully',
+            response_data = {
+                'message': 'Job posting not modified' if not_modified else 'Job posting parsed successfully',
                 'job_posting': job_posting.to_dict()
-            }), 200
+            }
+            if not_modified:
+                response_data['not_modified'] = True
+            if shared:
+                response_data['shared'] = True
+            
+            return jsonify(response_data), 200
             
         except Exception as scrape_error:
             db.session.rollback()
@@ -73,6 +187,159 @@ def parse_job():
     except Exception as e:
         return jsonify({'error': 'Failed to parse job posting', 'detail': str(e)}), 500
 
+@jobs_bp.route('/parse/bulk', methods=['POST'])
+@require_auth
+def parse_jobs_bulk():
+    """Parse many job postings from URLs with bounded concurrent scraping."""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        urls = data.get('urls')
+        
+        if not isinstance(urls, list) or not urls:
+            return jsonify({'error': 'urls is required'}), 400
+        
+        # Drop blanks and URLs with the same canonical form, keeping the first in request order
+        canonical_urls = {}
+        for url in (str(url).strip() for url in urls):
+            if url:
+                canonical_urls.setdefault(canonicalize_url(url), url)
+        urls = list(canonical_urls.values())
+        canonical_urls = list(canonical_urls)
+        
+        from flask import current_app
+        config = current_app.config
+        
+        if len(urls) > config['JOB_BULK_MAX_URLS']:
+            return jsonify({'error': f"At most {config['JOB_BULK_MAX_URLS']} URLs can be parsed at once"}), 400
+        
+        force = data.get('force') in (True, 'true', '1', 1) or request.args.get('force', '').lower() == 'true'
+        socketio = current_app.extensions['socketio']
+        job_index = current_app.extensions['job_index']
+        user_id = request.user_id
+        
+        # Load everything already stored for these URLs up front
+        existing_jobs = {
+            job.canonical_url: job for job in JobPosting.query.filter(JobPosting.canonical_url.in_(canonical_urls)).all()
+        }
+        fetch_metas = {meta.url: meta for meta in FetchMetadata.query.filter(FetchMetadata.url.in_(canonical_urls)).all()}
+        
+        results = [None] * len(urls)
+        fetches = []
+        
+        for index, url in enumerate(urls):
+            if len(url) > MAX_URL_LENGTH or len(canonical_urls[index]) > MAX_URL_LENGTH:
+                error = f'URL is longer than {MAX_URL_LENGTH} characters'
+                results[index] = {'url': url, 'status': 'failed', 'error': error}
+                emit_parse_finished(socketio, user_id, None, success=False, error=error)
+                continue
+            
+            existing_job = existing_jobs.get(canonical_urls[index])
+            fetch_meta = fetch_metas.get(canonical_urls[index])
+            
+            if existing_job and not force and is_fresh(existing_job, fetch_meta, config['JOB_FRESHNESS_SECONDS']):
+                job_dict = existing_job.to_dict()
+                results[index] = {'url': url, 'status': 'cached', 'job_posting': job_dict}
+                emit_parse_started(socketio, user_id, url)
+                emit_parse_finished(socketio, user_id, job_dict, success=True)
+                continue
+            
+            validators = fetch_meta if existing_job and fetch_meta else None
+            fetches.append({
+                'index': index,
+                'url': url,
+                'etag': validators.etag if validators else None,
+                'last_modified': validators.last_modified if validators else None
+            })
+        
+        pending = []
+        
+        def report_failed(index, error):
+            results[index] = {'url': urls[index], 'status': 'failed', 'error': str(error)}
+            emit_parse_finished(socketio, user_id, None, success=False, error=str(error))
+        
+        def report_stored(index, job_posting):
+            job_index.upsert(job_posting)
+            job_dict = job_posting.to_dict()
+            results[index] = {'url': urls[index], 'status': 'scraped', 'job_posting': job_dict}
+            emit_parse_finished(socketio, user_id, job_dict, success=True)
+        
+        def flush():
+            """Upsert scraped postings in one commit and report them."""
+            if not pending:
+                return
+            try:
+                stored = [
+                    (index, store_job_data(urls[index], job_data, existing_jobs.get(canonical_urls[index]),
+                                           fetch_metas.get(canonical_urls[index])))
+                    for index, job_data in pending
+                ]
+                db.session.commit()
+            except IntegrityError:
+                # Another request stored some of these canonical URLs first; retry row by
+                # row against the current rows so one conflict doesn't fail the batch
+                db.session.rollback()
+                for index, job_data in pending:
+                    try:
+                        job_posting = store_job_data_fresh(urls[index], job_data)
+                        db.session.commit()
+                    except Exception as row_error:
+                        db.session.rollback()
+                        report_failed(index, row_error)
+                    else:
+                        report_stored(index, job_posting)
+            except Exception as commit_error:
+                db.session.rollback()
+                for index, _ in pending:
+                    report_failed(index, commit_error)
+            else:
+                for index, job_posting in stored:
+                    report_stored(index, job_posting)
+            pending.clear()
+        
+        completed = scrape_job_postings(
+            fetches,
+            max_workers=config['JOB_BULK_CONCURRENCY'],
+            per_host=config['JOB_BULK_PER_HOST'],
+            on_start=lambda url: emit_parse_started(socketio, user_id, url)
+        )
+        
+        for position, job_data, error in completed:
+            index = fetches[position]['index']
+            url = urls[index]
+            
+            if error is not None:
+                results[index] = {'url': url, 'status': 'failed', 'error': str(error)}
+                emit_parse_finished(socketio, user_id, None, success=False, error=str(error))
+            elif job_data is None:
+                # 304 Not Modified
+                job_dict = existing_jobs[canonical_urls[index]].to_dict()
+                results[index] = {'url': url, 'status': 'not_modified', 'job_posting': job_dict}
+                emit_parse_finished(socketio, user_id, job_dict, success=True)
+            else:
+                pending.append((index, job_data))
+                if len(pending) >= config['JOB_BULK_COMMIT_SIZE']:
+                    flush()
+        
+        flush()
+        
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        
+        return jsonify({
+            'message': f'Bulk parsing completed for {len(urls)} URLs',
+            'results': results,
+            'summary': summary
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to parse job postings', 'detail': str(e)}), 500
+
 @jobs_bp.route('', methods=['GET'])
 @require_auth
 def list_jobs():
@@ -104,6 +371,71 @@ def get_job(job_id):
     except Exception as e:
         return jsonify({'error': 'Failed to fetch job posting', 'detail': str(e)}), 500
 
+@jobs_bp.route('/<int:job_id>/top-resumes', methods=['GET'])
+@require_auth
+def get_top_resumes(job_id):
+    """Rank the user's resumes for a job posting with the BM25 resume index."""
+    try:
+        k = request.args.get('k', 10, type=int)
+        if k is None or not 1 <= k <= 100:
+            return jsonify({'error': 'k must be an integer between 1 and 100'}), 400
+        
+        job = JobPosting.query.get(job_id)
+        
+        if not job:
+            return jsonify({'error': 'Job posting not found'}), 404
+        
+        from flask import current_app
+        resume_index = current_app.extensions['resume_index']
+        query_text = ' '.join([job.title or '', job.description or ''] + job.skills + job.requirements)
+        ranked = resume_index.top_resumes(request.user_id, query_text, k)
+        
+        resumes = {resume.id: resume for resume in Resume.query.filter(Resume.id.in_([resume_id for resume_id, _ in ranked])).all()}
+        
+        return jsonify({
+            'job_posting_id': job.id,
+            'results': [
+                {'resume_id': resume_id, 'filename': resumes[resume_id].filename, 'score': round(score, 4)}
+                for resume_id, score in ranked if resume_id in resumes
+            ],
+            'indexed': len(resume_index.get(request.user_id))
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to rank resumes', 'detail': str(e)}), 500
+
+@jobs_bp.route('/<int:job_id>/duplicates', methods=['GET'])
+@require_auth
+def get_job_duplicates(job_id):
+    """Find job postings whose title, description, skills and requirements nearly duplicate this one's."""
+    try:
+        from flask import current_app
+        threshold = request.args.get('threshold', current_app.config['NEAR_DUPLICATE_THRESHOLD'], type=float)
+        if threshold is None or not MIN_THRESHOLD <= threshold <= 1:
+            return jsonify({'error': f'threshold must be a number between {MIN_THRESHOLD} and 1'}), 400
+        
+        job = JobPosting.query.get(job_id)
+        
+        if not job:
+            return jsonify({'error': 'Job posting not found'}), 404
+        
+        # Read only: signatures are stored when postings are parsed and backfilled at startup
+        similar = find_similar_jobs(job, read_job_signature(job), threshold)
+        jobs = {other.id: other for other in JobPosting.query.filter(JobPosting.id.in_([other_id for other_id, _ in similar])).all()}
+        
+        return jsonify({
+            'job_posting_id': job.id,
+            'threshold': threshold,
+            'duplicates': [
+                {'job_posting': jobs[other_id].to_dict(), 'similarity': round(similarity, 3)}
+                for other_id, similarity in similar if other_id in jobs
+            ]
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to find duplicate job postings', 'detail': str(e)}), 500
+
 @jobs_bp.route('/<int:job_id>', methods=['DELETE'])
 @require_auth
 def delete_job(job_id):
@@ -118,6 +450,9 @@ def delete_job(job_id):
         db.session.delete(job)
         db.session.commit()
         
+        from flask import current_app
+        current_app.extensions['job_index'].remove(job_id)
+        
         return jsonify({'message': 'Job posting deleted successfully'}), 200
         
     except Exception as e:
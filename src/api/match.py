@@ -1,8 +1,16 @@
 """Resume matching API endpoints."""
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from models import db, Resume, JobPosting, MatchResult
-from services.llm import suggest_resume_additions
+from services.llm import suggest_resume_additions, get_model_name, PROMPT_VERSION
+from services.match_cache import compute_cache_key, get_cached_match, store_cached_match, evict_entries
+from services.ranking import prefilter_candidates
+from services.job_features import load_job_features
+from services.near_duplicates import find_reusable_match
+from services.resume_features import compute_resume_features, ensure_resume_features, load_resume_features
+from services.match_jobs import MatchQueueFull
 from sockets.events import emit_match_finished
 from api.auth import require_auth
 
@@ -39,43 +47,40 @@ def match_resume():
             resume_text = resume.text
             if not resume_text:
                 return jsonify({'error': 'Resume text not available'}), 400
+            # Stored with the match result's commit if they had to be computed
+            resume_features = ensure_resume_features(resume)
+        else:
+            resume_features = compute_resume_features(resume_text)
         
         # Get job data
+        job_posting = None
         if job_posting_id:
             job_posting = JobPosting.query.get(job_posting_id)
             if not job_posting:
                 return jsonify({'error': 'Job posting not found'}), 404
             job_data = job_posting.to_dict()
+        job_features = load_job_features(job_posting, job_data)
         
-        # Emit match started event
         from flask import current_app
         socketio = current_app.extensions['socketio']
         
-        try:
-            # Perform matching using LLM
-            match_result = suggest_resume_additions(resume_text, job_data)
-            
-            # Create match result record
-            match_record = MatchResult(
-                user_id=request.user_id,
-                resume_id=resume_id,
-                job_posting_id=job_posting_id,
-                score=match_result['score'],
-                missing_keywords=match_result['missing_keywords'],
-                suggestions=match_result['suggestions']
-            )
-            
-            db.session.add(match_record)
+        # Opt-in async mode: queue the match and return a job id immediately
+        if data.get('async'):
+            # The worker uses its own session, so store features computed above first
             db.session.commit()
-            
-            # Prepare response data
-            response_data = {
-                'id': match_record.id,
-                'score': match_record.score,
-                'missing_keywords': match_record.missing_keywords,
-                'suggestions': match_record.suggestions,
-                'created_at': match_record.created_at.isoformat()
-            }
+            return submit_match_job(
+                current_app._get_current_object(),
+                request.user_id,
+                resume_id,
+                job_posting_id,
+                resume_text,
+                job_data,
+                resume_features,
+                job_features
+            )
+        
+        try:
+            response_data = perform_match(request.user_id, resume_id, job_posting_id, resume_text, job_data, resume_features, job_features)
             
             # Emit match finished event
             emit_match_finished(socketio, request.user_id, response_data, success=True)
@@ -86,7 +91,6 @@ def match_resume():
             }), 200
             
         except Exception as match_error:
-            db.session.rollback()
             # Emit match finished event with error
             emit_match_finished(socketio, request.user_id, None, success=False, error=str(match_error))
             raise match_error
@@ -94,6 +98,150 @@ def match_resume():
     except Exception as e:
         return jsonify({'error': 'Failed to match resume', 'detail': str(e)}), 500
 
+def find_reused_match(user_id, resume_id, job_posting_id):
+    """
+    Find an earlier match of a near-duplicate resume/job pair whose result can be reused.
+    
+    Returns:
+        Tuple of (match result dict, reused_from payload) or None
+    """
+    from flask import current_app
+    config = current_app.config
+    if not config['MATCH_REUSE_ENABLED'] or not resume_id or not job_posting_id:
+        return None
+    
+    resume = Resume.query.get(resume_id)
+    job_posting = JobPosting.query.get(job_posting_id)
+    if not resume or not job_posting:
+        return None
+    
+    reusable = find_reusable_match(user_id, resume, job_posting, config['MATCH_REUSE_SIMILARITY'],
+                                   get_model_name(), config['MATCH_CACHE_TTL'])
+    if reusable is None:
+        return None
+    match, similarity = reusable
+    return {
+        'score': match.score,
+        'missing_keywords': match.missing_keywords,
+        'suggestions': match.suggestions,
+        # Copies are never reused themselves, so a result only travels one hop from the LLM
+        'source': 'reused'
+    }, {'match_id': match.id, 'similarity': round(similarity, 3)}
+
+def perform_match(user_id, resume_id, job_posting_id, resume_text, job_data, resume_features=None, job_features=None):
+    """Run the LLM match, store the result and return the response payload."""
+    try:
+        # Serve repeated resume/job pairs from the cache before calling the LLM
+        model = get_model_name()
+        cache_key = compute_cache_key(resume_text, job_data, model, job_features['content_hash'] if job_features else None)
+        match_result = get_cached_match(cache_key)
+        cache_hit = match_result is not None
+        reused_from = None
+        
+        if not cache_hit:
+            # Then from an earlier match of a near-duplicate resume or posting
+            reused = find_reused_match(user_id, resume_id, job_posting_id)
+            if reused is not None:
+                match_result, reused_from = reused
+            else:
+                # Perform matching using LLM
+                match_result = suggest_resume_additions(resume_text, job_data, resume_features=resume_features, job_features=job_features)
+                store_cached_match(cache_key, model, match_result)
+                evict_entries()
+        
+        # Create match result record
+        match_record = MatchResult(
+            user_id=user_id,
+            resume_id=resume_id,
+            job_posting_id=job_posting_id,
+            score=match_result['score'],
+            missing_keywords=match_result['missing_keywords'],
+            suggestions=match_result['suggestions'],
+            source=match_result.get('source', 'llm'),
+            reused_from_id=reused_from['match_id'] if reused_from else None,
+            model=model,
+            prompt_version=PROMPT_VERSION
+        )
+        
+        db.session.add(match_record)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return {
+        'id': match_record.id,
+        'score': match_record.score,
+        'missing_keywords': match_record.missing_keywords,
+        'suggestions': match_record.suggestions,
+        'source': match_record.source,
+        'created_at': match_record.created_at.isoformat(),
+        'cache_hit': cache_hit,
+        'reused_from': reused_from
+    }
+
+def submit_match_job(app, user_id, resume_id, job_posting_id, resume_text, job_data, resume_features=None, job_features=None):
+    """Queue a match on the background runner and return a 202 response."""
+    runner = app.extensions['match_jobs']
+    socketio = app.extensions['socketio']
+    
+    def run():
+        with app.app_context():
+            return perform_match(user_id, resume_id, job_posting_id, resume_text, job_data, resume_features, job_features)
+    
+    def on_success(response_data):
+        emit_match_finished(socketio, user_id, response_data, success=True)
+    
+    def on_error(error):
+        emit_match_finished(socketio, user_id, None, success=False, error=str(error))
+    
+    try:
+        job = runner.submit(user_id, run, on_success=on_success, on_error=on_error)
+    except MatchQueueFull as e:
+        return jsonify({'error': str(e), 'stats': runner.stats()}), 503
+    
+    response = jsonify({
+        'message': 'Resume matching queued',
+        'job': job_to_dict(job),
+        'stats': runner.stats()
+    })
+    response.headers['Location'] = f"/api/match/jobs/{job['id']}"
+    return response, 202
+
+def job_to_dict(job):
+    """Convert a match job record to a dictionary for JSON serialization."""
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'match_result': job['result'],
+        'error': job['error'],
+        'created_at': datetime.utcfromtimestamp(job['created_at']).isoformat(),
+        'finished_at': datetime.utcfromtimestamp(job['finished_at']).isoformat() if job['finished_at'] else None
+    }
+
+@match_bp.route('/jobs/stats', methods=['GET'])
+@require_auth
+def get_match_job_stats():
+    """Get queue depth and active worker counters for async match jobs."""
+    from flask import current_app
+    return jsonify({'stats': current_app.extensions['match_jobs'].stats()}), 200
+
+@match_bp.route('/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_match_job(job_id):
+    """Poll the status of an async match job."""
+    from flask import current_app
+    runner = current_app.extensions['match_jobs']
+    job = runner.get(job_id)
+    
+    if not job or job['user_id'] != request.user_id:
+        return jsonify({'error': 'Match job not found'}), 404
+    
+    return jsonify({
+        'job': job_to_dict(job),
+        'stats': runner.stats()
+    }), 200
+
 @match_bp.route('/history', methods=['GET'])
 @require_auth
 def get_match_history():
@@ -138,15 +286,24 @@ def bulk_match_resumes():
         resume_ids = data.get('resumeIds', [])
         job_posting_id = data.get('jobPostingId')
         job_data = data.get('jobData')
+        top_k = data.get('prefilterTopK')
+        threshold = data.get('prefilterThreshold')
         
         # Validate input
         if not resume_ids:
             return jsonify({'error': 'resumeIds is required'}), 400
         
+        if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+            return jsonify({'error': 'prefilterTopK must be a positive integer'}), 400
+        
+        if threshold is not None and (not isinstance(threshold, (int, float)) or isinstance(threshold, bool) or not 0 <= threshold <= 100):
+            return jsonify({'error': 'prefilterThreshold must be a number between 0 and 100'}), 400
+        
         if not job_posting_id and not job_data:
             return jsonify({'error': 'Either jobPostingId or jobData is required'}), 400
         
         # Get job data
+        job_posting = None
         if job_posting_id:
             job_posting = JobPosting.query.get(job_posting_id)
             if not job_posting:
@@ -169,38 +326,97 @@ def bulk_match_resumes():
         results = []
         
         try:
-            for i, resume in enumerate(resumes):
-                # Emit progress update
-                socketio.emit('bulk_match_progress', {
-                    'user_id': request.user_id,
-                    'current': i + 1,
-                    'total': len(resumes),
-                    'resume_name': resume.filename,
-                    'message': f'Matching resume {i + 1} of {len(resumes)}...'
-                }, room=f'user_{request.user_id}')
-                
-                # Perform matching
-                match_result = suggest_resume_additions(resume.text, job_data)
-                
-                # Create match result record
-                match_record = MatchResult(
-                    user_id=request.user_id,
-                    resume_id=resume.id,
-                    job_posting_id=job_posting_id,
-                    score=match_result['score'],
-                    missing_keywords=match_result['missing_keywords'],
-                    suggestions=match_result['suggestions']
-                )
-                
-                db.session.add(match_record)
-                db.session.flush()  # Get the ID
+            # Cached results are resolved here and only misses reach the LLM
+            model = get_model_name()
+            # Job features are loaded once and shared by every candidate
+            job_features = load_job_features(job_posting, job_data)
+            cache_keys = [compute_cache_key(resume.text, job_data, model, job_features['content_hash']) for resume in resumes]
+            cached_results = [get_cached_match(cache_key) for cache_key in cache_keys]
+            cache_hits = sum(1 for cached in cached_results if cached is not None)
+            
+            # Stored features are loaded in one query; missing or stale ones are computed
+            resume_features = load_resume_features(resumes)
+            
+            # Stage one: rank everything with the local scorer, only the selected go to the LLM
+            local_results, selected = prefilter_candidates(
+                [resume.text for resume in resumes], job_data, top_k=top_k, threshold=threshold,
+                resume_features=resume_features, job_features=job_features
+            )
+            
+            # Selected cache misses reuse an earlier match of a near-duplicate pair when there is one
+            reused_results = [
+                find_reused_match(request.user_id, resume.id, job_posting_id) if cached is None and i in selected else None
+                for i, (resume, cached) in enumerate(zip(resumes, cached_results))
+            ]
+            
+            # Stage two: run the LLM calls concurrently; texts are read up front so
+            # worker threads never touch the database session
+            concurrency = max(1, current_app.config['BULK_MATCH_CONCURRENCY'])
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-match') as executor:
+                futures = [
+                    executor.submit(suggest_resume_additions, resume.text, job_data, resume_features=resume_features[i],
+                                    job_features=job_features)
+                    if cached is None and reused is None and i in selected else None
+                    for i, (resume, cached, reused) in enumerate(zip(resumes, cached_results, reused_results))
+                ]
                 
-                results.append({
-                    'resume_id': resume.id,
-                    'resume_name': resume.filename,
-                    'match_result': match_record.to_dict()
-                })
+                for i, (resume, future) in enumerate(zip(resumes, futures)):
+                    # Emit progress update
+                    socketio.emit('bulk_match_progress', {
+                        'user_id': request.user_id,
+                        'current': i + 1,
+                        'total': len(resumes),
+                        'resume_name': resume.filename,
+                        'message': f'Matching resume {i + 1} of {len(resumes)}...'
+                    }, room=f'user_{request.user_id}')
+                    
+                    # Wait for this resume's match, keeping results in request order
+                    reused_from = None
+                    if cached_results[i] is not None:
+                        match_result = cached_results[i]
+                        stage = 'llm'
+                    elif reused_results[i] is not None:
+                        match_result, reused_from = reused_results[i]
+                        stage = 'reused'
+                    elif future is not None:
+                        match_result = future.result()
+                        store_cached_match(cache_keys[i], model, match_result)
+                        # 'fallback' when no API key is configured or the LLM call failed
+                        stage = match_result.get('source', 'llm')
+                    else:
+                        match_result = local_results[i]
+                        stage = 'prefilter'
+                    
+                    # Create match result record
+                    match_record = MatchResult(
+                        user_id=request.user_id,
+                        resume_id=resume.id,
+                        job_posting_id=job_posting_id,
+                        score=match_result['score'],
+                        missing_keywords=match_result['missing_keywords'],
+                        suggestions=match_result['suggestions'],
+                        source='prefilter' if stage == 'prefilter' else match_result.get('source', 'llm'),
+                        reused_from_id=reused_from['match_id'] if reused_from else None,
+                        model=model,
+                        prompt_version=PROMPT_VERSION
+                    )
+                    
+                    db.session.add(match_record)
+                    db.session.flush()  # Get the ID
+                    
+                    results.append({
+                        'resume_id': resume.id,
+                        'resume_name': resume.filename,
+                        'match_result': match_record.to_dict(),
+                        'cache_hit': cached_results[i] is not None,
+                        'reused_from': reused_from,
+                        'stage': stage,
+                        'prefilter_score': local_results[i]['score']
+                    })
             
+            # Trim the cache once for all results stored above
+            if any(future is not None for future in futures):
+                evict_entries()
             db.session.commit()
             
             # Emit bulk match finished event
@@ -213,7 +429,12 @@ def bulk_match_resumes():
             
             return jsonify({
                 'message': f'Bulk matching completed for {len(resumes)} resumes',
-                'results': results
+                'results': results,
+                'cache': {
+                    'hits': cache_hits,
+                    'misses': len(resumes) - cache_hits
+                },
+                'llm_calls': sum(1 for future in futures if future is not None)
             }), 200
             
         except Exception as match_error:
@@ -1,18 +1,28 @@
 """Resume management API endpoints."""
 
 import os
-import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 from flask import Blueprint, request, jsonify, current_app
-from models import db, Resume, User
-from services.extract import extract_text_from_file
+from models import db, Resume, User, StoredFile, JobPosting
+from services.extract_pool import ExtractionFailed
+from services.file_store import acquire_blob, store_blob, release_resume_file, remove_file, discard_unreferenced_blobs, FileTooLarge
+from services.archive import open_archive, iter_archive_members, ArchiveRejected
+from services.resume_features import ensure_resume_features, read_resume_features, read_resume_signature
+from services.near_duplicates import MIN_THRESHOLD, find_similar_resumes
 from api.auth import require_auth
+from sockets.events import emit_progress_update
 
 resumes_bp = Blueprint('resumes', __name__, url_prefix='/resumes')
 
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
+def get_upload_dir():
+    """Get the root directory for stored uploads."""
+    return current_app.config.get('UPLOAD_DIR') or os.path.join(current_app.root_path, '..', 'uploads')
+
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and \
@@ -35,39 +45,57 @@ def upload_resume():
         if not allowed_file(file.filename):
             return jsonify({'error': 'File type not allowed. Please upload PDF, DOC, or DOCX files.'}), 400
         
-        # Check file size
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
-        
-        if file_size > MAX_FILE_SIZE:
-            return jsonify({'error': 'File too large. Maximum size is 5MB.'}), 400
-        
-        # Create uploads directory if it doesn't exist
-        upload_dir = os.path.join(current_app.root_path, '..', 'uploads')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
+        upload_dir = get_upload_dir()
         filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        filepath = os.path.join(upload_dir, unique_filename)
+        extension = os.path.splitext(filename)[1].lower()
         
-        # Save file
-        file.save(filepath)
+        # Read the upload once (hashing and size-checking as it streams) and store
+        # it by hash; identical files share one blob on disk
+        try:
+            stored, data = acquire_blob(upload_dir, file.stream, extension, MAX_FILE_SIZE)
+        except FileTooLarge:
+            return jsonify({'error': 'File too large. Maximum size is 5MB.'}), 400
+        filepath, content_hash = stored.path, stored.sha256
         
-        # Extract text from file
-        extracted_text = extract_text_from_file(filepath)
+        # Identical content was already extracted; reuse its text
+        extraction_failed = False
+        if stored.text_extracted:
+            extracted_text = stored.text
+        else:
+            # Extract text in a worker process so a pathological file can't hang or
+            # exhaust this one; the resume is kept and flagged if extraction fails
+            socketio = current_app.extensions['socketio']
+            user_id = request.user_id
+            
+            def on_progress(page, total):
+                emit_progress_update(socketio, user_id, 'extract', int(page * 100 / total),
+                                     f'Extracted page {page} of {total} from {filename}')
+            
+            try:
+                extracted_text = current_app.extensions['extraction_pool'].extract(
+                    data, extension, on_progress=on_progress
+                )
+                stored.text = extracted_text
+                stored.text_extracted = True
+            except ExtractionFailed as e:
+                print(f"Extraction failed for {filename}: {e}")
+                extracted_text = None
+                extraction_failed = True
         
         # Create resume record
         resume = Resume(
             user_id=request.user_id,
             filename=filename,
             filepath=filepath,
-            text=extracted_text
+            content_hash=content_hash,
+            text=extracted_text,
+            extraction_failed=extraction_failed
         )
         
         db.session.add(resume)
+        ensure_resume_features(resume)
         db.session.commit()
+        current_app.extensions['resume_index'].add_resume(resume)
         
         return jsonify({
             'message': 'Resume uploaded successfully',
@@ -76,11 +104,179 @@ def upload_resume():
         
     except Exception as e:
         db.session.rollback()
-        # Clean up file if it was saved
-        if 'filepath' in locals() and os.path.exists(filepath):
-            os.remove(filepath)
+        # Clean up the file and its record if no committed resume references them
+        if 'filepath' in locals():
+            orphaned = discard_unreferenced_blobs({content_hash: filepath})
+            db.session.commit()
+            for path in orphaned:
+                remove_file(path)
         return jsonify({'error': 'Failed to upload resume', 'detail': str(e)}), 500
 
+@resumes_bp.route('/archive', methods=['POST'])
+@require_auth
+def upload_resume_archive():
+    """Upload a ZIP archive of resumes, extracting them in parallel."""
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
+        
+        file = request.files['file']
+        
+        if not file.filename.lower().endswith('.zip'):
+            return jsonify({'error': 'Please upload a ZIP archive.'}), 400
+        
+        config = current_app.config
+        try:
+            archive, members = open_archive(file.stream, config['RESUME_ARCHIVE_MAX_MEMBERS'],
+                                            config['RESUME_ARCHIVE_MAX_BYTES'])
+        except ArchiveRejected as e:
+            return jsonify({'error': str(e)}), 400
+        
+        socketio = current_app.extensions['socketio']
+        pool = current_app.extensions['extraction_pool']
+        resume_index = current_app.extensions['resume_index']
+        user_id = request.user_id
+        upload_dir = get_upload_dir()
+        
+        resumes = []
+        skipped = []
+        indexed = 0
+        processed = 0
+        # Blobs referenced by resumes not yet committed, removed again if their batch is rolled back
+        uncommitted_blobs = []
+        # Extractions in flight, oldest first; bounded so only a few members are held in memory
+        window = deque()
+        max_in_flight = pool.max_workers * 2
+        # Content already being extracted in this archive, by hash
+        in_flight = {}
+        
+        def report(name, message):
+            nonlocal processed
+            processed += 1
+            emit_progress_update(socketio, user_id, 'archive', int(processed * 100 / len(members)),
+                                 f'{message} {name} ({processed}/{len(members)})')
+        
+        def commit():
+            """Commit pending resumes and add them to the search index."""
+            nonlocal indexed
+            db.session.commit()
+            for resume in resumes[indexed:]:
+                resume_index.add_resume(resume)
+            indexed = len(resumes)
+            uncommitted_blobs.clear()
+        
+        def finish(entry):
+            """Wait for the oldest extraction, then store its file and add its resume, committing in batches."""
+            filename, sha256, data, extension, future = entry
+            extraction_failed = False
+            extracted_text = None
+            if future is not None:
+                try:
+                    extracted_text = future.result()
+                except ExtractionFailed:
+                    extraction_failed = True
+            
+            # The file is stored and referenced in the same batch as its resume
+            stored = store_blob(upload_dir, sha256, data, extension)
+            uncommitted_blobs.append(stored)
+            if future is None:
+                extracted_text = stored.text
+            elif not extraction_failed:
+                stored.text = extracted_text
+                stored.text_extracted = True
+            
+            resume = Resume(
+                user_id=user_id,
+                filename=filename,
+                filepath=stored.path,
+                content_hash=stored.sha256,
+                text=extracted_text,
+                extraction_failed=extraction_failed
+            )
+            db.session.add(resume)
+            ensure_resume_features(resume)
+            resumes.append(resume)
+            if len(resumes) - indexed >= config['RESUME_ARCHIVE_COMMIT_SIZE']:
+                commit()
+            report(filename, 'Extracted')
+        
+        def rollback(error, status, detail=None):
+            """Drop the uncommitted batch and report the resumes already stored alongside the error."""
+            blobs = {stored.sha256: stored.path for stored in uncommitted_blobs}
+            db.session.rollback()
+            # Files written for the rolled-back batch that no committed resume references
+            orphaned = discard_unreferenced_blobs(blobs)
+            db.session.commit()
+            for path in orphaned:
+                remove_file(path)
+            stored_resumes = resumes[:indexed]
+            payload = {
+                'error': error,
+                'resumes': [resume.to_dict() for resume in stored_resumes],
+                'skipped': skipped,
+                'summary': {
+                    'uploaded': len(stored_resumes),
+                    'skipped': len(skipped),
+                    'extraction_failed': sum(1 for resume in stored_resumes if resume.extraction_failed)
+                }
+            }
+            if detail is not None:
+                payload['detail'] = detail
+            return jsonify(payload), status
+        
+        try:
+            with archive, ThreadPoolExecutor(max_workers=pool.max_workers, thread_name_prefix='archive-extract') as executor:
+                members_read = iter_archive_members(archive, members, ALLOWED_EXTENSIONS, MAX_FILE_SIZE,
+                                                    config['RESUME_ARCHIVE_MAX_BYTES'])
+                for name, content, error in members_read:
+                    if content is None:
+                        skipped.append({'filename': name, 'error': error})
+                        report(name, 'Skipped')
+                        continue
+                    
+                    sha256, data = content
+                    extension = os.path.splitext(name)[1].lower()
+                    filename = secure_filename(os.path.basename(name)) or f'resume{extension}'
+                    
+                    future = None
+                    known = StoredFile.query.filter_by(sha256=sha256).first()
+                    if not (known and known.text_extracted):
+                        future = in_flight.get(sha256)
+                        if future is None:
+                            future = executor.submit(pool.extract, data, extension)
+                            in_flight[sha256] = future
+                    window.append((filename, sha256, data, extension, future))
+                    
+                    while len(window) > max_in_flight:
+                        finish(window.popleft())
+                
+                while window:
+                    finish(window.popleft())
+            
+            commit()
+        except ArchiveRejected as e:
+            return rollback(str(e), 400)
+        except Exception as e:
+            return rollback('Failed to upload resume archive', 500, str(e))
+        
+        return jsonify({
+            'message': f'Uploaded {len(resumes)} resumes from archive',
+            'resumes': [resume.to_dict() for resume in resumes],
+            'skipped': skipped,
+            'summary': {
+                'uploaded': len(resumes),
+                'skipped': len(skipped),
+                'extraction_failed': sum(1 for resume in resumes if resume.extraction_failed)
+            }
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to upload resume archive', 'detail': str(e)}), 500
+
+# Archives may exceed the global request body limit
+upload_resume_archive.max_content_length_config = 'RESUME_ARCHIVE_MAX_UPLOAD'
+
 @resumes_bp.route('', methods=['GET'])
 @require_auth
 def list_resumes():
@@ -105,13 +301,14 @@ def delete_resume(resume_id):
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
         
-        # Delete file from filesystem
-        if os.path.exists(resume.filepath):
-            os.remove(resume.filepath)
+        # Release the stored file; removed from disk after the commit once no resume references it
+        released_path = release_resume_file(resume)
         
         # Delete from database
         db.session.delete(resume)
         db.session.commit()
+        remove_file(released_path)
+        current_app.extensions['resume_index'].remove_resume(request.user_id, resume_id)
         
         return jsonify({'message': 'Resume deleted successfully'}), 200
         
@@ -129,9 +326,88 @@ def get_resume(resume_id):
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
         
+        # Read only: features are stored at upload and backfilled at startup
+        features = read_resume_features(resume)
+        
+        resume_data = resume.to_dict()
+        resume_data['skills'] = features['skills']
+        resume_data['years_experience'] = features['years_experience']
+        
         return jsonify({
-            'resume': resume.to_dict()
+            'resume': resume_data
         }), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch resume', 'detail': str(e)}), 500
+
+@resumes_bp.route('/<int:resume_id>/top-jobs', methods=['GET'])
+@require_auth
+def get_top_jobs(resume_id):
+    """Rank stored job postings for a resume."""
+    try:
+        k = request.args.get('k', 10, type=int)
+        if k is None or not 1 <= k <= 100:
+            return jsonify({'error': 'k must be an integer between 1 and 100'}), 400
+        
+        days = request.args.get('days', type=float)
+        if 'days' in request.args and (days is None or days <= 0):
+            return jsonify({'error': 'days must be a positive number'}), 400
+        
+        resume = Resume.query.filter_by(id=resume_id, user_id=request.user_id).first()
+        
+        if not resume:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        if not resume.text:
+            return jsonify({'error': 'Resume text not available'}), 400
+        
+        # Read only: features are stored at upload and parse time and backfilled at startup
+        features = read_resume_features(resume)
+        ranked = current_app.extensions['job_index'].top_jobs(
+            features, k, company=request.args.get('company'), max_age_days=days
+        )
+        
+        jobs = {job.id: job for job in JobPosting.query.filter(JobPosting.id.in_([entry['job_posting_id'] for entry in ranked])).all()}
+        
+        return jsonify({
+            'resume_id': resume.id,
+            'results': [
+                dict(entry, job_posting=jobs[entry['job_posting_id']].to_dict())
+                for entry in ranked if entry['job_posting_id'] in jobs
+            ]
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to rank job postings', 'detail': str(e)}), 500
+
+@resumes_bp.route('/<int:resume_id>/duplicates', methods=['GET'])
+@require_auth
+def get_resume_duplicates(resume_id):
+    """Find the user's other resumes whose text nearly duplicates this one."""
+    try:
+        threshold = request.args.get('threshold', current_app.config['NEAR_DUPLICATE_THRESHOLD'], type=float)
+        if threshold is None or not MIN_THRESHOLD <= threshold <= 1:
+            return jsonify({'error': f'threshold must be a number between {MIN_THRESHOLD} and 1'}), 400
+        
+        resume = Resume.query.filter_by(id=resume_id, user_id=request.user_id).first()
+        
+        if not resume:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        # Read only: signatures are stored at upload and backfilled at startup
+        similar = find_similar_resumes(resume, read_resume_signature(resume), threshold)
+        resumes = {other.id: other for other in Resume.query.filter(Resume.id.in_([other_id for other_id, _ in similar])).all()}
+        
+        return jsonify({
+            'resume_id': resume.id,
+            'threshold': threshold,
+            'duplicates': [
+                {'resume_id': other_id, 'filename': resumes[other_id].filename, 'similarity': round(similarity, 3)}
+                for other_id, similarity in similar if other_id in resumes
+            ]
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to find duplicate resumes', 'detail': str(e)}), 500
@@ -0,0 +1,41 @@
+"""Full-text search API endpoints."""
+
+from flask import Blueprint, request, jsonify
+from services.search import search_resumes, search_jobs, InvalidSearchQuery
+from api.auth import require_auth
+
+search_bp = Blueprint('search', __name__, url_prefix='/search')
+
+SEARCH_TYPES = ('all', 'resumes', 'jobs')
+
+@search_bp.route('', methods=['GET'])
+@require_auth
+def search():
+    """Search the user's resumes and all job postings, returning ranked matches with snippets."""
+    try:
+        query = request.args.get('q', '').strip()
+        search_type = request.args.get('type', 'all')
+        limit = request.args.get('limit', 20, type=int)
+        
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        
+        if search_type not in SEARCH_TYPES:
+            return jsonify({'error': f"type must be one of: {', '.join(SEARCH_TYPES)}"}), 400
+        
+        if limit is None or not 1 <= limit <= 100:
+            return jsonify({'error': 'limit must be an integer between 1 and 100'}), 400
+        
+        response_data = {'query': query}
+        try:
+            if search_type in ('all', 'resumes'):
+                response_data['resumes'] = search_resumes(request.user_id, query, limit)
+            if search_type in ('all', 'jobs'):
+                response_data['jobs'] = search_jobs(query, limit)
+        except InvalidSearchQuery as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(response_data), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to search', 'detail': str(e)}), 500
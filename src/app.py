@@ -1,17 +1,33 @@
 """Flask application factory and main entry point."""
 
 import os
-from flask import Flask, jsonify
+import atexit
+from flask import Flask, Request, abort, current_app, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from config import config
 from db import init_db
 from api import api_bp
 from models import db
+from services.match_jobs import MatchJobRunner
+from services.llm import close_openai_clients
+from services.scraper import close_http_session
+from services.extract_pool import ExtractionPool
+from services.resume_index import ResumeIndexRegistry
+from services.job_index import JobIndex
+
+class AppRequest(Request):
+    """Request whose body limit a view can raise by naming a config key in `max_content_length_config`."""
+    
+    @property
+    def max_content_length(self):
+        view = current_app.view_functions.get(self.endpoint) if self.endpoint else None
+        return current_app.config[getattr(view, 'max_content_length_config', None) or 'MAX_CONTENT_LENGTH']
 
 def create_app(config_name=None):
     """Create and configure the Flask application."""
     app = Flask(__name__)
+    app.request_class = AppRequest
     
     # Load configuration
     config_name = config_name or os.getenv('FLASK_ENV', 'default')
@@ -31,6 +47,42 @@ def create_app(config_name=None):
     socketio = SocketIO(app, cors_allowed_origins=app.config['CORS_ORIGINS'], async_mode='threading')
     app.extensions['socketio'] = socketio
     
+    # Initialize background match job runner
+    match_jobs = MatchJobRunner(
+        max_workers=app.config['MATCH_WORKERS'],
+        max_queue=app.config['MATCH_QUEUE_SIZE'],
+        job_ttl=app.config['MATCH_JOB_TTL']
+    )
+    app.extensions['match_jobs'] = match_jobs
+    atexit.register(match_jobs.shutdown)
+    
+    # Initialize resume text extraction worker processes
+    extraction_pool = ExtractionPool(
+        max_workers=app.config['EXTRACT_WORKERS'],
+        timeout=app.config['EXTRACT_TIMEOUT'],
+        memory_limit_mb=app.config['EXTRACT_MEMORY_LIMIT_MB'],
+        max_tasks_per_child=app.config['EXTRACT_MAX_TASKS_PER_CHILD']
+    )
+    app.extensions['extraction_pool'] = extraction_pool
+    atexit.register(extraction_pool.shutdown)
+    
+    # Initialize per-user resume search indexes, persisted on shutdown
+    resume_index_dir = app.config['RESUME_INDEX_DIR']
+    if resume_index_dir is None:
+        resume_index_dir = os.path.join(app.root_path, '..', 'resume_index')
+    resume_index = ResumeIndexRegistry(
+        index_dir=resume_index_dir,
+        k1=app.config['RESUME_INDEX_K1'],
+        b=app.config['RESUME_INDEX_B']
+    )
+    app.extensions['resume_index'] = resume_index
+    atexit.register(resume_index.save)
+    
+    # Initialize the job posting index used to rank postings for a resume
+    app.extensions['job_index'] = JobIndex()
+    atexit.register(close_openai_clients)
+    atexit.register(close_http_session)
+    
     # SocketIO event handlers
     @socketio.on('connect')
     def handle_connect(auth=None):
@@ -72,6 +124,13 @@ def create_app(config_name=None):
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
     
+    @app.before_request
+    def reject_large_bodies():
+        """Reject bodies over the route's limit before a view's error handling can turn it into a 500."""
+        limit = request.max_content_length
+        if limit is not None and request.content_length is not None and request.content_length > limit:
+            abort(413)
+    
     @app.errorhandler(413)
     def too_large(error):
         """Handle file too large errors."""
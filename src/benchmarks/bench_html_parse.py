@@ -0,0 +1,82 @@
+"""Benchmark: job page parse time and peak memory, full html.parser DOM vs the scraper pipeline.
+
+Runs over the saved HTML fixtures in tests/fixtures plus larger pages derived
+from them (a client-rendered page with a multi-megabyte script bundle and a
+page carrying JSON-LD). Extra saved pages can be passed as arguments.
+
+Run from the src directory:
+    python benchmarks/bench_html_parse.py [page.html ...]
+"""
+
+import glob
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bs4 import BeautifulSoup
+from services.scraper import (extract_title, extract_company, extract_description,
+                              extract_job_fields, get_parser_backend)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+
+def legacy_extract(content):
+    """The original pipeline: full html.parser DOM, then the selector cascade."""
+    soup = BeautifulSoup(content, 'html.parser')
+    return extract_title(soup), extract_company(soup), extract_description(soup)
+
+def current_extract(content):
+    return extract_job_fields(content, 'https://careers.example.com/jobs/1')
+
+def build_spa_page(base, bundle_bytes):
+    """Pad a page with inline script bundles and styles, like a client-rendered career site."""
+    bundle = '<script>' + ('window.__STATE__.push({"id": 1, "html": "<div class=\\"x\\">item</div>"});\n'
+                           * (bundle_bytes // 80)) + '</script>'
+    styles = '<style>' + '.c { color: #333; margin: 0 auto; }\n' * 2000 + '</style>'
+    return base.replace(b'</head>', styles.encode() + b'</head>').replace(b'</body>', bundle.encode() + b'</body>')
+
+def build_json_ld_page(base):
+    """Add a schema.org JobPosting block to a page."""
+    posting = {
+        '@context': 'https://schema.org',
+        '@type': 'JobPosting',
+        'title': 'Senior Software Engineer',
+        'hiringOrganization': {'@type': 'Organization', 'name': 'TechCorp Inc.'},
+        'description': '<p>' + 'Build and operate web services in Python. ' * 40 + '</p>'
+    }
+    block = f'<script type="application/ld+json">{json.dumps(posting)}</script>'
+    return base.replace(b'</head>', block.encode() + b'</head>')
+
+def measure(fn, content, runs=5):
+    """Best-of-N wall time and peak traced allocation for one extraction."""
+    seconds = min(timeit.repeat(lambda: fn(content), number=1, repeat=runs))
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+def main():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))) + sys.argv[1:]:
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+
+    base = pages.get('job_static.html')
+    if base:
+        pages['spa_3mb.html (derived)'] = build_spa_page(base, 3 * 1024 * 1024)
+        pages['json_ld.html (derived)'] = build_json_ld_page(build_spa_page(base, 512 * 1024))
+
+    print(f'parser backend: {get_parser_backend()}')
+    for name, content in pages.items():
+        legacy_time, legacy_peak = measure(legacy_extract, content)
+        current_time, current_peak = measure(current_extract, content)
+        print(f'{name} ({len(content) / 1024:.0f} KB): '
+              f'legacy {legacy_time * 1000:.1f} ms / {legacy_peak / 1024 / 1024:.1f} MB peak, '
+              f'current {current_time * 1000:.1f} ms / {current_peak / 1024 / 1024:.1f} MB peak, '
+              f'speedup {legacy_time / current_time:.1f}x')
+
+if __name__ == '__main__':
+    main()
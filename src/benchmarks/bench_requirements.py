@@ -0,0 +1,75 @@
+"""Microbenchmark: single-pass requirement extraction vs the previous nine-pass version.
+
+Run from the src directory:
+    python benchmarks/bench_requirements.py
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.scraper import extract_requirements
+
+LEGACY_PATTERNS = [
+    r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
+    r'degree\s*in\s*([^.,]+)',
+    r'bachelor\'?s?\s*(?:degree\s*)?in\s*([^.,]+)',
+    r'master\'?s?\s*(?:degree\s*)?in\s*([^.,]+)',
+    r'phd\s*(?:in\s*)?([^.,]+)',
+    r'certification\s*in\s*([^.,]+)',
+    r'proficient\s*in\s*([^.,]+)',
+    r'experience\s*with\s*([^.,]+)',
+    r'knowledge\s*of\s*([^.,]+)'
+]
+
+def legacy_extract_requirements(description):
+    """The original implementation: one findall per pattern over the lowercased text."""
+    requirements = []
+    text = description.lower()
+    for pattern in LEGACY_PATTERNS:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            if isinstance(match, tuple):
+                match = match[0]
+            requirements.append(match.strip().title())
+    return list(set(requirements))
+
+def build_description(size, seed, punctuated=True):
+    """Build a job description of roughly `size` characters."""
+    rng = random.Random(seed)
+    phrases = [
+        '5+ years of experience building web services',
+        "bachelor's degree in computer science or a related field",
+        'proficient in python and go',
+        'experience with kubernetes and terraform',
+        'knowledge of distributed systems',
+        'certification in aws',
+        'we value curiosity and ownership',
+        'you will collaborate with product and design',
+        'the team ships several times a day',
+    ]
+    parts = []
+    length = 0
+    while length < size:
+        phrase = rng.choice(phrases)
+        separator = rng.choice(['. ', ', ', '\n']) if punctuated else ' '
+        parts.append(phrase + separator)
+        length += len(phrase) + len(separator)
+    return ''.join(parts)[:size]
+
+def main():
+    cases = {
+        '50KB typical posting': build_description(50_000, seed=1),
+        '50KB unpunctuated posting': build_description(50_000, seed=2, punctuated=False),
+    }
+    for name, description in cases.items():
+        runs = 5
+        legacy = min(timeit.repeat(lambda: legacy_extract_requirements(description), number=1, repeat=runs))
+        current = min(timeit.repeat(lambda: extract_requirements(None, description), number=1, repeat=runs))
+        print(f'{name}: legacy {legacy * 1000:.2f} ms, single-pass {current * 1000:.2f} ms, '
+              f'speedup {legacy / current:.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,71 @@ class Config:
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')  # e.g. a local stub server for benchmarks
+    OPENAI_POOL_SIZE = int(os.getenv('OPENAI_POOL_SIZE', '20'))
+    OPENAI_KEEPALIVE = float(os.getenv('OPENAI_KEEPALIVE', '30'))  # Seconds idle connections are kept
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '10'))
+    
+    # Async Match Job Configuration
+    MATCH_WORKERS = int(os.getenv('MATCH_WORKERS', '4'))
+    MATCH_QUEUE_SIZE = int(os.getenv('MATCH_QUEUE_SIZE', '32'))
+    MATCH_JOB_TTL = int(os.getenv('MATCH_JOB_TTL', '3600'))  # Seconds to keep finished jobs
+    
+    # LLM Concurrency and Rate Limits
+    BULK_MATCH_CONCURRENCY = int(os.getenv('BULK_MATCH_CONCURRENCY', '4'))
+    OPENAI_RPM_LIMIT = int(os.getenv('OPENAI_RPM_LIMIT', '500'))
+    OPENAI_TPM_LIMIT = int(os.getenv('OPENAI_TPM_LIMIT', '200000'))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+    
+    # Match Result Cache Configuration
+    MATCH_CACHE_ENABLED = os.getenv('MATCH_CACHE_ENABLED', 'true').lower() == 'true'
+    MATCH_CACHE_TTL = int(os.getenv('MATCH_CACHE_TTL', str(7 * 24 * 3600)))  # 7 days
+    MATCH_CACHE_MAX_ENTRIES = int(os.getenv('MATCH_CACHE_MAX_ENTRIES', '10000'))
+    
+    # Near-Duplicate Detection (MinHash/LSH over resume text and job descriptions)
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))  # Default for duplicate lookups
+    MATCH_REUSE_ENABLED = os.getenv('MATCH_REUSE_ENABLED', 'true').lower() == 'true'
+    MATCH_REUSE_SIMILARITY = float(os.getenv('MATCH_REUSE_SIMILARITY', '0.9'))  # Reuse a near-duplicate pair's match at or above this
+    
+    # Skills Taxonomy (JSON list of {name, synonyms}); defaults to src/data/skills_taxonomy.json
+    SKILLS_TAXONOMY_PATH = os.getenv('SKILLS_TAXONOMY_PATH')
+    
+    # Scraper HTTP Pool Configuration
+    SCRAPER_POOL_HOSTS = int(os.getenv('SCRAPER_POOL_HOSTS', '20'))  # Hosts with cached connection pools
+    SCRAPER_POOL_SIZE = int(os.getenv('SCRAPER_POOL_SIZE', '10'))  # Keep-alive connections per host
+    SCRAPER_MAX_BYTES = int(os.getenv('SCRAPER_MAX_BYTES', str(2 * 1024 * 1024)))  # Response body cut-off
+    SCRAPER_PARSER = os.getenv('SCRAPER_PARSER', 'auto')  # auto, lxml or html.parser
+    
+    # Job Posting Freshness (seconds a parsed URL is served without re-scraping)
+    JOB_FRESHNESS_SECONDS = int(os.getenv('JOB_FRESHNESS_SECONDS', '900'))
+    
+    # Bulk Job Parsing
+    JOB_BULK_MAX_URLS = int(os.getenv('JOB_BULK_MAX_URLS', '500'))
+    JOB_BULK_CONCURRENCY = int(os.getenv('JOB_BULK_CONCURRENCY', '8'))  # Concurrent fetches overall
+    JOB_BULK_PER_HOST = int(os.getenv('JOB_BULK_PER_HOST', '2'))  # Concurrent fetches per host
+    JOB_BULK_COMMIT_SIZE = int(os.getenv('JOB_BULK_COMMIT_SIZE', '50'))  # Postings upserted per commit
+    
+    # Upload Storage (content-addressed by SHA-256); defaults to <repo>/uploads
+    UPLOAD_DIR = os.getenv('UPLOAD_DIR')
+    
+    # Resume Text Extraction Worker Processes
+    EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', '2'))
+    EXTRACT_TIMEOUT = float(os.getenv('EXTRACT_TIMEOUT', '30'))  # Seconds per document
+    EXTRACT_MEMORY_LIMIT_MB = int(os.getenv('EXTRACT_MEMORY_LIMIT_MB', '512'))  # RLIMIT_AS per worker
+    EXTRACT_MAX_TASKS_PER_CHILD = int(os.getenv('EXTRACT_MAX_TASKS_PER_CHILD', '50'))  # Documents before recycling
+    RESUME_MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', '20'))  # PDF pages extracted per resume
+    RESUME_MAX_CHARS = int(os.getenv('RESUME_MAX_CHARS', '100000'))  # Characters kept per resume
+    
+    # Resume Archive (ZIP) Uploads
+    RESUME_ARCHIVE_MAX_MEMBERS = int(os.getenv('RESUME_ARCHIVE_MAX_MEMBERS', '500'))
+    RESUME_ARCHIVE_MAX_BYTES = int(os.getenv('RESUME_ARCHIVE_MAX_BYTES', str(200 * 1024 * 1024)))  # Total uncompressed
+    RESUME_ARCHIVE_COMMIT_SIZE = int(os.getenv('RESUME_ARCHIVE_COMMIT_SIZE', '50'))  # Resumes inserted per commit
+    
+    # Resume Search Index (per-user BM25); defaults to <repo>/resume_index, empty keeps indexes in memory only
+    RESUME_INDEX_DIR = os.getenv('RESUME_INDEX_DIR')
+    RESUME_INDEX_K1 = float(os.getenv('RESUME_INDEX_K1', '1.2'))  # BM25 term frequency saturation
+    RESUME_INDEX_B = float(os.getenv('RESUME_INDEX_B', '0.75'))  # BM25 document length normalisation
     
     # Optional Features
     ENABLE_PLAYWRIGHT = os.getenv('ENABLE_PLAYWRIGHT', 'false').lower() == 'true'
@@ -27,7 +92,9 @@ class Config:
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173').split(',')
     
     # File Upload Configuration
-    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max file size
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', str(5 * 1024 * 1024)))  # 5MB max request body
+    # Larger body limit for the resume archive upload route only
+    RESUME_ARCHIVE_MAX_UPLOAD = int(os.getenv('RESUME_ARCHIVE_MAX_UPLOAD', str(100 * 1024 * 1024)))
     UPLOAD_FOLDER = 'uploads'
     
     # SocketIO Configuration
@@ -51,6 +118,7 @@ class TestingConfig(Config):
     TESTING = True
     DATABASE_URL = 'sqlite:///:memory:'
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
+    RESUME_INDEX_DIR = ''
 
 config = {
     'development': DevelopmentConfig,
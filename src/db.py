@@ -1,7 +1,11 @@
 """Database initialization and management."""
 
+from datetime import datetime
 from flask import Flask
-from models import db
+from sqlalchemy import inspect, text
+from models import db, JobPosting, MatchResult, FetchMetadata, MAX_URL_LENGTH
+from services.search import setup_full_text_search
+from services.urls import canonicalize_url
 
 def init_db(app: Flask):
     """Initialize the database with the Flask app."""
@@ -10,8 +14,125 @@ def init_db(app: Flask):
     with app.app_context():
         # Create all tables if they don't exist
         db.create_all()
+        add_missing_columns()
+        merge_duplicate_job_postings()
+        backfill_features()
+        setup_full_text_search()
         print("Database tables created successfully!")
 
+def add_missing_columns():
+    """
+    Add model columns that are missing from existing tables.
+    
+    `create_all` only creates new tables, so columns added to an existing model
+    are applied here with ALTER TABLE. New columns must be nullable or have a
+    server default.
+    """
+    inspector = inspect(db.engine)
+    # Render defaults the way create_all does, e.g. false() as 0 on SQLite and false on Postgres
+    ddl_compiler = db.engine.dialect.ddl_compiler(db.engine.dialect, None)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=db.engine.dialect)}'
+            default = ddl_compiler.get_column_default_string(column)
+            if default is not None:
+                ddl += f' DEFAULT {default}'
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+            db.session.execute(text(ddl))
+            print(f"Added column {table.name}.{column.name}")
+    db.session.commit()
+    
+    # Indexes on added columns (create_all skips tables that already exist)
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+def merge_duplicate_job_postings():
+    """
+    Fill in canonical URLs of job postings stored before they existed.
+    
+    Postings whose URLs share a canonical form are merged into the oldest one
+    (or the one already holding it): their match results are moved over, the
+    survivor takes the most recently stored content and the others are
+    deleted. Fetch metadata is re-keyed by canonical URL the same way,
+    keeping the latest fetch.
+    """
+    pending = db.session.query(JobPosting.id, JobPosting.url).filter(JobPosting.canonical_url.is_(None)).all()
+    if not pending:
+        return
+    
+    groups = {}
+    for job_id, url in pending:
+        canonical_url = canonicalize_url(url)
+        # Left unset rather than overflowing the column; such postings are not deduplicated
+        if len(canonical_url) <= MAX_URL_LENGTH:
+            groups.setdefault(canonical_url, []).append(job_id)
+    canonical_urls = list(groups)
+    holders = {}
+    for start in range(0, len(canonical_urls), 500):
+        holders.update(db.session.query(JobPosting.canonical_url, JobPosting.id).filter(
+            JobPosting.canonical_url.in_(canonical_urls[start:start + 500])
+        ).all())
+    
+    merged = 0
+    for canonical_url, job_ids in groups.items():
+        survivor_id = holders.get(canonical_url, min(job_ids))
+        duplicate_ids = [job_id for job_id in job_ids if job_id != survivor_id]
+        if not duplicate_ids:
+            JobPosting.query.filter_by(id=survivor_id).update({'canonical_url': canonical_url}, synchronize_session=False)
+            continue
+        
+        MatchResult.query.filter(MatchResult.job_posting_id.in_(duplicate_ids)).update(
+            {'job_posting_id': survivor_id}, synchronize_session=False
+        )
+        postings = JobPosting.query.filter(JobPosting.id.in_([survivor_id] + duplicate_ids)).all()
+        survivor = next(posting for posting in postings if posting.id == survivor_id)
+        latest = max(postings, key=lambda posting: (posting.created_at or datetime.min, posting.id))
+        if latest is not survivor:
+            # Features are recomputed from the new content on next use
+            for field in ('title', 'company', 'description', 'skills_json', 'requirements_json'):
+                setattr(survivor, field, getattr(latest, field))
+        for posting in postings:
+            if posting is not survivor:
+                db.session.delete(posting)
+        survivor.canonical_url = canonical_url
+        merged += len(duplicate_ids)
+    
+    fetch_groups = {}
+    for fetch_meta in FetchMetadata.query.all():
+        canonical_url = canonicalize_url(fetch_meta.url)
+        if len(canonical_url) <= MAX_URL_LENGTH:
+            fetch_groups.setdefault(canonical_url, []).append(fetch_meta)
+    kept = []
+    for canonical_url, fetch_metas in fetch_groups.items():
+        latest = max(fetch_metas, key=lambda fetch_meta: (fetch_meta.fetched_at or datetime.min, fetch_meta.id))
+        for fetch_meta in fetch_metas:
+            if fetch_meta is not latest:
+                db.session.delete(fetch_meta)
+        kept.append((latest, canonical_url))
+    # Delete first so re-keyed rows never collide with the rows they replace
+    db.session.flush()
+    for fetch_meta, canonical_url in kept:
+        fetch_meta.url = canonical_url
+    
+    db.session.commit()
+    if merged:
+        print(f"Merged {merged} duplicate job postings")
+
+def backfill_features():
+    """Store features and near-duplicate signatures for resumes and postings saved before they existed."""
+    from services.resume_features import backfill_resume_features
+    from services.job_features import backfill_job_features
+    backfill_resume_features()
+    backfill_job_features()
+    db.session.commit()
+
 def get_db():
     """Get the database instance."""
     return db
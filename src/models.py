@@ -1,7 +1,13 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import false
+from sqlalchemy.orm import validates
 import json
+from services.urls import canonicalize_url
+
+# Longest stored job URL; canonicalizing can lengthen a URL (http -> https, percent-encoding)
+MAX_URL_LENGTH = 1000
 
 db = SQLAlchemy()
 
@@ -45,10 +51,14 @@ class Resume(db.Model):
     filename = db.Column(db.String(255), nullable=False)
     filepath = db.Column(db.String(500), nullable=False)
     text = db.Column(db.Text, nullable=True)  # Extracted text content
+    extraction_failed = db.Column(db.Boolean, nullable=False, default=False, server_default=false())  # Timed out or over memory budget
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # StoredFile digest; None for legacy uploads
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     match_results = db.relationship('MatchResult', backref='resume', lazy=True, cascade='all, delete-orphan')
+    features = db.relationship('ResumeFeatures', backref='resume', uselist=False, cascade='all, delete-orphan')
+    minhash_buckets = db.relationship('MinHashBucket', backref='resume', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         """Convert resume to dictionary for JSON serialization."""
@@ -57,6 +67,7 @@ class Resume(db.Model):
             'user_id': self.user_id,
             'filename': self.filename,
             'text': self.text,
+            'extraction_failed': self.extraction_failed,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -66,7 +77,9 @@ class JobPosting(db.Model):
     __tablename__ = 'job_postings'
     
     id = db.Column(db.Integer, primary_key=True)
-    url = db.Column(db.String(1000), nullable=False, index=True)
+    url = db.Column(db.String(MAX_URL_LENGTH), nullable=False, index=True)
+    # Set from url; nullable only so existing rows can be filled in by the startup migration
+    canonical_url = db.Column(db.String(MAX_URL_LENGTH), unique=True, nullable=True, index=True)
     title = db.Column(db.String(500), nullable=False)
     company = db.Column(db.String(255), nullable=True)
     description = db.Column(db.Text, nullable=True)
@@ -76,6 +89,17 @@ class JobPosting(db.Model):
     
     # Relationships
     match_results = db.relationship('MatchResult', backref='job_posting', lazy=True, cascade='all, delete-orphan')
+    features = db.relationship('JobFeatures', backref='job_posting', uselist=False, cascade='all, delete-orphan')
+    minhash_buckets = db.relationship('MinHashBucket', backref='job_posting', lazy=True, cascade='all, delete-orphan')
+    
+    @validates('url')
+    def validate_url(self, key, value):
+        """Keep the canonical URL in step with the URL, rejecting URLs either form of which is too long."""
+        canonical_url = canonicalize_url(value)
+        if len(value) > MAX_URL_LENGTH or len(canonical_url) > MAX_URL_LENGTH:
+            raise ValueError(f'URL is longer than {MAX_URL_LENGTH} characters')
+        self.canonical_url = canonical_url
+        return value
     
     @property
     def skills(self):
@@ -112,6 +136,7 @@ class JobPosting(db.Model):
         return {
             'id': self.id,
             'url': self.url,
+            'canonical_url': self.canonical_url,
             'title': self.title,
             'company': self.company,
             'description': self.description,
@@ -132,6 +157,10 @@ class MatchResult(db.Model):
     score = db.Column(db.Integer, nullable=False)  # 0-100 match score
     missing_keywords_json = db.Column(db.Text, nullable=True)  # JSON string of missing keywords
     suggestions_json = db.Column(db.Text, nullable=True)  # JSON string of suggestions
+    source = db.Column(db.String(20), nullable=True)  # 'llm', 'fallback', 'prefilter' or 'reused'
+    reused_from_id = db.Column(db.Integer, nullable=True)  # LLM match a 'reused' result was copied from
+    model = db.Column(db.String(100), nullable=True)  # Model and prompt version behind an 'llm' result
+    prompt_version = db.Column(db.String(20), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     @property
@@ -174,5 +203,145 @@ class MatchResult(db.Model):
             'score': self.score,
             'missing_keywords': self.missing_keywords,
             'suggestions': self.suggestions,
+            'source': self.source,
+            'reused_from_id': self.reused_from_id,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class MatchCacheEntry(db.Model):
+    """Cached LLM match result keyed by a hash of the resume, job and prompt."""
+    
+    __tablename__ = 'match_cache'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False, index=True)  # SHA-256 hex digest
+    model = db.Column(db.String(100), nullable=False)
+    prompt_version = db.Column(db.String(20), nullable=False)
+    score = db.Column(db.Integer, nullable=False)
+    missing_keywords_json = db.Column(db.Text, nullable=True)
+    suggestions_json = db.Column(db.Text, nullable=True)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    @property
+    def missing_keywords(self):
+        """Get missing keywords as a Python list."""
+        if self.missing_keywords_json:
+            try:
+                return json.loads(self.missing_keywords_json)
+            except json.JSONDecodeError:
+                return []
+        return []
+    
+    @missing_keywords.setter
+    def missing_keywords(self, value):
+        """Set missing keywords from a Python list."""
+        self.missing_keywords_json = json.dumps(value) if value else None
+    
+    @property
+    def suggestions(self):
+        """Get suggestions as a Python list."""
+        if self.suggestions_json:
+            try:
+                return json.loads(self.suggestions_json)
+            except json.JSONDecodeError:
+                return []
+        return []
+    
+    @suggestions.setter
+    def suggestions(self, value):
+        """Set suggestions from a Python list."""
+        self.suggestions_json = json.dumps(value) if value else None
+    
+    def to_match_result(self):
+        """Convert the cached entry to the suggest_resume_additions result format."""
+        return {
+            'score': self.score,
+            'missing_keywords': self.missing_keywords,
+            'suggestions': self.suggestions
+        }
+
+class FetchMetadata(db.Model):
+    """HTTP cache validators from the last successful fetch of a job posting URL."""
+    
+    __tablename__ = 'fetch_metadata'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(MAX_URL_LENGTH), unique=True, nullable=False, index=True)  # Canonical URL
+    etag = db.Column(db.String(500), nullable=True)
+    last_modified = db.Column(db.String(100), nullable=True)  # Raw Last-Modified header value
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class StoredFile(db.Model):
+    """Uploaded file content stored once per SHA-256 digest, shared by resumes."""
+    
+    __tablename__ = 'stored_files'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False, index=True)  # Hex digest of the content
+    path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # Resumes pointing at this content
+    text = db.Column(db.Text, nullable=True)  # Cached extracted text
+    text_extracted = db.Column(db.Boolean, nullable=False, default=False)  # Whether `text` is populated
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ResumeFeatures(db.Model):
+    """Scoring features derived from a resume's text, recomputed when the text changes."""
+    
+    __tablename__ = 'resume_features'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), unique=True, nullable=False, index=True)
+    text_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the text the features came from
+    tokens_json = db.Column(db.Text, nullable=True)  # Distinct lowercased keywords, sorted
+    skills_json = db.Column(db.Text, nullable=True)  # Canonical taxonomy skills in order of appearance
+    years_experience = db.Column(db.Integer, nullable=True)
+    sections_json = db.Column(db.Text, nullable=True)  # {"experience": [start, end], ...} character offsets
+    minhash = db.Column(db.LargeBinary, nullable=True)  # MinHash signature of the text; empty if too short, None if not computed yet
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_features(self):
+        """Convert to the feature dict consumed by the scorers."""
+        return {
+            'tokens': json.loads(self.tokens_json) if self.tokens_json else [],
+            'skills': json.loads(self.skills_json) if self.skills_json else [],
+            'years_experience': self.years_experience,
+            'sections': json.loads(self.sections_json) if self.sections_json else {}
+        }
+
+class JobFeatures(db.Model):
+    """Scoring features derived from a job posting, rebuilt when its content changes."""
+    
+    __tablename__ = 'job_features'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_posting_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), unique=True, nullable=False, index=True)
+    content_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the normalized title, description, skills and requirements
+    tokens_json = db.Column(db.Text, nullable=True)  # Distinct lowercased title/description keywords, sorted
+    keyword_count = db.Column(db.Integer, nullable=False, default=0)  # Keyword occurrences including repeats
+    skills_json = db.Column(db.Text, nullable=True)  # [[canonical skill or null, lowercased skill], ...] in posting order
+    requirements_json = db.Column(db.Text, nullable=True)  # [[requirement, [canonical skills]], ...]
+    minhash = db.Column(db.LargeBinary, nullable=True)  # MinHash signature of the title, description, skills and requirements; empty if they have no words, None if not computed yet
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_features(self):
+        """Convert to the feature dict consumed by the scorers."""
+        return {
+            'content_hash': self.content_hash,
+            'tokens': json.loads(self.tokens_json) if self.tokens_json else [],
+            'keyword_count': self.keyword_count,
+            'skill_keys': [tuple(key) for key in json.loads(self.skills_json)] if self.skills_json else [],
+            'requirements': [tuple(requirement) for requirement in json.loads(self.requirements_json)] if self.requirements_json else []
+        }
+
+class MinHashBucket(db.Model):
+    """LSH band bucket of a resume's or job posting's MinHash signature, for near-duplicate lookups."""
+    
+    __tablename__ = 'minhash_buckets'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.BigInteger, nullable=False, index=True)  # Hash of one band of the signature
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=True, index=True)
+    job_posting_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), nullable=True, index=True)
@@ -0,0 +1,75 @@
+"""Streaming access to resume ZIP archives with member and size limits."""
+
+import os
+import zipfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+from services.file_store import read_upload, FileTooLarge
+
+class ArchiveRejected(Exception):
+    """Raised when an archive is unreadable or exceeds its limits."""
+    pass
+
+def is_ignored_member(name: str) -> bool:
+    """Skip OS metadata such as __MACOSX/ folders and dotfiles."""
+    parts = name.replace('\\', '/').split('/')
+    return parts[0] == '__MACOSX' or any(part.startswith('.') for part in parts if part)
+
+def open_archive(stream: BinaryIO, max_members: int, max_total_bytes: int) -> Tuple[zipfile.ZipFile, List[zipfile.ZipInfo]]:
+    """
+    Open a ZIP archive and check its declared limits before anything is read.
+
+    Returns:
+        Tuple of (archive, file members to process in archive order)
+
+    Raises:
+        ArchiveRejected: if the archive is invalid or over the member count or
+            declared uncompressed size
+    """
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise ArchiveRejected('File is not a valid ZIP archive')
+
+    members = [info for info in archive.infolist() if not info.is_dir() and not is_ignored_member(info.filename)]
+    if len(members) > max_members:
+        raise ArchiveRejected(f'Archive has {len(members)} files; at most {max_members} are allowed')
+    if sum(info.file_size for info in members) > max_total_bytes:
+        raise ArchiveRejected(f'Archive expands to more than {max_total_bytes} bytes')
+    return archive, members
+
+def iter_archive_members(archive: zipfile.ZipFile, members: Iterable[zipfile.ZipInfo], allowed_extensions: Iterable[str],
+                         max_file_size: int, max_total_bytes: int) -> Iterator[Tuple[str, Optional[Tuple[str, bytearray]], Optional[str]]]:
+    """
+    Decompress members one at a time, hashing each as it streams.
+
+    Sizes are enforced on the bytes actually decompressed, not the sizes the
+    archive declares, so a member claiming to be small cannot expand past the limits.
+
+    Yields:
+        (member name, (sha256, content) or None if skipped, skip reason or None)
+    """
+    allowed = {extension.lower().lstrip('.') for extension in allowed_extensions}
+    total = 0
+    for info in members:
+        name = info.filename
+        extension = os.path.splitext(name)[1].lower().lstrip('.')
+        if extension not in allowed:
+            yield name, None, 'File type not allowed'
+            continue
+
+        remaining = max_total_bytes - total
+        try:
+            with archive.open(info) as member:
+                sha256, data = read_upload(member, min(max_file_size, remaining))
+        except FileTooLarge:
+            if remaining < max_file_size:
+                raise ArchiveRejected(f'Archive expands to more than {max_total_bytes} bytes')
+            yield name, None, f'File too large. Maximum size is {max_file_size // (1024 * 1024)}MB.'
+            continue
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError, EOFError) as e:
+            # Corrupt data, unsupported compression or an encrypted member
+            yield name, None, f'Could not read file: {e}'
+            continue
+
+        total += len(data)
+        yield name, (sha256, data), None
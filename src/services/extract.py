@@ -1,56 +1,131 @@
 """Text extraction services for resume files."""
 
+import io
 import os
 import pypdf
 import docx2txt
-from typing import Optional
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple, Union
 
-def extract_text_from_pdf(file_path: str) -> Optional[str]:
-    """Extract text from a PDF file."""
+# Called with (pages done, pages to process) after each PDF page
+PageCallback = Callable[[int, int], None]
+
+def iter_pdf_pages(stream: BinaryIO, max_pages: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+    """
+    Yield the text of each PDF page as it is extracted.
+
+    Yields:
+        (page number starting at 1, number of pages to process, page text)
+    """
+    pdf_reader = pypdf.PdfReader(stream)
+    total = len(pdf_reader.pages)
+    if max_pages:
+        total = min(total, max_pages)
+    for index in range(total):
+        yield index + 1, total, pdf_reader.pages[index].extract_text() or ''
+
+def extract_text_from_pdf_stream(stream: BinaryIO, name: str = '<stream>', on_page: Optional[PageCallback] = None,
+                                 max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    Extract text from a PDF in a binary stream.
+
+    Stops after `max_pages` pages or once `max_chars` characters have been
+    captured (defaults from RESUME_MAX_PAGES / RESUME_MAX_CHARS; 0 disables).
+    """
+    max_pages = int(os.getenv('RESUME_MAX_PAGES', '20')) if max_pages is None else max_pages
+    max_chars = int(os.getenv('RESUME_MAX_CHARS', '100000')) if max_chars is None else max_chars
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = pypdf.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+        pages = []
+        chars = 0
+        for page_number, total, page_text in iter_pdf_pages(stream, max_pages):
+            pages.append(page_text)
+            chars += len(page_text) + 1
+            if on_page:
+                on_page(page_number, total)
+            if max_chars and chars >= max_chars:
+                break
+        text = "\n".join(pages).strip()
+        return text[:max_chars] if max_chars else text
+    except MemoryError:
+        raise
     except Exception as e:
-        print(f"Error extracting text from PDF {file_path}: {e}")
+        print(f"Error extracting text from PDF {name}: {e}")
         return None
 
-def extract_text_from_docx(file_path: str) -> Optional[str]:
-    """Extract text from a DOCX file."""
+def extract_text_from_docx_stream(stream: BinaryIO, name: str = '<stream>',
+                                  on_page: Optional[PageCallback] = None) -> Optional[str]:
+    """Extract text from a DOCX in a binary stream (reported as a single page)."""
     try:
-        text = docx2txt.process(file_path)
+        text = docx2txt.process(stream)
+        if on_page:
+            on_page(1, 1)
         return text.strip() if text else None
+    except MemoryError:
+        raise
     except Exception as e:
-        print(f"Error extracting text from DOCX {file_path}: {e}")
+        print(f"Error extracting text from DOCX {name}: {e}")
         return None
 
-def extract_text_from_doc(file_path: str) -> Optional[str]:
-    """Extract text from a DOC file (legacy format)."""
+def extract_text_from_doc_stream(stream: BinaryIO, name: str = '<stream>',
+                                 on_page: Optional[PageCallback] = None) -> Optional[str]:
+    """Extract text from a DOC (legacy format) in a binary stream (reported as a single page)."""
     # For DOC files, we'll try to use docx2txt which sometimes works
     # In a production environment, you might want to use python-docx2txt or antiword
     try:
-        text = docx2txt.process(file_path)
+        text = docx2txt.process(stream)
+        if on_page:
+            on_page(1, 1)
         return text.strip() if text else None
+    except MemoryError:
+        raise
     except Exception as e:
-        print(f"Error extracting text from DOC {file_path}: {e}")
+        print(f"Error extracting text from DOC {name}: {e}")
         return None
 
+def extract_text_from_pdf(file_path: str) -> Optional[str]:
+    """Extract text from a PDF file."""
+    with open(file_path, 'rb') as file:
+        return extract_text_from_pdf_stream(file, file_path)
+
+def extract_text_from_docx(file_path: str) -> Optional[str]:
+    """Extract text from a DOCX file."""
+    with open(file_path, 'rb') as file:
+        return extract_text_from_docx_stream(file, file_path)
+
+def extract_text_from_doc(file_path: str) -> Optional[str]:
+    """Extract text from a DOC file (legacy format)."""
+    with open(file_path, 'rb') as file:
+        return extract_text_from_doc_stream(file, file_path)
+
+STREAM_EXTRACTORS = {
+    '.pdf': extract_text_from_pdf_stream,
+    '.docx': extract_text_from_docx_stream,
+    '.doc': extract_text_from_doc_stream,
+}
+
+def extract_text_from_stream(stream: BinaryIO, file_extension: str, name: str = '<stream>',
+                             on_page: Optional[PageCallback] = None) -> Optional[str]:
+    """
+    Extract text from a binary stream based on the file extension it was uploaded with.
+
+    `on_page` receives per-page progress for PDFs; other formats report one page.
+    """
+    extractor = STREAM_EXTRACTORS.get(file_extension.lower())
+    if extractor is None:
+        print(f"Unsupported file type: {file_extension}")
+        return None
+    return extractor(stream, name, on_page=on_page)
+
+def extract_text_from_bytes(data: Union[bytes, bytearray, memoryview], file_extension: str,
+                            on_page: Optional[PageCallback] = None) -> Optional[str]:
+    """Extract text from file content already in memory."""
+    return extract_text_from_stream(io.BytesIO(data), file_extension, on_page=on_page)
+
 def extract_text_from_file(file_path: str) -> Optional[str]:
     """Extract text from a file based on its extension."""
     if not os.path.exists(file_path):
         return None
-    
+
     file_extension = os.path.splitext(file_path)[1].lower()
-    
-    if file_extension == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif file_extension == '.docx':
-        return extract_text_from_docx(file_path)
-    elif file_extension == '.doc':
-        return extract_text_from_doc(file_path)
-    else:
-        print(f"Unsupported file type: {file_extension}")
-        return None
+
+    with open(file_path, 'rb') as file:
+        return extract_text_from_stream(file, file_extension, file_path)
@@ -0,0 +1,163 @@
+"""Resume text extraction in isolated worker processes with time and memory budgets."""
+
+import multiprocessing
+import threading
+import time
+from typing import Any, Callable, List, Optional
+from services.extract import extract_text_from_bytes
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; the memory cap is skipped there
+    resource = None
+
+class ExtractionFailed(Exception):
+    """Raised when a document could not be extracted within its budget."""
+    pass
+
+class ExtractionTimeout(ExtractionFailed):
+    """Raised when a document exceeds the per-document wall-clock timeout."""
+    pass
+
+def _worker_main(conn, target: Callable[..., Any], memory_limit: int, max_tasks: int):
+    """
+    Worker process loop: apply the memory cap, then run tasks from the pipe.
+
+    Exits after `max_tasks` tasks, or after a MemoryError since the interpreter
+    state is suspect at that point.
+    """
+    if resource is not None and memory_limit > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    for _ in range(max_tasks):
+        try:
+            args, report_progress = conn.recv()
+        except EOFError:
+            return
+        try:
+            if report_progress:
+                result = target(*args, on_page=lambda *progress: conn.send(('progress', progress)))
+            else:
+                result = target(*args)
+            conn.send(('ok', result))
+        except MemoryError:
+            conn.send(('memory', 'Memory limit exceeded'))
+            return
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, target: Callable[..., Any], memory_limit: int, max_tasks: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, target, memory_limit, max_tasks),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks_left = max_tasks
+
+    def stop(self):
+        """Kill the process if it is still running and release the pipe."""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+class ExtractionPool:
+    """
+    Pool of worker processes for text extraction.
+
+    Each document runs in a worker with an RLIMIT_AS memory cap and a wall-clock
+    timeout. A worker that times out or dies is killed and replaced, so a
+    pathological file only costs its own request. Workers are recycled after
+    `max_tasks_per_child` documents. Processes are started on first use.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 30, memory_limit_mb: int = 512,
+                 max_tasks_per_child: int = 50, target: Callable[..., Any] = extract_text_from_bytes):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit_mb * 1024 * 1024
+        self.max_tasks_per_child = max(1, max_tasks_per_child)
+        self.target = target
+        # Spawned, not forked, so workers don't inherit the server's threads and sockets
+        self._context = multiprocessing.get_context('spawn')
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._closed = False
+
+    def _checkout(self) -> _Worker:
+        """Take an idle worker or start a new one. Caller holds a slot."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self._context, self.target, self.memory_limit, self.max_tasks_per_child)
+
+    def _checkin(self, worker: _Worker):
+        """Return a healthy worker to the idle list, or retire it."""
+        with self._lock:
+            if not self._closed and worker.tasks_left > 0:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def extract(self, *args, timeout: Optional[float] = None,
+                on_progress: Optional[Callable[..., None]] = None) -> Any:
+        """
+        Run the extraction target with `args` in a worker process.
+
+        With the default target the arguments are the file content and its
+        extension, e.g. extract(data, '.pdf'). If `on_progress` is given the target
+        is passed an `on_page` callback, and each report from the worker is
+        forwarded to `on_progress` on the calling thread. The timeout covers the
+        whole document.
+
+        Raises:
+            ExtractionTimeout: if the document took longer than the timeout
+            ExtractionFailed: if the worker ran out of memory, crashed or raised
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._slots:
+            worker = self._checkout()
+            try:
+                worker.conn.send((args, on_progress is not None))
+                worker.tasks_left -= 1
+                deadline = time.monotonic() + timeout
+                while True:
+                    if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                        worker.stop()
+                        raise ExtractionTimeout(f'Extraction timed out after {timeout}s')
+                    status, value = worker.conn.recv()
+                    if status != 'progress':
+                        break
+                    try:
+                        on_progress(*value)
+                    except Exception:
+                        # The worker is still mid-document, so it cannot be reused
+                        worker.stop()
+                        raise
+            except (EOFError, OSError):
+                # The worker died mid-task (killed by the OS, segfault, os._exit)
+                worker.stop()
+                raise ExtractionFailed('Extraction worker exited unexpectedly')
+
+            if status == 'memory':
+                worker.stop()
+            else:
+                self._checkin(worker)
+            if status != 'ok':
+                raise ExtractionFailed(value)
+            return value
+
+    def shutdown(self):
+        """Stop all idle workers; workers in use are stopped when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
@@ -0,0 +1,133 @@
+"""Structured job posting extractors: JSON-LD fast path and per-domain registry."""
+
+import html
+import json
+import re
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+
+# Matches <script type="application/ld+json"> blocks in raw HTML bytes
+JSON_LD_PATTERN = re.compile(
+    rb'<script[^>]*type\s*=\s*["\']application/ld\+json["\'][^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Domain -> extractor(soup, url) returning a partial dict of title/company/description
+_extractors: Dict[str, Callable[[BeautifulSoup, str], Dict[str, Optional[str]]]] = {}
+
+def register_extractor(domain: str):
+    """
+    Register a job page extractor for a domain and its subdomains.
+
+    Usage:
+        @register_extractor('boards.greenhouse.io')
+        def extract_greenhouse(soup, url):
+            return {'title': ..., 'company': ..., 'description': ...}
+    """
+    def decorator(fn):
+        _extractors[domain.lower()] = fn
+        return fn
+    return decorator
+
+def get_domain_extractor(url: str) -> Optional[Callable[[BeautifulSoup, str], Dict[str, Optional[str]]]]:
+    """Find the extractor registered for the URL's host or its closest parent domain."""
+    host = (urlparse(url).hostname or '').lower()
+    parts = host.split('.')
+    for i in range(len(parts) - 1):
+        extractor = _extractors.get('.'.join(parts[i:]))
+        if extractor:
+            return extractor
+    return None
+
+def html_to_text(markup: str) -> str:
+    """Convert an HTML fragment (possibly entity-escaped) to newline-separated text."""
+    if '&lt;' in markup:
+        markup = html.unescape(markup)
+    return BeautifulSoup(markup, 'html.parser').get_text(separator='\n', strip=True)
+
+def _iter_json_ld_nodes(data):
+    """Yield every object in a JSON-LD document, descending into lists and @graph."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _iter_json_ld_nodes(data['@graph'])
+
+def _is_job_posting(node: Dict) -> bool:
+    """Check if a JSON-LD node is a schema.org JobPosting."""
+    node_type = node.get('@type')
+    types = node_type if isinstance(node_type, list) else [node_type]
+    return 'JobPosting' in types
+
+def _as_text(value) -> Optional[str]:
+    """Flatten a JSON-LD text value (string, list or object) to a string."""
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, list):
+        parts = [_as_text(item) for item in value]
+        return '\n'.join(part for part in parts if part) or None
+    if isinstance(value, dict):
+        return _as_text(value.get('name') or value.get('description'))
+    return None
+
+def extract_json_ld_job(content: bytes) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Read a schema.org JobPosting from the page's JSON-LD without building a DOM.
+
+    Returns:
+        Dict with title, company, description and extra_text (skills and
+        qualification fields for skill/requirement extraction), or None
+    """
+    for match in JSON_LD_PATTERN.finditer(content):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+
+        for node in _iter_json_ld_nodes(data):
+            if not _is_job_posting(node):
+                continue
+
+            organization = node.get('hiringOrganization')
+            company = _as_text(organization) if organization else None
+            description = _as_text(node.get('description'))
+            extra = [_as_text(node.get(field)) for field in
+                     ('skills', 'qualifications', 'experienceRequirements', 'educationRequirements')]
+
+            return {
+                'title': _as_text(node.get('title')),
+                'company': company,
+                'description': html_to_text(description) if description else None,
+                'extra_text': '\n'.join(text for text in extra if text) or None
+            }
+    return None
+
+def _select_text(soup: BeautifulSoup, selector: str, separator: str = ' ') -> Optional[str]:
+    """Get the stripped text of the first element matching a selector."""
+    element = soup.select_one(selector)
+    if element:
+        return element.get_text(separator=separator, strip=True) or None
+    return None
+
+@register_extractor('boards.greenhouse.io')
+def extract_greenhouse(soup: BeautifulSoup, url: str) -> Dict[str, Optional[str]]:
+    """Greenhouse hosted job boards."""
+    return {
+        'title': _select_text(soup, '#header .app-title'),
+        'company': _select_text(soup, '#header .company-name'),
+        'description': _select_text(soup, '#content', separator='\n')
+    }
+
+@register_extractor('jobs.lever.co')
+def extract_lever(soup: BeautifulSoup, url: str) -> Dict[str, Optional[str]]:
+    """Lever hosted job boards; the company slug is the first path segment."""
+    path_parts: List[str] = [part for part in urlparse(url).path.split('/') if part]
+    return {
+        'title': _select_text(soup, '.posting-headline h2'),
+        'company': path_parts[0].replace('-', ' ').title() if path_parts else None,
+        'description': _select_text(soup, '[data-qa="job-description"]', separator='\n')
+                       or _select_text(soup, '.section-wrapper.page-full-width', separator='\n')
+    }
@@ -0,0 +1,146 @@
+"""Content-addressed storage for uploaded files with reference counting."""
+
+import hashlib
+import os
+import uuid
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from models import db, StoredFile, Resume
+
+READ_CHUNK_SIZE = 64 * 1024
+
+class FileTooLarge(Exception):
+    """Raised when an upload exceeds the maximum file size."""
+    pass
+
+def read_upload(stream: BinaryIO, max_size: int) -> Tuple[str, bytearray]:
+    """
+    Read an upload stream once, hashing it and enforcing the size limit as it goes.
+
+    Returns:
+        Tuple of (SHA-256 hex digest, content buffer)
+
+    Raises:
+        FileTooLarge: as soon as more than `max_size` bytes have been read
+    """
+    digest = hashlib.sha256()
+    data = bytearray()
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(data) + len(chunk) > max_size:
+            raise FileTooLarge(f'File exceeds {max_size} bytes')
+        digest.update(chunk)
+        data += chunk
+    return digest.hexdigest(), data
+
+def blob_path(upload_dir: str, sha256: str, extension: str) -> str:
+    """Sharded location for a digest: <upload_dir>/ab/cd/abcd...<extension>."""
+    return os.path.join(upload_dir, sha256[:2], sha256[2:4], sha256 + extension)
+
+def write_blob(path: str, data: bytearray):
+    """Write content under a temporary name and move it into place atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def acquire_blob(upload_dir: str, stream: BinaryIO, extension: str, max_size: int) -> Tuple[StoredFile, bytearray]:
+    """
+    Store an upload's content if it is new and take a reference to it.
+
+    The stream is read once; identical content is written to disk once and later
+    uploads only increment the reference count. The content buffer is returned so
+    text can be extracted without reading the file back. The caller commits.
+
+    Returns:
+        Tuple of (StoredFile with the reference already counted, content buffer)
+
+    Raises:
+        FileTooLarge: if the upload exceeds `max_size` bytes
+    """
+    sha256, data = read_upload(stream, max_size)
+    return store_blob(upload_dir, sha256, data, extension), data
+
+def store_blob(upload_dir: str, sha256: str, data: bytearray, extension: str) -> StoredFile:
+    """
+    Store already-hashed content if it is new and take a reference to it.
+
+    Returns:
+        The StoredFile for the content, with the reference already counted
+    """
+    stored = StoredFile.query.filter_by(sha256=sha256).first()
+
+    if stored is None or not os.path.exists(stored.path):
+        write_blob(stored.path if stored else blob_path(upload_dir, sha256, extension), data)
+
+    if stored is None:
+        stored = StoredFile(sha256=sha256, path=blob_path(upload_dir, sha256, extension), size=len(data), ref_count=0)
+        try:
+            # Savepoint so a concurrent upload of the same content doesn't abort the caller's transaction
+            with db.session.begin_nested():
+                db.session.add(stored)
+        except IntegrityError:
+            stored = StoredFile.query.filter_by(sha256=sha256).one()
+
+    # Atomic increment so concurrent uploads of the same content don't lose a reference
+    StoredFile.query.filter_by(id=stored.id).update({'ref_count': StoredFile.ref_count + 1})
+    db.session.refresh(stored)
+    return stored
+
+def release_resume_file(resume: Resume) -> Optional[str]:
+    """
+    Drop a resume's reference to its file, deleting the record once unreferenced.
+
+    Resumes uploaded before content addressing own their file outright. The
+    caller commits, then passes the returned path to remove_file so a failed
+    commit never leaves records pointing at deleted content.
+
+    Returns:
+        Path of the file to remove after the commit, or None if it is still referenced
+    """
+    if not resume.content_hash:
+        return resume.filepath
+
+    stored = StoredFile.query.filter_by(sha256=resume.content_hash).first()
+    if stored is None:
+        return None
+
+    StoredFile.query.filter_by(id=stored.id).update({'ref_count': StoredFile.ref_count - 1})
+    db.session.refresh(stored)
+    if stored.ref_count <= 0:
+        db.session.delete(stored)
+        return stored.path
+    return None
+
+def remove_file(path: Optional[str]):
+    """Delete a released file from disk if it is still there."""
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def discard_unreferenced_blobs(blobs: Dict[str, str]) -> List[str]:
+    """
+    Drop records of rolled-back uploads that no committed resume references.
+
+    Call after rolling back. A new record's insert can outlive the rollback
+    (pysqlite commits a savepoint opened outside a transaction), so records
+    left with no references are deleted. The caller commits, then passes the
+    returned paths to remove_file.
+
+    Args:
+        blobs: sha256 -> path of the files written by the rolled-back uploads
+
+    Returns:
+        Paths no longer referenced by any record
+    """
+    orphaned = []
+    for sha256, path in blobs.items():
+        stored = StoredFile.query.filter_by(sha256=sha256).first()
+        if stored is not None and stored.ref_count <= 0:
+            db.session.delete(stored)
+            stored = None
+        if stored is None:
+            orphaned.append(path)
+    return orphaned
@@ -0,0 +1,125 @@
+"""Job posting features computed once per posting and reused for every candidate."""
+
+import hashlib
+import json
+from typing import Dict, Optional
+from sqlalchemy import or_
+from models import db, JobPosting, JobFeatures
+from services.llm import KEYWORD_PATTERN, job_skill_keys
+from services.match_cache import normalize_text
+from services.skills import extract_skills_from_text
+import numpy as np
+from services.near_duplicates import compute_minhash, signature_to_bytes, signature_from_bytes, index_signature
+
+def compute_job_content_hash(job_json: Dict) -> str:
+    """Hash the job fields that scoring and the match prompt depend on."""
+    payload = {
+        'title': normalize_text(job_json.get('title', '')),
+        'description': normalize_text(job_json.get('description', '')),
+        'skills': job_json.get('skills') or [],
+        'requirements': job_json.get('requirements') or []
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def parse_requirement(requirement: str) -> tuple:
+    """Split a requirement line into (text, canonical skills mentioned in it)."""
+    return requirement, extract_skills_from_text(requirement)
+
+def compute_job_features(job_json: Dict) -> Dict:
+    """
+    Derive scoring features from job posting data.
+
+    Returns:
+        Dict with content_hash, tokens (distinct keywords, sorted), keyword_count
+        (occurrences including repeats), skill_keys ([(canonical or None, lowercased)]
+        aligned with the job's skills) and requirements ([(text, canonical skills)])
+    """
+    job_lower = f"{job_json.get('title', '')} {job_json.get('description', '')}".lower()
+    job_keywords = KEYWORD_PATTERN.findall(job_lower)
+    return {
+        'content_hash': compute_job_content_hash(job_json),
+        'tokens': sorted(set(job_keywords)),
+        'keyword_count': len(job_keywords),
+        'skill_keys': job_skill_keys(job_json.get('skills') or []),
+        'requirements': [parse_requirement(requirement) for requirement in job_json.get('requirements') or []]
+    }
+
+def job_signature_text(job_json: Dict) -> str:
+    """Text a posting's MinHash signature is built from: every field the match prompt sees."""
+    return '\n'.join([
+        job_json.get('title') or '',
+        job_json.get('description') or '',
+        ' '.join(job_json.get('skills') or []),
+        '\n'.join(job_json.get('requirements') or [])
+    ])
+
+def posting_job_json(job_posting: JobPosting) -> Dict:
+    """The fields of a stored posting that features are computed from."""
+    return {
+        'title': job_posting.title,
+        'description': job_posting.description,
+        'skills': job_posting.skills,
+        'requirements': job_posting.requirements
+    }
+
+def ensure_job_features(job_posting: JobPosting) -> Dict:
+    """
+    Get a job posting's stored features, computing them if missing or stale.
+
+    The posting's MinHash signature and LSH buckets are refreshed along with
+    them. The caller commits.
+    """
+    job_json = posting_job_json(job_posting)
+    content_hash = compute_job_content_hash(job_json)
+    record = job_posting.features
+    if is_current(record, content_hash):
+        return record.to_features()
+
+    features = compute_job_features(job_json)
+    if record is None:
+        record = JobFeatures(job_posting=job_posting)
+        db.session.add(record)
+    record.content_hash = content_hash
+    record.tokens_json = json.dumps(features['tokens'])
+    record.keyword_count = features['keyword_count']
+    record.skills_json = json.dumps(features['skill_keys'])
+    record.requirements_json = json.dumps(features['requirements'])
+    signature = compute_minhash(job_signature_text(job_json))
+    record.minhash = signature_to_bytes(signature)
+    index_signature(job_posting, signature)
+    return features
+
+def is_current(record: Optional[JobFeatures], content_hash: str) -> bool:
+    """Check if stored features (and their MinHash signature) match the posting's content."""
+    return record is not None and record.content_hash == content_hash and record.minhash is not None
+
+def read_job_features(job_posting: JobPosting) -> Dict:
+    """Get a posting's stored features if current, otherwise compute them without storing (for read-only requests)."""
+    job_json = posting_job_json(job_posting)
+    record = job_posting.features
+    if is_current(record, compute_job_content_hash(job_json)):
+        return record.to_features()
+    return compute_job_features(job_json)
+
+def read_job_signature(job_posting: JobPosting) -> Optional[np.ndarray]:
+    """Get a posting's stored MinHash signature if current, otherwise compute it without storing."""
+    job_json = posting_job_json(job_posting)
+    record = job_posting.features
+    if is_current(record, compute_job_content_hash(job_json)):
+        return signature_from_bytes(record.minhash)
+    return compute_minhash(job_signature_text(job_json))
+
+def load_job_features(job_posting: Optional[JobPosting], job_json: Dict) -> Dict:
+    """Get features for a stored posting, or compute them for ad-hoc job data."""
+    if job_posting is None:
+        return compute_job_features(job_json)
+    return ensure_job_features(job_posting)
+
+def backfill_job_features():
+    """Compute features and signatures for postings stored before they existed (the caller commits)."""
+    missing = JobPosting.query.outerjoin(JobFeatures).filter(
+        or_(JobFeatures.id.is_(None), JobFeatures.minhash.is_(None))
+    ).all()
+    for job_posting in missing:
+        ensure_job_features(job_posting)
@@ -0,0 +1,220 @@
+"""Vectorized index of job posting features for ranking every posting against one resume."""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import joinedload
+from models import JobPosting
+from services.job_features import ensure_job_features, read_job_features
+from services.llm import KEYWORD_PATTERN
+from services.resume_index import STOP_WORDS
+
+# Share of the score from each feature group; groups a posting lacks are left out and the rest rescaled
+SKILL_WEIGHT = 0.5
+REQUIREMENT_WEIGHT = 0.3
+TITLE_WEIGHT = 0.2
+
+# Words nearly every requirement line or title uses; they say nothing about fit
+TERM_STOP_WORDS = STOP_WORDS | frozenset((
+    'ability', 'able', 'building', 'excellent', 'experience', 'knowledge', 'plus', 'preferred',
+    'proven', 'required', 'senior', 'skills', 'solid', 'strong', 'understanding', 'work', 'working',
+    'years'
+))
+
+EPOCH = datetime(1970, 1, 1)
+
+def index_terms(text: str) -> List[str]:
+    """Distinct keywords of a requirement line or title, without stop words, sorted."""
+    return sorted(set(KEYWORD_PATTERN.findall((text or '').lower())) - TERM_STOP_WORDS)
+
+class JobIndex:
+    """
+    Job postings as a flat list of weighted features, scored with numpy.
+
+    Every posting contributes one entry per canonical skill (listed or named in a
+    requirement), requirement keyword
+    and title keyword, weighted so a posting whose features are all present in a
+    resume scores 100. Scoring a resume marks its features in a vocabulary-sized
+    mask and sums the matched entry weights per posting with one bincount over
+    all entries. Updated postings get a new row and their old row is masked out;
+    dead rows are compacted away once they outnumber live ones.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.vocabulary: Dict[str, int] = {}
+        self.job_ids: List[int] = []
+        self.row_skills: List[List[str]] = []
+        self._job_rows: Dict[int, int] = {}
+        self._alive: List[bool] = []
+        self._companies: List[str] = []
+        self._created: List[float] = []
+        # Per-row (columns, weights) not yet merged into the flat arrays
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending_start = 0
+        self._rows = np.zeros(0, dtype=np.int32)
+        self._columns = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._company_array = np.zeros(0, dtype=str)
+        self._created_array = np.zeros(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._job_rows)
+
+    def _feature_ids(self, keys: List[str], grow: bool) -> List[int]:
+        """Map feature keys to vocabulary columns, adding new ones if `grow`."""
+        ids = []
+        for key in keys:
+            column = self.vocabulary.get(key)
+            if column is None and grow:
+                column = self.vocabulary[key] = len(self.vocabulary)
+            if column is not None:
+                ids.append(column)
+        return ids
+
+    def _add_row(self, job_posting: JobPosting, features: Dict):
+        """Append a posting's weighted features as a new row."""
+        # Skills named in requirement lines count like listed skills
+        skills = sorted({canonical for canonical, _ in features['skill_keys'] if canonical} |
+                        {skill for _, requirement_skills in features['requirements'] for skill in requirement_skills})
+        requirement_terms = sorted({
+            term for requirement, _ in features['requirements'] for term in index_terms(requirement)
+        })
+        title_terms = index_terms(job_posting.title)
+
+        groups = [(SKILL_WEIGHT, [f's:{skill}' for skill in skills]),
+                  (REQUIREMENT_WEIGHT, [f't:{term}' for term in requirement_terms]),
+                  (TITLE_WEIGHT, [f't:{term}' for term in title_terms])]
+        total_weight = sum(weight for weight, keys in groups if keys)
+
+        columns = []
+        weights = []
+        for weight, keys in groups:
+            if keys:
+                columns.extend(self._feature_ids(keys, grow=True))
+                weights.extend([100 * weight / total_weight / len(keys)] * len(keys))
+
+        row = len(self.job_ids)
+        self.job_ids.append(job_posting.id)
+        self.row_skills.append(skills)
+        self._job_rows[job_posting.id] = row
+        self._alive.append(True)
+        self._companies.append((job_posting.company or '').strip().lower())
+        # Stored timestamps are naive UTC
+        self._created.append(((job_posting.created_at or datetime.utcnow()) - EPOCH).total_seconds())
+        self._pending.append((np.array(columns, dtype=np.int32), np.array(weights, dtype=np.float32)))
+
+    def _merge_pending(self):
+        """Fold rows added since the last query into the flat entry arrays."""
+        if not self._pending:
+            return
+        lengths = [len(columns) for columns, _ in self._pending]
+        rows = np.repeat(np.arange(self._pending_start, self._pending_start + len(self._pending), dtype=np.int32), lengths)
+        self._rows = np.concatenate([self._rows, rows])
+        self._columns = np.concatenate([self._columns] + [columns for columns, _ in self._pending])
+        self._weights = np.concatenate([self._weights] + [weights for _, weights in self._pending])
+        self._company_array = np.array(self._companies)
+        self._created_array = np.array(self._created, dtype=np.float64)
+        self._pending = []
+        self._pending_start = len(self.job_ids)
+
+    def _compact(self):
+        """Drop rows of updated or deleted postings."""
+        self._merge_pending()
+        alive = np.array(self._alive, dtype=bool)
+        new_rows = np.cumsum(alive, dtype=np.int64) - 1
+        keep = alive[self._rows]
+        self._rows = new_rows[self._rows[keep]].astype(np.int32)
+        self._columns = self._columns[keep]
+        self._weights = self._weights[keep]
+        live = np.flatnonzero(alive)
+        self.job_ids = [self.job_ids[row] for row in live]
+        self.row_skills = [self.row_skills[row] for row in live]
+        self._companies = [self._companies[row] for row in live]
+        self._created = [self._created[row] for row in live]
+        self._alive = [True] * len(live)
+        self._job_rows = {job_id: row for row, job_id in enumerate(self.job_ids)}
+        self._company_array = np.array(self._companies)
+        self._created_array = np.array(self._created, dtype=np.float64)
+        self._pending_start = len(self.job_ids)
+
+    def _ensure_loaded(self):
+        """Index every stored posting on first use from its stored features (needs an app context)."""
+        if self._loaded:
+            return
+        for job_posting in JobPosting.query.options(joinedload(JobPosting.features)).all():
+            self._add_row(job_posting, read_job_features(job_posting))
+        self._loaded = True
+
+    def upsert(self, job_posting: JobPosting, features: Optional[Dict] = None):
+        """Index a new or updated posting; a no-op until the index is first loaded."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._discard(job_posting.id)
+            self._add_row(job_posting, features or ensure_job_features(job_posting))
+
+    def remove(self, job_id: int):
+        """Forget a deleted posting."""
+        with self._lock:
+            self._discard(job_id)
+
+    def _discard(self, job_id: int):
+        """Mask out a posting's current row."""
+        row = self._job_rows.pop(job_id, None)
+        if row is not None:
+            self._alive[row] = False
+
+    def top_jobs(self, resume_features: Dict, k: int, company: Optional[str] = None,
+                 max_age_days: Optional[float] = None) -> List[Dict]:
+        """
+        Score every posting against a resume and return the k best, best first.
+
+        Args:
+            resume_features: Features from services.resume_features (skills and tokens)
+            k: Number of postings to return
+            company: Only postings from this company (case-insensitive)
+            max_age_days: Only postings stored within this many days
+
+        Returns:
+            List of {job_posting_id, score, matching_skills} dicts; postings with no
+            matching features are left out
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if len(self._alive) > 2 * len(self._job_rows) + 64:
+                self._compact()
+            self._merge_pending()
+            if not self._job_rows:
+                return []
+
+            resume_keys = [f's:{skill}' for skill in resume_features['skills']] + \
+                          [f't:{token}' for token in resume_features['tokens']]
+            present = np.zeros(len(self.vocabulary), dtype=bool)
+            present[self._feature_ids(resume_keys, grow=False)] = True
+
+            n_rows = len(self.job_ids)
+            scores = np.bincount(self._rows, weights=self._weights * present[self._columns], minlength=n_rows)
+
+            mask = np.array(self._alive, dtype=bool) & (scores > 0)
+            if company:
+                mask &= self._company_array == company.strip().lower()
+            if max_age_days is not None:
+                mask &= self._created_array >= (datetime.utcnow() - timedelta(days=max_age_days) - EPOCH).total_seconds()
+
+            candidates = np.flatnonzero(mask)
+            if len(candidates) > k:
+                # Keep every posting tied with the k-th score so the tie-break below decides
+                kth_score = -np.partition(-scores[candidates], k - 1)[k - 1]
+                candidates = candidates[scores[candidates] >= kth_score]
+            # Best first; ties go to the most recently indexed posting
+            order = sorted(candidates, key=lambda row: (-scores[row], -row))[:k]
+
+            resume_skills = set(resume_features['skills'])
+            return [{
+                'job_posting_id': self.job_ids[row],
+                'score': round(float(scores[row]), 1),
+                'matching_skills': [skill for skill in self.row_skills[row] if skill in resume_skills]
+            } for row in order]
@@ -3,10 +3,116 @@
 import os
 import json
 import re
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
+import httpx
+import numpy as np
+import openai
 from openai import OpenAI
+from services.rate_limit import RateLimiter, call_with_retries
+from services.skills import get_skill_matcher
 
-def suggest_resume_additions(resume_text: str, job_json: Dict, model: str = None) -> Dict:
+MAX_COMPLETION_TOKENS = 1000
+
+# Words of four or more characters used by the keyword fallback scorer
+KEYWORD_PATTERN = re.compile(r'\b\w{4,}\b')
+
+# Bump whenever the prompts change so cached match results are invalidated
+PROMPT_VERSION = '2'
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+# Process-wide OpenAI clients keyed by (api_key, base_url) so HTTP connections are reused
+_clients: Dict[Tuple[str, Optional[str]], OpenAI] = {}
+_clients_lock = threading.Lock()
+
+def get_openai_client(api_key: str, base_url: str = None) -> OpenAI:
+    """
+    Get a shared OpenAI client for the given key and base URL, creating it on first use.
+    
+    The underlying httpx connection pool is sized and timed from the environment and is
+    safe to share between threads.
+    """
+    base_url = base_url or os.getenv('OPENAI_BASE_URL') or None
+    key = (api_key, base_url)
+    
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                pool_size = int(os.getenv('OPENAI_POOL_SIZE', '20'))
+                # The client's timeout is applied to every request, overriding the transport's
+                timeout = httpx.Timeout(float(os.getenv('OPENAI_TIMEOUT', '60')),
+                                        connect=float(os.getenv('OPENAI_CONNECT_TIMEOUT', '10')))
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=pool_size,
+                        max_keepalive_connections=pool_size,
+                        keepalive_expiry=float(os.getenv('OPENAI_KEEPALIVE', '30'))
+                    ),
+                    timeout=timeout
+                )
+                # Retries are handled by call_with_retries with jittered backoff
+                client = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    max_retries=0,
+                    timeout=timeout,
+                    http_client=http_client
+                )
+                _clients[key] = client
+    return client
+
+def close_openai_clients():
+    """Close all pooled OpenAI clients and their HTTP connections."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide OpenAI rate limiter, creating it on first use."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(
+                    requests_per_minute=int(os.getenv('OPENAI_RPM_LIMIT', '500')),
+                    tokens_per_minute=int(os.getenv('OPENAI_TPM_LIMIT', '200000'))
+                )
+    return _rate_limiter
+
+def get_model_name(model: str = None) -> str:
+    """Resolve the OpenAI model to use from the argument or environment."""
+    return model or os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+
+def estimate_tokens(*texts: str) -> int:
+    """Roughly estimate prompt tokens (about 4 characters per token)."""
+    return sum(len(text) for text in texts if text) // 4 + 1
+
+def is_retryable_error(error: Exception) -> bool:
+    """Check if an OpenAI error is transient (429, 5xx or connection failure)."""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Get the server-suggested retry delay in seconds, if any."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def suggest_resume_additions(resume_text: str, job_json: Dict, model: str = None, resume_features: Dict = None,
+                             job_features: Dict = None) -> Dict:
     """
     Use OpenAI to analyze resume against job requirements and provide suggestions.
     
@@ -14,22 +120,27 @@ def suggest_resume_additions(resume_text: str, job_json: Dict, model: str = None
         resume_text: The extracted text from the resume
         job_json: Job posting data with title, description, skills, requirements
         model: OpenAI model to use (defaults to env var or gpt-4o-mini)
+        resume_features: Precomputed resume features; computed if omitted
+        job_features: Precomputed job features (see services.job_features); computed if omitted
     
     Returns:
         Dict with score (0-100), missing_keywords, and suggestions
     """
     # Get model from parameter or environment
-    if not model:
-        model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+    model = get_model_name(model)
+    
+    if resume_features is None:
+        from services.resume_features import compute_resume_features
+        resume_features = compute_resume_features(resume_text)
     
     # Check if OpenAI API key is available
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
         # Return fallback response if no API key
-        return get_fallback_response(resume_text, job_json)
+        return get_fallback_response(resume_text, job_json, resume_features, job_features)
     
     try:
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         
         # Build the system prompt
         system_prompt = """You are a resume analysis expert. Analyze the provided resume against the job requirements and return a JSON response with exactly this structure:
@@ -53,26 +164,43 @@ Be specific and practical in your suggestions."""
         job_description = job_json.get('description', '')
         job_skills = job_json.get('skills', [])
         job_requirements = job_json.get('requirements', [])
+        resume_skills = resume_features['skills']
+        years_experience = resume_features['years_experience']
         
         user_prompt = f"""Job Title: {job_title}
 Job Description: {job_description}
 Required Skills: {', '.join(job_skills) if job_skills else 'Not specified'}
 Requirements: {', '.join(job_requirements) if job_requirements else 'Not specified'}
 
+Candidate Skills: {', '.join(resume_skills) if resume_skills else 'None detected'}
+Years of Experience: {years_experience if years_experience is not None else 'Not stated'}
+
 Resume Text:
 {resume_text}
 
 Please analyze this resume against the job requirements and provide your assessment in the exact JSON format specified."""
 
-        # Make the API call
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1000
+        # Make the API call, waiting for rate limit capacity before each attempt
+        limiter = get_rate_limiter()
+        token_estimate = estimate_tokens(system_prompt, user_prompt) + MAX_COMPLETION_TOKENS
+        
+        def create_completion():
+            limiter.acquire(token_estimate)
+            return client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.3,
+                max_tokens=MAX_COMPLETION_TOKENS
+            )
+        
+        response = call_with_retries(
+            create_completion,
+            is_retryable_error,
+            max_retries=int(os.getenv('OPENAI_MAX_RETRIES', '3')),
+            retry_after=get_retry_after
         )
         
         # Extract and parse the response
@@ -88,49 +216,77 @@ Please analyze this resume against the job requirements and provide your assessm
             return validate_and_clean_response(result)
         else:
             # If no JSON found, return fallback
-            return get_fallback_response(resume_text, job_json)
+            return get_fallback_response(resume_text, job_json, resume_features, job_features)
             
     except Exception as e:
         print(f"Error calling OpenAI API: {e}")
-        return get_fallback_response(resume_text, job_json)
+        return get_fallback_response(resume_text, job_json, resume_features, job_features)
+
+def job_skill_keys(job_skills: List[str]) -> List[Tuple[Optional[str], str]]:
+    """Resolve job skills once: (canonical taxonomy name or None, lowercased skill)."""
+    matcher = get_skill_matcher()
+    return [(matcher.canonicalize(skill), skill.lower()) for skill in job_skills]
+
+def skill_hits(skill_keys: List[Tuple[Optional[str], str]], resume_skills: frozenset, resume_text: str) -> List[bool]:
+    """
+    Check which job skills a resume has.
+
+    Taxonomy skills are looked up in the resume's detected skills, so synonyms
+    count and "Java" does not match "JavaScript". Skills outside the taxonomy
+    fall back to a substring check on the text.
+    """
+    resume_lower = None
+    hits = []
+    for canonical, skill_lower in skill_keys:
+        if canonical is not None:
+            hits.append(canonical in resume_skills)
+        else:
+            if resume_lower is None:
+                resume_lower = (resume_text or '').lower()
+            hits.append(skill_lower in resume_lower)
+    return hits
 
-def get_fallback_response(resume_text: str, job_json: Dict) -> Dict:
+def get_fallback_response(resume_text: str, job_json: Dict, resume_features: Dict = None,
+                          job_features: Dict = None) -> Dict:
     """
     Provide a fallback response when OpenAI API is not available.
     Uses basic keyword matching for a baseline score.
+    
+    Args:
+        resume_text: The extracted text from the resume
+        job_json: Job posting data with title, description, skills
+        resume_features: Precomputed features (see services.resume_features); computed if omitted
+        job_features: Precomputed features (see services.job_features); computed if omitted
     """
+    if resume_features is None:
+        from services.resume_features import compute_resume_features
+        resume_features = compute_resume_features(resume_text)
+    if job_features is None:
+        from services.job_features import compute_job_features
+        job_features = compute_job_features(job_json)
+    
     # Basic keyword matching for fallback
-    job_text = f"{job_json.get('title', '')} {job_json.get('description', '')}"
     job_skills = job_json.get('skills', [])
-    job_requirements = job_json.get('requirements', [])
-    
-    # Convert to lowercase for comparison
-    resume_lower = resume_text.lower()
-    job_lower = job_text.lower()
     
     # Count matching skills
-    matching_skills = 0
-    missing_skills = []
-    
-    for skill in job_skills:
-        if skill.lower() in resume_lower:
-            matching_skills += 1
-        else:
-            missing_skills.append(skill)
+    hits = skill_hits(job_features['skill_keys'], frozenset(resume_features['skills']), resume_text)
+    matching_skills = sum(hits)
+    missing_skills = [skill for skill, hit in zip(job_skills, hits) if not hit]
     
     # Calculate basic score
     total_skills = len(job_skills) if job_skills else 1
     skill_score = (matching_skills / total_skills) * 50  # Skills contribute 50% to score
     
     # Basic keyword matching for other terms
-    job_keywords = re.findall(r'\b\w{4,}\b', job_lower)
-    resume_keywords = re.findall(r'\b\w{4,}\b', resume_lower)
-    
-    matching_keywords = set(job_keywords) & set(resume_keywords)
-    keyword_score = (len(matching_keywords) / max(len(job_keywords), 1)) * 50  # Keywords contribute 50% to score
+    matching_keywords = set(job_features['tokens']).intersection(resume_features['tokens'])
+    keyword_score = (len(matching_keywords) / max(job_features['keyword_count'], 1)) * 50  # Keywords contribute 50% to score
     
     total_score = min(int(skill_score + keyword_score), 100)
     
+    return build_fallback_result(total_score, missing_skills)
+
+def build_fallback_result(total_score: int, missing_skills: List[str]) -> Dict:
+    """Build the keyword fallback response for a computed score and missing skills."""
     # Generate basic suggestions
     suggestions = []
     if missing_skills:
@@ -145,9 +301,69 @@ def get_fallback_response(resume_text: str, job_json: Dict) -> Dict:
     return {
         "score": total_score,
         "missing_keywords": missing_skills[:5],  # Limit to 5 missing keywords
-        "suggestions": suggestions[:3]  # Limit to 3 suggestions
+        "suggestions": suggestions[:3],  # Limit to 3 suggestions
+        "source": "fallback"  # Keyword heuristic, not cached
     }
 
+def score_batch(resume_texts: List[str], job_json: Dict, resume_features: List[Dict] = None,
+                job_features: Dict = None) -> List[Dict]:
+    """
+    Score many resumes against one job with the keyword fallback scorer.
+    
+    Produces exactly the same results as calling get_fallback_response for each
+    resume, but the job features are resolved once, keyword
+    overlap is a C-level set intersection against the job vocabulary, and the
+    scores are computed as arrays.
+    
+    Args:
+        resume_texts: Resume texts to score
+        job_json: Job posting data with title, description, skills
+        resume_features: Precomputed features aligned with resume_texts; computed if omitted
+        job_features: Precomputed job features; computed if omitted
+    
+    Returns:
+        List of fallback response dicts in input order
+    """
+    if not resume_texts:
+        return []
+    
+    if resume_features is None:
+        from services.resume_features import compute_resume_features
+        resume_features = [compute_resume_features(text) for text in resume_texts]
+    
+    # Job side, computed once
+    if job_features is None:
+        from services.job_features import compute_job_features
+        job_features = compute_job_features(job_json)
+    job_skills = job_json.get('skills', [])
+    skill_keys = job_features['skill_keys']
+    job_vocabulary = frozenset(job_features['tokens'])
+    
+    total_skills = len(job_skills) if job_skills else 1
+    total_keywords = max(job_features['keyword_count'], 1)
+    
+    n_resumes = len(resume_texts)
+    keyword_matches = np.zeros(n_resumes, dtype=np.int64)
+    hits = np.zeros((n_resumes, len(skill_keys)), dtype=bool)
+    
+    for row, (resume_text, features) in enumerate(zip(resume_texts, resume_features)):
+        keyword_matches[row] = len(job_vocabulary.intersection(features['tokens']))
+        if skill_keys:
+            hits[row] = skill_hits(skill_keys, frozenset(features['skills']), resume_text)
+    
+    skill_matches = hits.sum(axis=1)
+    
+    # Same operation order as get_fallback_response so float results are identical
+    skill_scores = (skill_matches / total_skills) * 50
+    keyword_scores = (keyword_matches / total_keywords) * 50
+    total_scores = np.minimum((skill_scores + keyword_scores).astype(np.int64), 100)
+    
+    results = []
+    for row in range(n_resumes):
+        missing_skills = [skill for skill, hit in zip(job_skills, hits[row]) if not hit]
+        results.append(build_fallback_result(int(total_scores[row]), missing_skills))
+    return results
+
 def validate_and_clean_response(response: Dict) -> Dict:
     """Validate and clean the LLM response to ensure proper format."""
     # Ensure score is an integer between 0-100
@@ -0,0 +1,115 @@
+"""Persistent cache for LLM match results keyed by content hash."""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from models import db, MatchCacheEntry
+from services.llm import PROMPT_VERSION
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return ' '.join((text or '').split())
+
+def compute_cache_key(resume_text: str, job_json: Dict, model: str, job_hash: Optional[str] = None) -> str:
+    """
+    Hash the resume, the job fields used in the prompt, the model and prompt version.
+    
+    `job_hash` is the job's precomputed content hash (see services.job_features);
+    it is derived from `job_json` when omitted.
+    """
+    if job_hash is None:
+        from services.job_features import compute_job_content_hash
+        job_hash = compute_job_content_hash(job_json)
+    payload = {
+        'resume': normalize_text(resume_text),
+        'job': job_hash,
+        'model': model,
+        'prompt_version': PROMPT_VERSION
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def is_enabled() -> bool:
+    """Check if the match cache is turned on for the current app."""
+    return current_app.config.get('MATCH_CACHE_ENABLED', True)
+
+def get_cached_match(cache_key: str) -> Optional[Dict]:
+    """
+    Look up a cached match result.
+
+    Returns:
+        The cached result dict, or None on a miss or expired entry
+    """
+    if not is_enabled():
+        return None
+
+    entry = MatchCacheEntry.query.filter_by(cache_key=cache_key).first()
+    if not entry:
+        return None
+
+    ttl = current_app.config['MATCH_CACHE_TTL']
+    now = datetime.utcnow()
+    if entry.created_at < now - timedelta(seconds=ttl):
+        return None
+
+    # Recency drives size-based eviction; flushed with the caller's commit
+    entry.last_used_at = now
+    entry.hit_count += 1
+    return entry.to_match_result()
+
+def store_cached_match(cache_key: str, model: str, result: Dict):
+    """
+    Add a match result to the cache in the current session.
+
+    Fallback (keyword heuristic) results are not cached. The caller commits and
+    calls `evict_entries` once it has stored all of a request's results.
+    """
+    if not is_enabled() or result.get('source') == 'fallback':
+        return
+
+    now = datetime.utcnow()
+    entry = MatchCacheEntry.query.filter_by(cache_key=cache_key).first()
+    if entry:
+        # Replace an expired entry in place
+        entry.created_at = now
+        entry.last_used_at = now
+    else:
+        entry = MatchCacheEntry(cache_key=cache_key, created_at=now, last_used_at=now)
+
+    entry.model = model
+    entry.prompt_version = PROMPT_VERSION
+    entry.score = result['score']
+    entry.missing_keywords = result['missing_keywords']
+    entry.suggestions = result['suggestions']
+
+    try:
+        # Savepoint so a concurrent insert of the same key doesn't abort the caller's transaction
+        with db.session.begin_nested():
+            db.session.add(entry)
+    except IntegrityError:
+        pass
+
+def evict_entries():
+    """
+    Remove expired entries and trim the cache to its maximum size (least recently used first).
+
+    Costs a count and a delete, so it runs once per request rather than per stored entry.
+    """
+    if not is_enabled():
+        return
+
+    ttl = current_app.config['MATCH_CACHE_TTL']
+    max_entries = current_app.config['MATCH_CACHE_MAX_ENTRIES']
+
+    cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+    MatchCacheEntry.query.filter(MatchCacheEntry.created_at < cutoff).delete(synchronize_session=False)
+
+    overflow = MatchCacheEntry.query.count() - max_entries
+    if overflow > 0:
+        stale_ids = db.session.query(MatchCacheEntry.id).order_by(
+            MatchCacheEntry.last_used_at.asc()
+        ).limit(overflow).subquery()
+        MatchCacheEntry.query.filter(MatchCacheEntry.id.in_(db.select(stale_ids))).delete(synchronize_session=False)
@@ -0,0 +1,126 @@
+"""Background execution of resume matching jobs."""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class MatchQueueFull(Exception):
+    """Raised when the match job queue cannot accept more work."""
+    pass
+
+class MatchJobRunner:
+    """
+    Run match jobs on a bounded thread pool and track their state.
+
+    Jobs move through queued -> running -> completed/failed. Finished jobs are
+    kept in memory for `job_ttl` seconds so clients can poll for the result.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, job_ttl: int = 3600):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='match-job')
+        # Bounds the number of jobs that are either running or waiting for a worker
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._queued = 0
+        self._active = 0
+
+    def submit(self, user_id: int, fn: Callable[[], Dict[str, Any]],
+               on_success: Optional[Callable[[Dict[str, Any]], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None) -> Dict[str, Any]:
+        """
+        Queue `fn` for execution and return the new job record.
+
+        Raises:
+            MatchQueueFull: if the pool and its queue are already at capacity
+        """
+        if not self._slots.acquire(blocking=False):
+            raise MatchQueueFull('Match queue is full, try again later')
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'user_id': user_id,
+            'status': 'queued',
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'finished_at': None
+        }
+
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+            self._queued += 1
+
+        try:
+            self._executor.submit(self._run, job, fn, on_success, on_error)
+        except RuntimeError:
+            # Executor has been shut down
+            with self._lock:
+                self._queued -= 1
+                del self._jobs[job_id]
+            self._slots.release()
+            raise
+
+        return job
+
+    def _run(self, job, fn, on_success, on_error):
+        """Execute a job on a worker thread and record its outcome."""
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            job['status'] = 'running'
+
+        try:
+            result = fn()
+            with self._lock:
+                job['status'] = 'completed'
+                job['result'] = result
+            if on_success:
+                on_success(result)
+        except Exception as e:
+            with self._lock:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            if on_error:
+                on_error(e)
+        finally:
+            with self._lock:
+                self._active -= 1
+                job['finished_at'] = time.time()
+            self._slots.release()
+
+    def _prune(self):
+        """Drop finished jobs older than the TTL. Caller must hold the lock."""
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and job['finished_at'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of a job record, or None if unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and worker utilisation counters."""
+        with self._lock:
+            return {
+                'queue_depth': self._queued,
+                'active_workers': self._active,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'tracked_jobs': len(self._jobs)
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting jobs and release the worker threads."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,174 @@
+"""MinHash signatures and LSH lookups for near-duplicate resumes and job postings."""
+
+import hashlib
+import re
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import numpy as np
+from models import db, Resume, JobPosting, ResumeFeatures, JobFeatures, MatchResult, MinHashBucket
+from services.llm import PROMPT_VERSION
+
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: a pair with similarity s shares a bucket with probability 1 - (1 - s**8)**16,
+# about 0.99 at 0.85, 0.95 at 0.8, 0.81 at 0.75 and 0.61 at 0.7
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 5  # Words per shingle
+MIN_THRESHOLD = 0.75  # Lower thresholds would miss too many pairs that never share a bucket
+
+MERSENNE_PRIME = (1 << 31) - 1
+_permutation_rng = np.random.RandomState(20240229)  # Fixed so stored signatures stay comparable
+PERMUTATION_A = _permutation_rng.randint(1, MERSENNE_PRIME, NUM_PERMUTATIONS).astype(np.uint64)
+PERMUTATION_B = _permutation_rng.randint(0, MERSENNE_PRIME, NUM_PERMUTATIONS).astype(np.uint64)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def compute_minhash(text: str) -> Optional[np.ndarray]:
+    """
+    MinHash signature of the text's word shingles.
+
+    Returns:
+        uint32 array of NUM_PERMUTATIONS values, or None if the text has no words
+    """
+    words = WORD_PATTERN.findall((text or '').lower())
+    if not words:
+        return None
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))}
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles)) % MERSENNE_PRIME
+    # One universal hash per permutation; products stay below 2**62 so uint64 never overflows
+    permuted = (np.outer(hashes, PERMUTATION_A) + PERMUTATION_B) % MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+def signature_to_bytes(signature: Optional[np.ndarray]) -> bytes:
+    """Serialize a signature for storage; texts without words store an empty value."""
+    return b'' if signature is None else signature.tobytes()
+
+def signature_from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+    """Read a stored signature back."""
+    return np.frombuffer(data, dtype=np.uint32) if data else None
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """Hash each band of the signature (with its band number) to a signed 64-bit bucket id."""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+def estimate_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(first == second)) / NUM_PERMUTATIONS
+
+def index_signature(owner, signature: Optional[np.ndarray]):
+    """Replace a resume's or job posting's LSH buckets (the caller commits)."""
+    owner.minhash_buckets = [] if signature is None else [MinHashBucket(bucket=bucket) for bucket in band_buckets(signature)]
+
+def _find_similar(owner_column, features_model, features_owner_column, signature: Optional[np.ndarray],
+                  exclude_id: Optional[int], threshold: float, candidate_filter=None) -> List[Tuple[int, float]]:
+    """Look up candidates sharing an LSH bucket and keep those at or above the threshold."""
+    if signature is None:
+        return []
+    query = db.session.query(features_owner_column, features_model.minhash).join(
+        MinHashBucket, owner_column == features_owner_column
+    ).filter(MinHashBucket.bucket.in_(band_buckets(signature))).distinct()
+    if exclude_id is not None:
+        query = query.filter(features_owner_column != exclude_id)
+    if candidate_filter is not None:
+        query = query.filter(candidate_filter)
+
+    matches = []
+    for owner_id, stored in query:
+        candidate = signature_from_bytes(stored)
+        if candidate is not None:
+            similarity = estimate_similarity(signature, candidate)
+            if similarity >= threshold:
+                matches.append((owner_id, similarity))
+    # Most similar first, then the oldest
+    matches.sort(key=lambda match: (-match[1], match[0]))
+    return matches
+
+def find_similar_resumes(resume: Resume, signature: Optional[np.ndarray], threshold: float) -> List[Tuple[int, float]]:
+    """
+    Find the same user's resumes whose text is a near-duplicate of this one.
+
+    Args:
+        signature: The resume's MinHash signature (see services.resume_features)
+
+    Returns:
+        List of (resume id, estimated similarity), most similar first
+    """
+    return _find_similar(
+        MinHashBucket.resume_id, ResumeFeatures, ResumeFeatures.resume_id, signature, resume.id, threshold,
+        ResumeFeatures.resume_id.in_(db.session.query(Resume.id).filter(Resume.user_id == resume.user_id))
+    )
+
+def find_similar_jobs(job_posting: JobPosting, signature: Optional[np.ndarray], threshold: float) -> List[Tuple[int, float]]:
+    """
+    Find job postings whose title, description, skills and requirements nearly duplicate this one's.
+
+    Args:
+        signature: The posting's MinHash signature (see services.job_features)
+
+    Returns:
+        List of (job posting id, estimated similarity), most similar first
+    """
+    return _find_similar(
+        MinHashBucket.job_posting_id, JobFeatures, JobFeatures.job_posting_id, signature, job_posting.id, threshold
+    )
+
+def find_reusable_match(user_id: int, resume: Resume, job_posting: JobPosting, threshold: float,
+                        model: str, max_age: int) -> Optional[Tuple[MatchResult, float]]:
+    """
+    Find an earlier match of the user's that can stand in for this resume/job pair.
+
+    An earlier match qualifies when its resume is this resume or one of the
+    user's near-duplicates of it, and its job is this posting or a
+    near-duplicate, with at least one of them differing (identical pairs are the
+    match cache's job). Resumes of other users are never considered, and
+    near-duplicate postings must list the same skills and requirements. Like the
+    match cache, only LLM results from `model` and the current prompt version
+    made within `max_age` seconds are reused; results that were themselves
+    reused are not, so similarity never chains across copies.
+
+    The resume's and posting's stored features must be current.
+
+    Returns:
+        Tuple of (match result, combined similarity) or None
+    """
+    resume_similarity = {resume.id: 1.0}
+    resume_similarity.update(find_similar_resumes(resume, signature_from_bytes(resume.features.minhash), threshold))
+    job_similarity = {job_posting.id: 1.0}
+    similar_jobs = dict(find_similar_jobs(job_posting, signature_from_bytes(job_posting.features.minhash), threshold))
+    if similar_jobs:
+        # A shared description says nothing about the skill list the match was scored against
+        features = job_posting.features
+        job_similarity.update(
+            (job_id, similar_jobs[job_id]) for (job_id,) in db.session.query(JobFeatures.job_posting_id).filter(
+                JobFeatures.job_posting_id.in_(list(similar_jobs)),
+                JobFeatures.skills_json == features.skills_json,
+                JobFeatures.requirements_json == features.requirements_json
+            )
+        )
+    if len(resume_similarity) == 1 and len(job_similarity) == 1:
+        return None
+
+    best = None
+    candidates = MatchResult.query.filter(
+        MatchResult.user_id == user_id,
+        MatchResult.resume_id.in_(list(resume_similarity)),
+        MatchResult.job_posting_id.in_(list(job_similarity)),
+        MatchResult.source == 'llm',
+        MatchResult.model == model,
+        MatchResult.prompt_version == PROMPT_VERSION,
+        MatchResult.created_at >= datetime.utcnow() - timedelta(seconds=max_age)
+    ).order_by(MatchResult.created_at.desc())
+    for match in candidates:
+        if match.resume_id == resume.id and match.job_posting_id == job_posting.id:
+            continue
+        similarity = resume_similarity[match.resume_id] * job_similarity[match.job_posting_id]
+        if similarity >= threshold and (best is None or similarity > best[1]):
+            best = (match, similarity)
+    return best
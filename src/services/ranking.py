@@ -0,0 +1,36 @@
+"""Candidate ranking helpers for multi-resume matching."""
+
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+from services.llm import score_batch
+
+def prefilter_candidates(resume_texts: List[str], job_json: Dict,
+                         top_k: Optional[int] = None,
+                         threshold: Optional[int] = None,
+                         resume_features: Optional[List[Dict]] = None,
+                         job_features: Optional[Dict] = None) -> Tuple[List[Dict], Set[int]]:
+    """
+    Score every resume with the local keyword scorer and pick which ones deserve an LLM call.
+    
+    Args:
+        resume_texts: Resume texts to rank
+        job_json: Job posting data with title, description, skills, requirements
+        top_k: Keep at most this many of the best-scoring resumes (None keeps all)
+        threshold: Keep only resumes scoring at least this much (None keeps all)
+        resume_features: Precomputed features aligned with resume_texts
+        job_features: Precomputed job features
+    
+    Returns:
+        Tuple of (local match results in input order, indices selected for the LLM stage)
+    """
+    local_results = score_batch(resume_texts, job_json, resume_features, job_features)
+    candidates = range(len(local_results))
+    
+    if threshold is not None:
+        candidates = [i for i in candidates if local_results[i]['score'] >= threshold]
+    
+    if top_k is not None:
+        # Ties keep input order
+        candidates = heapq.nsmallest(top_k, candidates, key=lambda i: (-local_results[i]['score'], i))
+    
+    return local_results, set(candidates)
@@ -0,0 +1,96 @@
+"""Rate limiting and retry helpers for outbound LLM calls."""
+
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+class TokenBucket:
+    """Thread-safe token bucket that refills continuously at a fixed rate."""
+
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last update. Caller must hold the lock."""
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """
+        Take `amount` tokens if available.
+
+        Returns:
+            0 if the tokens were taken, otherwise the seconds to wait before retrying
+        """
+        # A single request larger than the bucket would otherwise never fit
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.refill_per_second
+
+    def acquire(self, amount: float = 1):
+        """Block until `amount` tokens have been taken."""
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter shared by all LLM calls; a limit of 0 or less is unlimited."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if tokens_per_minute > 0 else None
+
+    def acquire(self, tokens: int):
+        """Block until one request slot and `tokens` tokens are available."""
+        if self.requests is not None:
+            self.requests.acquire(1)
+        if self.tokens is not None:
+            self.tokens.acquire(tokens)
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter for the given zero-based attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def call_with_retries(fn: Callable[[], T], is_retryable: Callable[[Exception], bool],
+                      max_retries: int = 3, base_delay: float = 0.5,
+                      sleep: Callable[[float], None] = time.sleep,
+                      retry_after: Optional[Callable[[Exception], Optional[float]]] = None) -> T:
+    """
+    Call `fn`, retrying retryable errors with jittered exponential backoff.
+
+    Args:
+        fn: Zero-argument callable to invoke
+        is_retryable: Predicate deciding whether an exception should be retried
+        max_retries: Number of retries after the first attempt
+        base_delay: Base backoff delay in seconds
+        sleep: Sleep function (overridable for tests)
+        retry_after: Optional hook returning a server-provided delay for an error
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = retry_after(e) if retry_after else None
+            if delay is None:
+                delay = backoff_delay(attempt, base_delay)
+            sleep(delay)
+            attempt += 1
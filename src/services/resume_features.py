@@ -0,0 +1,181 @@
+"""Resume features computed once per resume text and reused by the scorers."""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_
+from models import db, Resume, ResumeFeatures
+from services.llm import KEYWORD_PATTERN
+from services.skills import extract_skills_from_text
+import numpy as np
+from services.near_duplicates import compute_minhash, signature_to_bytes, signature_from_bytes, index_signature
+
+# Heading lines that start each tracked section; other known headings only end one
+SECTION_HEADINGS = {
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'relevant experience'),
+    'education': ('education', 'academic background', 'education and training', 'academics'),
+    'skills': ('skills', 'technical skills', 'core competencies', 'key skills', 'skills and tools',
+               'technologies', 'skills & tools'),
+}
+BOUNDARY_HEADINGS = ('summary', 'profile', 'objective', 'professional summary', 'projects', 'certifications',
+                     'awards', 'publications', 'languages', 'interests', 'references', 'volunteering',
+                     'volunteer experience', 'achievements', 'contact')
+_HEADING_SECTIONS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_SECTIONS.update({heading: None for heading in BOUNDARY_HEADINGS})
+
+HEADING_LINE_PATTERN = re.compile(r'^[ \t]*([A-Za-z][A-Za-z &/]{2,40}?)[ \t]*:?[ \t]*$', re.MULTILINE)
+
+# "5+ years of experience", "7 yrs professional experience"
+YEARS_STATED_PATTERN = re.compile(r'\b(\d{1,2})\+?\s*(?:years?|yrs?)\b(?:\s+\w+){0,3}?\s+experience')
+# "2016 - 2020", "Mar 2019 – Present"
+YEAR_RANGE_PATTERN = re.compile(r'\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now)\b')
+
+def compute_text_hash(text: str) -> str:
+    """Hash resume text to detect when features need recomputing."""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+def find_sections(text: str) -> Dict[str, List[int]]:
+    """
+    Find experience, education and skills sections by their heading lines.
+
+    Returns:
+        Dict of section name to [start, end) character offsets into the text
+    """
+    headings: List[Tuple[int, Optional[str]]] = []
+    for match in HEADING_LINE_PATTERN.finditer(text):
+        heading = ' '.join(match.group(1).lower().split())
+        if heading in _HEADING_SECTIONS:
+            headings.append((match.start(1), _HEADING_SECTIONS[heading]))
+
+    sections = {}
+    for position, (start, section) in enumerate(headings):
+        if section and section not in sections:
+            end = headings[position + 1][0] if position + 1 < len(headings) else len(text)
+            sections[section] = [start, end]
+    return sections
+
+def estimate_years_experience(text_lower: str, sections: Dict[str, List[int]]) -> Optional[int]:
+    """
+    Estimate years of experience.
+
+    A stated figure ("8+ years of experience") wins; otherwise the year ranges
+    in the experience section (or the whole resume) are merged and summed.
+    """
+    stated = [int(years) for years in YEARS_STATED_PATTERN.findall(text_lower)]
+    if stated:
+        return max(stated)
+
+    if 'experience' in sections:
+        start, end = sections['experience']
+        text_lower = text_lower[start:end]
+
+    current_year = datetime.utcnow().year
+    ranges = []
+    for start, end in YEAR_RANGE_PATTERN.findall(text_lower):
+        end_year = current_year if not end[0].isdigit() else int(end)
+        if int(start) <= end_year <= current_year:
+            ranges.append((int(start), end_year))
+    if not ranges:
+        return None
+
+    # Merge overlapping roles so concurrent positions aren't double counted
+    ranges.sort()
+    total = 0
+    merged_start, merged_end = ranges[0]
+    for start, end in ranges[1:]:
+        if start <= merged_end:
+            merged_end = max(merged_end, end)
+        else:
+            total += merged_end - merged_start
+            merged_start, merged_end = start, end
+    total += merged_end - merged_start
+    return total
+
+def compute_resume_features(text: str) -> Dict:
+    """
+    Derive scoring features from resume text.
+
+    Returns:
+        Dict with tokens (distinct keywords, sorted), skills (canonical names),
+        years_experience (int or None) and sections ({name: [start, end]})
+    """
+    text = text or ''
+    text_lower = text.lower()
+    sections = find_sections(text)
+    return {
+        'tokens': sorted(set(KEYWORD_PATTERN.findall(text_lower))),
+        'skills': extract_skills_from_text(text),
+        'years_experience': estimate_years_experience(text_lower, sections),
+        'sections': sections
+    }
+
+def is_current(record: Optional[ResumeFeatures], text_hash: str) -> bool:
+    """Check if stored features (and their MinHash signature) match the resume text."""
+    return record is not None and record.text_hash == text_hash and record.minhash is not None
+
+def ensure_resume_features(resume: Resume) -> Dict:
+    """
+    Get a resume's stored features, computing them if missing or stale.
+
+    The MinHash signature and LSH buckets used for near-duplicate lookups are
+    refreshed along with them. The caller commits.
+    """
+    text_hash = compute_text_hash(resume.text)
+    record = resume.features
+    if is_current(record, text_hash):
+        return record.to_features()
+
+    features = compute_resume_features(resume.text)
+    if record is None:
+        record = ResumeFeatures(resume=resume)
+        db.session.add(record)
+    record.text_hash = text_hash
+    record.tokens_json = json.dumps(features['tokens'])
+    record.skills_json = json.dumps(features['skills'])
+    record.years_experience = features['years_experience']
+    record.sections_json = json.dumps(features['sections'])
+    signature = compute_minhash(resume.text)
+    record.minhash = signature_to_bytes(signature)
+    index_signature(resume, signature)
+    return features
+
+def read_resume_features(resume: Resume) -> Dict:
+    """Get a resume's stored features if current, otherwise compute them without storing (for read-only requests)."""
+    record = resume.features
+    if is_current(record, compute_text_hash(resume.text)):
+        return record.to_features()
+    return compute_resume_features(resume.text)
+
+def read_resume_signature(resume: Resume) -> Optional[np.ndarray]:
+    """Get a resume's stored MinHash signature if current, otherwise compute it without storing."""
+    record = resume.features
+    if is_current(record, compute_text_hash(resume.text)):
+        return signature_from_bytes(record.minhash)
+    return compute_minhash(resume.text)
+
+def load_resume_features(resumes: List[Resume]) -> List[Dict]:
+    """Get features for many resumes with one query, computing any missing or stale ones."""
+    records = {
+        record.resume_id: record
+        for record in ResumeFeatures.query.filter(ResumeFeatures.resume_id.in_([resume.id for resume in resumes])).all()
+    }
+    features = []
+    for resume in resumes:
+        record = records.get(resume.id)
+        if is_current(record, compute_text_hash(resume.text)):
+            features.append(record.to_features())
+        else:
+            features.append(ensure_resume_features(resume))
+    return features
+
+def backfill_resume_features():
+    """Compute features and signatures for resumes stored before they existed (the caller commits)."""
+    missing = Resume.query.outerjoin(ResumeFeatures).filter(
+        Resume.text.isnot(None),
+        or_(ResumeFeatures.id.is_(None), ResumeFeatures.minhash.is_(None))
+    ).all()
+    for resume in missing:
+        ensure_resume_features(resume)
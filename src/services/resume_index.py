@@ -0,0 +1,254 @@
+"""Per-user BM25 inverted index over resume text for top-K retrieval."""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import db, Resume
+
+INDEX_FORMAT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'our', 'that', 'the', 'their', 'this', 'to', 'was', 'we', 'were', 'will',
+    'with', 'you', 'your'
+))
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stop words; keeps c++ / c# style suffixes."""
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOP_WORDS]
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring.
+
+    Postings map each term to {doc_id: term frequency}. Each document's term
+    counts are kept too so documents can be removed and the index persisted
+    without re-tokenizing.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_terms: Dict[int, Dict[str, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self.doc_terms
+
+    def add(self, doc_id: int, text: str):
+        """Index a document's text, replacing any previous version."""
+        self.add_terms(doc_id, Counter(tokenize(text)))
+
+    def add_terms(self, doc_id: int, term_counts: Dict[str, int]):
+        """Index a document from precomputed term counts."""
+        if doc_id in self.doc_terms:
+            self.remove(doc_id)
+        self.doc_terms[doc_id] = dict(term_counts)
+        length = sum(term_counts.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        for term, count in term_counts.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+
+    def remove(self, doc_id: int) -> bool:
+        """Remove a document; returns False if it was not indexed."""
+        term_counts = self.doc_terms.pop(doc_id, None)
+        if term_counts is None:
+            return False
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in term_counts:
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+        return True
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency (the non-negative variant)."""
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_terms) - df + 0.5) / (df + 0.5))
+
+    def top_k(self, query_terms: Iterable[str], k: int) -> List[Tuple[int, float]]:
+        """
+        Return the k best documents for the query as (doc_id, score), best first.
+
+        Terms are scored one at a time in order of decreasing upper bound. Once the
+        bounds of the terms still to come cannot lift an unseen document past the
+        current k-th best score, no new candidates are admitted and the remaining
+        terms only update existing ones. The result is still exact.
+        """
+        if k < 1 or not self.doc_terms:
+            return []
+
+        k1 = self.k1
+        average_length = self.total_length / len(self.doc_terms) or 1.0
+        # Per-document length normalisation, shared by every term
+        norm = {}
+
+        # A term contributes at most idf * (k1 + 1) to any document
+        terms = []
+        for term in set(query_terms):
+            postings = self.postings.get(term)
+            if postings:
+                idf = self.idf(term)
+                terms.append((idf * (k1 + 1), idf, postings))
+        terms.sort(key=lambda entry: entry[0], reverse=True)
+
+        remaining_bound = sum(entry[0] for entry in terms)
+        scores: Dict[int, float] = {}
+        admitting = True
+
+        for bound, idf, postings in terms:
+            remaining_bound -= bound
+            if admitting:
+                doc_ids = postings.keys()
+            elif len(scores) < len(postings):
+                doc_ids = [doc_id for doc_id in scores if doc_id in postings]
+            else:
+                doc_ids = [doc_id for doc_id in postings if doc_id in scores]
+
+            for doc_id in doc_ids:
+                doc_norm = norm.get(doc_id)
+                if doc_norm is None:
+                    doc_norm = norm[doc_id] = k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                tf = postings[doc_id]
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + doc_norm)
+
+            if admitting and len(scores) >= k:
+                kth_score = heapq.nlargest(k, scores.values())[-1]
+                # Partial scores only grow, so unseen documents can no longer make the top k
+                if remaining_bound < kth_score:
+                    admitting = False
+
+        # Ties keep lower ids first so results are stable
+        return [(doc_id, score) for doc_id, score in
+                heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))]
+
+    def to_dict(self) -> Dict:
+        """Serialize the documents' term counts; postings are rebuilt on load."""
+        return {
+            'version': INDEX_FORMAT_VERSION,
+            'k1': self.k1,
+            'b': self.b,
+            'docs': {str(doc_id): terms for doc_id, terms in self.doc_terms.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BM25Index':
+        """Rebuild an index from `to_dict` output."""
+        index = cls(k1=data['k1'], b=data['b'])
+        for doc_id, terms in data['docs'].items():
+            index.add_terms(int(doc_id), terms)
+        return index
+
+class ResumeIndexRegistry:
+    """
+    BM25 indexes of each user's resumes, loaded on first use.
+
+    A user's index is read from its snapshot in `index_dir` when one exists and
+    reconciled against the resume ids in the database, so only resumes added or
+    deleted since the snapshot are touched; otherwise it is built from the
+    table. Uploads and deletes update loaded indexes in place and mark them
+    dirty for the next `save`.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None, k1: float = 1.2, b: float = 0.75):
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+        self._indexes: Dict[int, BM25Index] = {}
+        self._dirty = set()
+        self._lock = threading.RLock()
+
+    def snapshot_path(self, user_id: int) -> str:
+        """Location of a user's persisted index."""
+        return os.path.join(self.index_dir, f'user_{user_id}.json')
+
+    def get(self, user_id: int) -> BM25Index:
+        """Get a user's index, loading or building it if needed (needs an app context)."""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = self._load(user_id)
+                self._indexes[user_id] = index
+            return index
+
+    def _load(self, user_id: int) -> BM25Index:
+        """Load the snapshot and apply resumes added or deleted since it was written."""
+        index = self._read_snapshot(user_id) or BM25Index(k1=self.k1, b=self.b)
+
+        current_ids = {
+            resume_id for (resume_id,) in
+            db.session.query(Resume.id).filter(Resume.user_id == user_id, Resume.text.isnot(None))
+        }
+        stale_ids = [doc_id for doc_id in index.doc_terms if doc_id not in current_ids]
+        missing_ids = [resume_id for resume_id in current_ids if resume_id not in index]
+
+        for doc_id in stale_ids:
+            index.remove(doc_id)
+        if missing_ids:
+            for resume_id, text in db.session.query(Resume.id, Resume.text).filter(Resume.id.in_(missing_ids)):
+                index.add(resume_id, text)
+        if stale_ids or missing_ids:
+            self._dirty.add(user_id)
+        return index
+
+    def _read_snapshot(self, user_id: int) -> Optional[BM25Index]:
+        """Read a user's persisted index; unreadable or outdated snapshots are ignored."""
+        if not self.index_dir:
+            return None
+        try:
+            with open(self.snapshot_path(user_id), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_FORMAT_VERSION or (data.get('k1'), data.get('b')) != (self.k1, self.b):
+            return None
+        return BM25Index.from_dict(data)
+
+    def add_resume(self, resume: Resume):
+        """Index a newly stored resume if its owner's index is loaded."""
+        with self._lock:
+            index = self._indexes.get(resume.user_id)
+            if index is not None and resume.text:
+                index.add(resume.id, resume.text)
+                self._dirty.add(resume.user_id)
+
+    def remove_resume(self, user_id: int, resume_id: int):
+        """Drop a deleted resume if its owner's index is loaded."""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None and index.remove(resume_id):
+                self._dirty.add(user_id)
+
+    def top_resumes(self, user_id: int, query_text: str, k: int) -> List[Tuple[int, float]]:
+        """Rank a user's resumes against query text, best first."""
+        with self._lock:
+            return self.get(user_id).top_k(tokenize(query_text), k)
+
+    def save(self):
+        """Write indexes changed since the last save to `index_dir`."""
+        if not self.index_dir:
+            return
+        with self._lock:
+            os.makedirs(self.index_dir, exist_ok=True)
+            for user_id in list(self._dirty):
+                path = self.snapshot_path(user_id)
+                tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._indexes[user_id].to_dict(), f, separators=(',', ':'))
+                os.replace(tmp_path, path)
+                self._dirty.discard(user_id)
@@ -1,11 +1,138 @@
 """Web scraping services for job postings."""
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 import re
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import os
+from services.skills import extract_skills_from_text
+from services.extractors import extract_json_ld_job, get_domain_extractor
+
+# Headers to mimic a real browser
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# Streamed response bodies are read in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Markup that never holds job content; client-rendered pages carry most of their
+# weight in these blocks. Removed before building the DOM. Each block's end is
+# found with a separate forward search, which is much faster than one lazy
+# regex over multi-megabyte script bundles.
+UNUSED_MARKUP_START = re.compile(rb'<(script|style|svg|template)[\s>/]|<!--', re.IGNORECASE)
+UNUSED_MARKUP_END = {
+    tag: re.compile(rb'</' + tag + rb'\s*>', re.IGNORECASE)
+    for tag in (b'script', b'style', b'svg', b'template')
+}
+COMMENT_END = re.compile(rb'-->')
+
+_session = None
+_session_lock = threading.Lock()
+_parser_backend = None
+
+def get_http_session() -> requests.Session:
+    """
+    Get the process-wide scraping session, creating it on first use.
+    
+    The session keeps a keep-alive connection pool per host so repeated scrapes of
+    the same job board reuse connections.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=int(os.getenv('SCRAPER_POOL_HOSTS', '20')),  # Hosts with cached pools
+                    pool_maxsize=int(os.getenv('SCRAPER_POOL_SIZE', '10'))  # Connections kept per host
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+def close_http_session():
+    """Close the shared scraping session and its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def get_parser_backend() -> str:
+    """
+    Get the BeautifulSoup parser backend for job pages.
+    
+    SCRAPER_PARSER selects `lxml`, `html.parser` or `auto` (lxml when installed).
+    Falls back to the pure-Python html.parser if lxml is not available.
+    """
+    global _parser_backend
+    if _parser_backend is None:
+        choice = os.getenv('SCRAPER_PARSER', 'auto')
+        backend = 'html.parser'
+        if choice != 'html.parser':
+            try:
+                import lxml  # noqa: F401
+                backend = 'lxml'
+            except ImportError:
+                if choice == 'lxml':
+                    print("SCRAPER_PARSER=lxml but lxml is not installed; using html.parser")
+        _parser_backend = backend
+    return _parser_backend
+
+def strip_unused_markup(content: bytes) -> bytes:
+    """Remove scripts, styles, inline SVG, templates and comments from raw HTML."""
+    parts = []
+    position = 0
+    while True:
+        start = UNUSED_MARKUP_START.search(content, position)
+        if not start:
+            break
+        parts.append(content[position:start.start()])
+        tag = start.group(1)
+        end_pattern = UNUSED_MARKUP_END[tag.lower()] if tag else COMMENT_END
+        end = end_pattern.search(content, start.end())
+        if not end:
+            # Unterminated block (e.g. a truncated body): drop the rest
+            position = len(content)
+            break
+        position = end.end()
+    parts.append(content[position:])
+    return b''.join(parts)
+
+def parse_html(content: bytes) -> BeautifulSoup:
+    """Build a DOM of the content-bearing markup only, with the configured parser backend."""
+    return BeautifulSoup(strip_unused_markup(content), get_parser_backend())
+
+def read_capped_body(response: requests.Response, max_bytes: int) -> bytes:
+    """
+    Read a streamed response body, stopping once `max_bytes` have been received.
+    
+    The rest of an oversized body is never downloaded; the connection is released
+    when the response is closed. Job details sit near the top of the document,
+    so the truncated prefix still parses.
+    """
+    chunks = []
+    received = 0
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        if not chunk:
+            continue
+        remaining = max_bytes - received
+        chunks.append(chunk[:remaining])
+        received += min(len(chunk), remaining)
+        if received >= max_bytes:
+            break
+    return b''.join(chunks)
 
 def is_valid_url(url: str) -> bool:
     """Check if the URL is valid and safe to scrape."""
@@ -23,52 +150,56 @@ def is_valid_url(url: str) -> bool:
     except Exception:
         return False
 
-def scrape_job_posting(url: str) -> Dict[str, any]:
+def scrape_job_posting(url: str, etag: str = None, last_modified: str = None) -> Optional[Dict[str, any]]:
     """
     Scrape a job posting from a URL and extract structured information.
     
+    When `etag` or `last_modified` from a previous fetch are given the request is
+    conditional, and None is returned if the server answers 304 Not Modified.
+    
     Returns:
-        Dict with keys: title, company, description, skills, requirements
+        Dict with keys: title, company, description, skills, requirements, etag,
+        last_modified, extractor; or None if the page has not changed
     """
     if not is_valid_url(url):
         raise ValueError("Invalid URL provided")
     
     try:
-        # Set headers to mimic a real browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        }
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
         
-        # Make request with timeout
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        # Stream the body so oversized pages are cut off instead of read in full
+        response = get_http_session().get(url, headers=headers, timeout=30, stream=True)
+        try:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            content = read_capped_body(response, int(os.getenv('SCRAPER_MAX_BYTES', str(2 * 1024 * 1024))))
+        finally:
+            response.close()
         
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
+        fields = extract_job_fields(content, url)
+        description = fields['description']
         
-        # Extract title
-        title = extract_title(soup)
-        
-        # Extract company
-        company = extract_company(soup)
-        
-        # Extract description
-        description = extract_description(soup)
-        
-        # Extract skills and requirements
-        skills = extract_skills(soup, description)
-        requirements = extract_requirements(soup, description)
+        # Skills and qualifications listed in structured data count toward extraction
+        text = description
+        if fields.get('extra_text'):
+            text = f"{description}\n{fields['extra_text']}"
+        skills = extract_skills(None, text)
+        requirements = extract_requirements(None, text)
         
         return {
-            'title': title,
-            'company': company,
+            'title': fields['title'],
+            'company': fields['company'],
             'description': description,
             'skills': skills,
-            'requirements': requirements
+            'requirements': requirements,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'extractor': fields['extractor']
         }
         
     except requests.RequestException as e:
@@ -76,6 +207,111 @@ def scrape_job_posting(url: str) -> Dict[str, any]:
     except Exception as e:
         raise Exception(f"Failed to parse job posting: {str(e)}")
 
+def extract_job_fields(content: bytes, url: str) -> Dict[str, Optional[str]]:
+    """
+    Extract title, company and description from a job page.
+    
+    Sources are tried in order: an extractor registered for the URL's domain,
+    schema.org JobPosting JSON-LD, then the generic selector cascade for any
+    field still missing. The page is only parsed into a DOM when a domain
+    extractor or the cascade needs it, so JSON-LD pages skip it entirely.
+    
+    Returns:
+        Dict with keys: title, company, description, extra_text, extractor
+        (which source supplied the title)
+    """
+    fields = {'title': None, 'company': None, 'description': None, 'extra_text': None, 'extractor': None}
+    soup = None
+    
+    def merge(found: Optional[Dict[str, Optional[str]]], source: str):
+        if not found:
+            return
+        for key, value in found.items():
+            if value and not fields.get(key):
+                fields[key] = value
+        if fields['title'] and not fields['extractor']:
+            fields['extractor'] = source
+    
+    domain_extractor = get_domain_extractor(url)
+    if domain_extractor:
+        soup = parse_html(content)
+        merge(domain_extractor(soup, url), 'domain')
+    
+    if not (fields['title'] and fields['company'] and fields['description']):
+        merge(extract_json_ld_job(content), 'json-ld')
+    
+    # Generic cascade only for fields neither source provided
+    if not (fields['title'] and fields['company'] and fields['description']):
+        if soup is None:
+            soup = parse_html(content)
+        if not fields['title']:
+            fields['title'] = extract_title(soup)
+            fields['extractor'] = 'generic'
+        if not fields['company']:
+            fields['company'] = extract_company(soup)
+        if not fields['description']:
+            fields['description'] = extract_description(soup)
+    
+    return fields
+
+class HostLimiter:
+    """Cap the number of concurrent requests to any single host."""
+    
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+    
+    def for_url(self, url: str) -> threading.Semaphore:
+        """Get the semaphore guarding the URL's host."""
+        host = (urlparse(url).hostname or '').lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.Semaphore(self.per_host)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+def scrape_job_postings(fetches: List[Dict[str, Optional[str]]], max_workers: int = 8, per_host: int = 2,
+                        on_start: Callable[[str], None] = None) -> Iterator[Tuple[int, Optional[Dict], Optional[Exception]]]:
+    """
+    Scrape many job posting URLs concurrently.
+    
+    Args:
+        fetches: Dicts with url and optional etag/last_modified validators
+        max_workers: Global cap on concurrent fetches
+        per_host: Cap on concurrent fetches to the same host
+        on_start: Optional callback invoked with the URL when its fetch begins
+    
+    Yields:
+        (index into fetches, job data or None if not modified, exception or None) as fetches complete
+    """
+    limiter = HostLimiter(per_host)
+    
+    def run(fetch):
+        with limiter.for_url(fetch['url']):
+            if on_start:
+                on_start(fetch['url'])
+            return scrape_job_posting(fetch['url'], etag=fetch.get('etag'), last_modified=fetch.get('last_modified'))
+    
+    # Interleave hosts so workers don't all queue up behind one host's limit
+    by_host: Dict[str, List[int]] = {}
+    for index, fetch in enumerate(fetches):
+        by_host.setdefault((urlparse(fetch['url']).hostname or '').lower(), []).append(index)
+    order = []
+    queues = list(by_host.values())
+    while queues:
+        order.extend(queue.pop(0) for queue in queues)
+        queues = [queue for queue in queues if queue]
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='job-scrape') as executor:
+        futures = {executor.submit(run, fetches[index]): index for index in order}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
 def extract_title(soup: BeautifulSoup) -> str:
     """Extract job title from the page."""
     # Common selectors for job titles
@@ -153,55 +389,50 @@ def extract_description(soup: BeautifulSoup) -> str:
     return "Job description not found"
 
 def extract_skills(soup: BeautifulSoup, description: str) -> List[str]:
-    """Extract skills from the page content."""
-    skills = []
-    
-    # Common skill keywords to look for
-    skill_keywords = [
-        'python', 'javascript', 'java', 'react', 'angular', 'vue', 'node.js',
-        'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'docker', 'kubernetes',
-        'aws', 'azure', 'gcp', 'git', 'jenkins', 'ci/cd', 'agile', 'scrum',
-        'machine learning', 'ai', 'data science', 'analytics', 'tableau',
-        'power bi', 'excel', 'salesforce', 'crm', 'api', 'rest', 'graphql',
-        'microservices', 'devops', 'linux', 'bash', 'powershell'
-    ]
-    
-    # Combine page text for analysis
-    page_text = description.lower()
-    
-    # Look for skills in the text
-    for skill in skill_keywords:
-        if skill in page_text:
-            skills.append(skill.title())
-    
-    # Remove duplicates and return
-    return list(set(skills))
+    """Extract skills from the page content using the skills taxonomy."""
+    return extract_skills_from_text(description)
+
+# Longest capture kept for a single requirement; also bounds regex backtracking
+MAX_REQUIREMENT_LENGTH = 80
+# Phrases that start a requirement; a capture stops before the next one so two
+# cues in one clause still give two requirements
+_CUES = (r'\d{1,2}\+?\s*years?|bachelor|master|degree\s*in|phd|certification\s*in'
+         r'|proficient\s*in|experience\s*with|knowledge\s*of')
+_CAPTURE = r'(?:(?!%s)[^.,;\n]){1,%d}' % (_CUES, MAX_REQUIREMENT_LENGTH)
+# "and" / "or" left dangling when a capture stops before the next cue
+TRAILING_CONJUNCTION = re.compile(r'\s+(?:and|or)$')
+
+# All requirement patterns combined into one alternation so the description is
+# scanned once; each alternative has exactly one named group (read via lastgroup).
+# More specific alternatives come first. The lookahead lets the scanner skip
+# positions that cannot start any alternative. The years alternative only looks
+# ahead to "experience" so "experience with ..." right after it still matches.
+# Matched against lowercased text.
+REQUIREMENT_PATTERN = re.compile(
+    r'(?=[0-9bmdpcek])(?:'
+    r'(?P<years>\d{1,2})\+?\s*years?\s*(?:of\s*)?(?=experience)'
+    r'|bachelor\'?s?\s*(?:degree\s*)?in\s*(?P<bachelor>' + _CAPTURE + r')'
+    r'|master\'?s?\s*(?:degree\s*)?in\s*(?P<master>' + _CAPTURE + r')'
+    r'|degree\s*in\s*(?P<degree>' + _CAPTURE + r')'
+    r'|phd\s*(?:in\s*)?(?P<phd>' + _CAPTURE + r')'
+    r'|certification\s*in\s*(?P<certification>' + _CAPTURE + r')'
+    r'|proficient\s*in\s*(?P<proficient>' + _CAPTURE + r')'
+    r'|experience\s*with\s*(?P<experience>' + _CAPTURE + r')'
+    r'|knowledge\s*of\s*(?P<knowledge>' + _CAPTURE + r'))'
+)
 
 def extract_requirements(soup: BeautifulSoup, description: str) -> List[str]:
-    """Extract requirements from the page content."""
+    """Extract requirements from the page content in a single pass."""
     requirements = []
     
-    # Look for common requirement patterns
-    requirement_patterns = [
-        r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-        r'degree\s*in\s*([^.,]+)',
-        r'bachelor\'?s?\s*(?:degree\s*)?in\s*([^.,]+)',
-        r'master\'?s?\s*(?:degree\s*)?in\s*([^.,]+)',
-        r'phd\s*(?:in\s*)?([^.,]+)',
-        r'certification\s*in\s*([^.,]+)',
-        r'proficient\s*in\s*([^.,]+)',
-        r'experience\s*with\s*([^.,]+)',
-        r'knowledge\s*of\s*([^.,]+)'
-    ]
-    
-    text = description.lower()
-    
-    for pattern in requirement_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if isinstance(match, tuple):
-                match = match[0]
-            requirements.append(match.strip().title())
+    for match in REQUIREMENT_PATTERN.finditer(description.lower()):
+        kind = match.lastgroup
+        if kind == 'years':
+            requirements.append(f"{match.group('years')}+ years of experience")
+        else:
+            requirement = TRAILING_CONJUNCTION.sub('', match.group(kind).strip())
+            if requirement:
+                requirements.append(requirement.title())
     
-    # Remove duplicates and return
-    return list(set(requirements))
+    # Remove duplicates, keeping first occurrence order
+    return list(dict.fromkeys(requirements))
@@ -0,0 +1,247 @@
+"""Full-text search over resumes and job postings (SQLite FTS5 or Postgres tsvector)."""
+
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from models import db
+
+# Control characters mark highlights so snippets can be HTML-escaped before <mark> is added
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_TOKENS = 16
+
+QUERY_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+WORD_PATTERN = re.compile(r'\w+')
+
+class InvalidSearchQuery(Exception):
+    """Raised when a search query has no searchable terms."""
+    pass
+
+# External-content FTS5 tables; triggers keep them in step with the base tables
+SQLITE_SCHEMA = {
+    'resumes_fts': [
+        "CREATE VIRTUAL TABLE resumes_fts USING fts5(filename, text, content='resumes', content_rowid='id', "
+        "tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN "
+        "INSERT INTO resumes_fts(rowid, filename, text) VALUES (new.id, new.filename, new.text); END",
+        "CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN "
+        "INSERT INTO resumes_fts(resumes_fts, rowid, filename, text) VALUES ('delete', old.id, old.filename, old.text); END",
+        "CREATE TRIGGER IF NOT EXISTS resumes_fts_update AFTER UPDATE OF filename, text ON resumes BEGIN "
+        "INSERT INTO resumes_fts(resumes_fts, rowid, filename, text) VALUES ('delete', old.id, old.filename, old.text); "
+        "INSERT INTO resumes_fts(rowid, filename, text) VALUES (new.id, new.filename, new.text); END",
+    ],
+    'job_postings_fts': [
+        "CREATE VIRTUAL TABLE job_postings_fts USING fts5(title, company, description, content='job_postings', "
+        "content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS job_postings_fts_insert AFTER INSERT ON job_postings BEGIN "
+        "INSERT INTO job_postings_fts(rowid, title, company, description) "
+        "VALUES (new.id, new.title, new.company, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS job_postings_fts_delete AFTER DELETE ON job_postings BEGIN "
+        "INSERT INTO job_postings_fts(job_postings_fts, rowid, title, company, description) "
+        "VALUES ('delete', old.id, old.title, old.company, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS job_postings_fts_update AFTER UPDATE OF title, company, description ON job_postings BEGIN "
+        "INSERT INTO job_postings_fts(job_postings_fts, rowid, title, company, description) "
+        "VALUES ('delete', old.id, old.title, old.company, old.description); "
+        "INSERT INTO job_postings_fts(rowid, title, company, description) "
+        "VALUES (new.id, new.title, new.company, new.description); END",
+    ],
+}
+
+# Generated tsvector columns stay in sync without triggers (Postgres 12+)
+POSTGRES_SCHEMA = [
+    "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(text, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(filename, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_resumes_search_vector ON resumes USING GIN (search_vector)",
+    "ALTER TABLE job_postings ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_job_postings_search_vector ON job_postings USING GIN (search_vector)",
+]
+
+def setup_full_text_search():
+    """
+    Create the search tables, triggers or columns for the current database.
+
+    New SQLite FTS tables are filled from existing rows. Databases without
+    FTS5 or tsvector support are left as they are and searches will fail.
+    """
+    dialect = db.engine.dialect.name
+    try:
+        if dialect == 'sqlite':
+            for table, statements in SQLITE_SCHEMA.items():
+                exists = db.session.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': table}
+                ).first()
+                for statement in statements[1:] if exists else statements:
+                    db.session.execute(text(statement))
+                if not exists:
+                    db.session.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+        elif dialect == 'postgresql':
+            for statement in POSTGRES_SCHEMA:
+                db.session.execute(text(statement))
+        else:
+            print(f"Full-text search is not supported on {dialect}")
+            return
+        db.session.commit()
+    except OperationalError as e:
+        db.session.rollback()
+        print(f"Full-text search unavailable: {e}")
+
+def parse_search_query(query: str) -> List[Tuple]:
+    """
+    Parse a user query into clauses.
+
+    Supports "quoted phrases", prefix terms ending in `*` and `OR` between
+    clauses; everything else is ANDed. Punctuation is dropped so user input
+    can never inject FTS operators.
+
+    Returns:
+        List of ('term', word, is_prefix), ('phrase', [words]) and ('or',) clauses
+    """
+    clauses = []
+    for phrase, token in QUERY_TOKEN_PATTERN.findall(query or ''):
+        if token == 'OR':
+            if clauses and clauses[-1][0] != 'or':
+                clauses.append(('or',))
+            continue
+        words = WORD_PATTERN.findall((phrase or token).lower())
+        if not words:
+            continue
+        if phrase or len(words) > 1:
+            clauses.append(('phrase', words))
+        else:
+            clauses.append(('term', words[0], token.endswith('*')))
+    if clauses and clauses[-1][0] == 'or':
+        clauses.pop()
+    if not clauses:
+        raise InvalidSearchQuery('Search query has no searchable terms')
+    return clauses
+
+def to_fts5_query(clauses: List[Tuple]) -> str:
+    """Render parsed clauses as an FTS5 MATCH expression."""
+    parts = []
+    for clause in clauses:
+        if clause[0] == 'or':
+            parts.append('OR')
+        elif clause[0] == 'phrase':
+            parts.append('"' + ' '.join(clause[1]) + '"')
+        else:
+            parts.append(f'"{clause[1]}"' + ('*' if clause[2] else ''))
+    return ' '.join(parts)
+
+def to_tsquery(clauses: List[Tuple]) -> str:
+    """Render parsed clauses as a Postgres to_tsquery expression."""
+    parts = []
+    operator = None
+    for clause in clauses:
+        if clause[0] == 'or':
+            operator = '|'
+            continue
+        if clause[0] == 'phrase':
+            rendered = '(' + ' <-> '.join(clause[1]) + ')'
+        else:
+            rendered = clause[1] + (':*' if clause[2] else '')
+        if parts:
+            parts.append(operator or '&')
+        parts.append(rendered)
+        operator = None
+    return ' '.join(parts)
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet and turn highlight markers into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+def search_resumes(user_id: int, query: str, limit: int = 20) -> List[Dict]:
+    """
+    Search a user's resumes, best matches first.
+
+    Returns:
+        List of {id, filename, created_at, score, snippet} dicts; resume text is
+        not included beyond the highlighted snippet
+
+    Raises:
+        InvalidSearchQuery: if the query has no searchable terms
+    """
+    clauses = parse_search_query(query)
+    if db.engine.dialect.name == 'postgresql':
+        statement = text(
+            "SELECT r.id, r.filename, r.created_at, ts_rank_cd(r.search_vector, q) AS score, "
+            "ts_headline('english', coalesce(r.text, ''), q, :options) AS snippet "
+            "FROM resumes r, to_tsquery('english', :query) q "
+            "WHERE r.search_vector @@ q AND r.user_id = :user_id ORDER BY score DESC, r.id LIMIT :limit"
+        )
+        params = {'query': to_tsquery(clauses), 'options': headline_options()}
+    else:
+        # bm25() is lower for better matches; filename hits count half as much as text hits
+        statement = text(
+            "SELECT r.id, r.filename, r.created_at, -bm25(resumes_fts, 0.5, 1.0) AS score, "
+            "snippet(resumes_fts, -1, :start, :end, '…', :tokens) AS snippet "
+            "FROM resumes_fts JOIN resumes r ON r.id = resumes_fts.rowid "
+            "WHERE resumes_fts MATCH :query AND r.user_id = :user_id ORDER BY score DESC, r.id LIMIT :limit"
+        )
+        params = {'query': to_fts5_query(clauses), 'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END,
+                  'tokens': SNIPPET_TOKENS}
+    rows = db.session.execute(statement, dict(params, user_id=user_id, limit=limit)).mappings()
+    return [{
+        'id': row['id'],
+        'filename': row['filename'],
+        'created_at': format_timestamp(row['created_at']),
+        'score': round(float(row['score']), 4),
+        'snippet': render_snippet(row['snippet'])
+    } for row in rows]
+
+def search_jobs(query: str, limit: int = 20) -> List[Dict]:
+    """
+    Search job postings, best matches first.
+
+    Returns:
+        List of {id, url, title, company, created_at, score, snippet} dicts
+
+    Raises:
+        InvalidSearchQuery: if the query has no searchable terms
+    """
+    clauses = parse_search_query(query)
+    if db.engine.dialect.name == 'postgresql':
+        statement = text(
+            "SELECT j.id, j.url, j.title, j.company, j.created_at, ts_rank_cd(j.search_vector, q) AS score, "
+            "ts_headline('english', coalesce(j.description, j.title), q, :options) AS snippet "
+            "FROM job_postings j, to_tsquery('english', :query) q "
+            "WHERE j.search_vector @@ q ORDER BY score DESC, j.id LIMIT :limit"
+        )
+        params = {'query': to_tsquery(clauses), 'options': headline_options()}
+    else:
+        # Title matches weigh most, then company, then description
+        statement = text(
+            "SELECT j.id, j.url, j.title, j.company, j.created_at, -bm25(job_postings_fts, 3.0, 2.0, 1.0) AS score, "
+            "snippet(job_postings_fts, -1, :start, :end, '…', :tokens) AS snippet "
+            "FROM job_postings_fts JOIN job_postings j ON j.id = job_postings_fts.rowid "
+            "WHERE job_postings_fts MATCH :query ORDER BY score DESC, j.id LIMIT :limit"
+        )
+        params = {'query': to_fts5_query(clauses), 'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END,
+                  'tokens': SNIPPET_TOKENS}
+    rows = db.session.execute(statement, dict(params, limit=limit)).mappings()
+    return [{
+        'id': row['id'],
+        'url': row['url'],
+        'title': row['title'],
+        'company': row['company'],
+        'created_at': format_timestamp(row['created_at']),
+        'score': round(float(row['score']), 4),
+        'snippet': render_snippet(row['snippet'])
+    } for row in rows]
+
+def headline_options() -> str:
+    """ts_headline options matching the SQLite snippet markers and length."""
+    return f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}'
+
+def format_timestamp(value) -> Optional[str]:
+    """ISO format a timestamp; raw SQLite queries return it as a string."""
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value).replace(' ', 'T')
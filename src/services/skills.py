@@ -0,0 +1,159 @@
+"""Skills taxonomy and single-pass multi-pattern skill matching."""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'skills_taxonomy.json')
+
+def is_word_char(char: str) -> bool:
+    """Check if a character is part of a word (same definition as regex \\w)."""
+    return char.isalnum() or char == '_'
+
+def normalize_skill_text(text: str) -> str:
+    """Lowercase and collapse whitespace so patterns match across line breaks."""
+    return ' '.join((text or '').lower().split())
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over skill names and synonyms.
+
+    The automaton is compiled once and matches every pattern in a single pass over
+    the text. Matches are only reported on word boundaries, so "ai" does not match
+    inside "maintain", and a match nested inside a longer one ("react" inside
+    "react native") is dropped.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]], aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            patterns: (pattern, canonical skill name) pairs; patterns are normalized
+            aliases: Extra normalized names resolved by canonicalize() but not matched in text
+        """
+        # Node 0 is the root; each node has goto transitions, a failure link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, str]]] = [[]]
+        self._aliases: Dict[str, str] = dict(aliases or {})
+
+        for pattern, canonical in patterns:
+            pattern = normalize_skill_text(pattern)
+            if pattern:
+                self._add(pattern, canonical)
+                self._aliases.setdefault(pattern, canonical)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, canonical: str):
+        """Insert a pattern into the trie."""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._outputs[node].append((len(pattern), canonical))
+
+    def _build_failure_links(self):
+        """Breadth-first construction of failure links and merged outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find(self, text: str) -> List[str]:
+        """
+        Find canonical skills mentioned in the text.
+
+        Returns:
+            Canonical skill names in order of first appearance, without duplicates
+        """
+        text = normalize_skill_text(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        length = len(text)
+        node = 0
+
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not outputs[node]:
+                continue
+
+            after_ok = end + 1 >= length or not is_word_char(text[end + 1]) or not is_word_char(char)
+            if not after_ok:
+                continue
+            for pattern_length, canonical in outputs[node]:
+                start = end - pattern_length + 1
+                if start == 0 or not is_word_char(text[start - 1]) or not is_word_char(text[start]):
+                    matches.append((start, end, canonical))
+
+        # Keep the longest match at each position and drop matches nested inside it
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        found: Dict[str, None] = {}
+        covered_to = -1
+        for start, end, canonical in matches:
+            if end > covered_to:
+                found.setdefault(canonical, None)
+                covered_to = end
+
+        return list(found)
+
+    def canonicalize(self, name: str) -> Optional[str]:
+        """Resolve a skill name or synonym to its canonical name, or None if unknown."""
+        return self._aliases.get(normalize_skill_text(name))
+
+def load_taxonomy(path: str = None) -> List[Dict]:
+    """
+    Load the skills taxonomy from a JSON file.
+
+    Each entry is {"name": canonical name, "synonyms": [...], "match_name": bool}.
+    """
+    path = path or os.getenv('SKILLS_TAXONOMY_PATH') or DEFAULT_TAXONOMY_PATH
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def build_matcher(taxonomy: List[Dict]) -> SkillMatcher:
+    """Compile a taxonomy into a SkillMatcher."""
+    patterns = []
+    aliases = {}
+    for entry in taxonomy:
+        name = entry['name']
+        # Names too ambiguous to match in free text still resolve when given as a skill
+        aliases[normalize_skill_text(name)] = name
+        if entry.get('match_name', True):
+            patterns.append((name, name))
+        for synonym in entry.get('synonyms', []):
+            patterns.append((synonym, name))
+    return SkillMatcher(patterns, aliases)
+
+_matcher: Optional[SkillMatcher] = None
+_matcher_lock = threading.Lock()
+
+def get_skill_matcher() -> SkillMatcher:
+    """Get the process-wide skill matcher, compiling the taxonomy on first use."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = build_matcher(load_taxonomy())
+    return _matcher
+
+def extract_skills_from_text(text: str) -> List[str]:
+    """Extract canonical skill names from free text (job descriptions or resumes)."""
+    if not text:
+        return []
+    return get_skill_matcher().find(text)
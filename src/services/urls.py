@@ -0,0 +1,126 @@
+"""Canonical job posting URLs: tracking parameters stripped, host and query normalized, per-domain rules."""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
+
+QueryParams = List[Tuple[str, str]]
+
+# Query parameters that only identify the campaign or referrer, never the posting
+TRACKING_PARAMS = frozenset((
+    'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'ref', 'ref_src', 'referrer', 'trk', 'trackingid'
+))
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Domain -> rule(path, query params) returning the canonical (path, query params)
+_url_rules: Dict[str, Callable[[str, QueryParams], Tuple[str, QueryParams]]] = {}
+
+def register_url_rule(domain: str):
+    """
+    Register a canonicalization rule for a domain and its subdomains.
+
+    Rules run after tracking parameters are dropped and before the query is sorted.
+
+    Usage:
+        @register_url_rule('jobs.lever.co')
+        def canonical_lever(path, params):
+            return path, []
+    """
+    def decorator(fn):
+        _url_rules[domain.lower()] = fn
+        return fn
+    return decorator
+
+def get_url_rule(host: str) -> Optional[Callable[[str, QueryParams], Tuple[str, QueryParams]]]:
+    """Find the rule registered for a host or its closest parent domain."""
+    parts = host.split('.')
+    for i in range(len(parts) - 1):
+        rule = _url_rules.get('.'.join(parts[i:]))
+        if rule:
+            return rule
+    return None
+
+def is_tracking_param(name: str) -> bool:
+    """Check if a query parameter only carries tracking data."""
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a job posting URL to the form used to recognise the same posting.
+
+    http is upgraded to https, the host is lowercased without `www.` or a
+    default port, the fragment, user info, trailing slashes and tracking
+    parameters are dropped, domain rules are applied and the remaining query
+    parameters are sorted. URLs that cannot be parsed are returned stripped.
+    """
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if not host or scheme not in DEFAULT_PORTS:
+        return url
+
+    if host.startswith('www.'):
+        host = host[4:]
+    if scheme == 'http':
+        if port == DEFAULT_PORTS['http']:
+            port = None
+        scheme = 'https'
+    if port == DEFAULT_PORTS['https']:
+        port = None
+
+    path = parts.path.rstrip('/')
+    params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+              if not is_tracking_param(name)]
+    rule = get_url_rule(host)
+    if rule:
+        path, params = rule(path, params)
+
+    netloc = host if port is None else f'{host}:{port}'
+    query = urlencode(sorted(params), quote_via=quote)
+    return f"{scheme}://{netloc}{path}{'?' + query if query else ''}"
+
+def _keep_params(params: QueryParams, names) -> QueryParams:
+    """Keep only the named query parameters."""
+    return [(name, value) for name, value in params if name in names]
+
+@register_url_rule('boards.greenhouse.io')
+def canonical_greenhouse(path: str, params: QueryParams) -> Tuple[str, QueryParams]:
+    """Greenhouse boards: only the embedded job id and board token identify a posting."""
+    return path, _keep_params(params, ('gh_jid', 'token'))
+
+@register_url_rule('jobs.lever.co')
+def canonical_lever(path: str, params: QueryParams) -> Tuple[str, QueryParams]:
+    """Lever: the application form shares the posting's id; query parameters are all sourcing."""
+    if path.endswith('/apply'):
+        path = path[:-len('/apply')]
+    return path, []
+
+LINKEDIN_JOB_PATH = re.compile(r'^/jobs/view/(?:[^/]*-)?(\d+)$')
+
+@register_url_rule('linkedin.com')
+def canonical_linkedin(path: str, params: QueryParams) -> Tuple[str, QueryParams]:
+    """LinkedIn: /jobs/view/<slug>-<id> and search pages with currentJobId become /jobs/view/<id>."""
+    match = LINKEDIN_JOB_PATH.match(path)
+    if match:
+        return f'/jobs/view/{match.group(1)}', []
+    job_ids = [value for name, value in params if name == 'currentJobId' and value.isdigit()]
+    if job_ids:
+        return f'/jobs/view/{job_ids[0]}', []
+    return path, params
+
+@register_url_rule('indeed.com')
+def canonical_indeed(path: str, params: QueryParams) -> Tuple[str, QueryParams]:
+    """Indeed: click-through and view pages with a job key become /viewjob?jk=<key>."""
+    job_keys = _keep_params(params, ('jk', 'vjk'))
+    if job_keys:
+        return '/viewjob', [('jk', job_keys[0][1])]
+    return path, params
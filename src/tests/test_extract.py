@@ -0,0 +1,145 @@
+"""Tests for resume text extraction."""
+
+import pytest
+import os
+import sys
+import time
+from unittest.mock import patch
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from models import db, Resume
+from services.extract_pool import ExtractionPool, ExtractionFailed, ExtractionTimeout
+
+@pytest.fixture
+def app():
+    """Create test application."""
+    app, socketio = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    """Get authentication headers for testing."""
+    response = client.post('/api/auth/signup', json={
+        'email': 'extract@example.com',
+        'password': 'password123'
+    })
+
+    token = response.json['token']
+    return {'Authorization': f'Bearer {token}'}
+
+def worker_pid(_):
+    """Extraction target reporting which worker process ran it."""
+    return os.getpid()
+
+def paged_worker_pid(pages, on_page=None):
+    """Extraction target reporting page progress and which worker process ran it."""
+    for page in range(1, pages + 1):
+        if on_page:
+            on_page(page, pages)
+    return os.getpid()
+
+def test_extraction_pool_timeout_kills_worker():
+    """Test that a document over the time budget fails and its worker is replaced."""
+    pool = ExtractionPool(max_workers=1, timeout=0.5, target=time.sleep)
+    try:
+        started = time.monotonic()
+        with pytest.raises(ExtractionTimeout):
+            pool.extract(30)
+        assert time.monotonic() - started < 10
+
+        # The pool keeps working with a fresh worker
+        assert pool.extract(0) is None
+    finally:
+        pool.shutdown()
+
+def test_extraction_pool_worker_crash_and_memory_cap():
+    """Test that a dead worker or a memory blowup fails only that document."""
+    pool = ExtractionPool(max_workers=1, timeout=20, memory_limit_mb=256, target=bytearray)
+    try:
+        with pytest.raises(ExtractionFailed):
+            pool.extract(2 * 1024 * 1024 * 1024)
+        assert pool.extract(3) == bytearray(3)
+    finally:
+        pool.shutdown()
+
+    pool = ExtractionPool(max_workers=1, timeout=20, target=os._exit)
+    try:
+        with pytest.raises(ExtractionFailed):
+            pool.extract(1)
+    finally:
+        pool.shutdown()
+
+def test_extraction_pool_recycles_workers():
+    """Test that workers are replaced after max_tasks_per_child documents."""
+    pool = ExtractionPool(max_workers=1, timeout=20, max_tasks_per_child=2, target=worker_pid)
+    try:
+        pids = [pool.extract(None) for _ in range(4)]
+        assert pids[0] == pids[1]
+        assert pids[2] == pids[3]
+        assert pids[1] != pids[2]
+    finally:
+        pool.shutdown()
+
+def test_extraction_pool_stops_worker_when_progress_callback_raises():
+    """Test that a failing progress callback propagates and its mid-document worker is replaced."""
+    pool = ExtractionPool(max_workers=1, timeout=20, target=paged_worker_pid)
+    try:
+        first_pid = pool.extract(3)
+        worker = pool._idle[0]
+
+        def on_progress(page, pages):
+            raise ValueError('client went away')
+
+        with pytest.raises(ValueError):
+            pool.extract(3, on_progress=on_progress)
+        assert not worker.process.is_alive()
+        assert pool.extract(3) != first_pid
+    finally:
+        pool.shutdown()
+
+def test_upload_marks_failed_extraction(app, client, auth_headers, tmp_path):
+    """Test that a failed extraction keeps the resume and flags it."""
+    app.config['UPLOAD_DIR'] = str(tmp_path)
+    pool = app.extensions['extraction_pool']
+    with patch.object(pool, 'extract', side_effect=ExtractionTimeout('Extraction timed out after 30s')):
+        response = client.post('/api/resumes', headers=auth_headers, data={
+            'file': (open(os.path.join(os.path.dirname(__file__), 'fixtures', 'job_static.html'), 'rb'), 'resume.pdf')
+        }, content_type='multipart/form-data')
+
+    assert response.status_code == 201
+    resume = response.json['resume']
+    assert resume['extraction_failed'] is True
+    assert resume['text'] is None
+
+def test_add_missing_columns(app):
+    """Test that columns added to existing models are created on startup."""
+    from db import add_missing_columns
+
+    db.session.execute(db.text('DROP TABLE match_results'))
+    db.session.execute(db.text('DROP TABLE resumes'))
+    db.session.execute(db.text(
+        'CREATE TABLE resumes (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, '
+        'filename VARCHAR(255) NOT NULL, filepath VARCHAR(500) NOT NULL, text TEXT, created_at DATETIME)'
+    ))
+    db.session.execute(db.text("INSERT INTO resumes (user_id, filename, filepath) VALUES (1, 'a.pdf', '/tmp/a.pdf')"))
+    db.session.commit()
+
+    add_missing_columns()
+    db.create_all()
+
+    assert Resume.query.one().extraction_failed is False
+
+    # Boolean defaults are rendered per dialect; Postgres rejects DEFAULT 0 on a boolean column
+    from sqlalchemy.dialects import postgresql
+    dialect = postgresql.dialect()
+    assert dialect.ddl_compiler(dialect, None).get_column_default_string(Resume.__table__.c.extraction_failed) == 'false'
@@ -3,6 +3,7 @@
 import pytest
 import os
 from unittest.mock import patch, mock_open
+import requests
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -46,9 +47,11 @@ def test_parse_job_static_html(client, auth_headers):
         html_content = f.read()
     
     # Mock the requests.get to return our static HTML
-    with patch('services.scraper.requests.get') as mock_get:
+    with patch('services.scraper.requests.Session.get') as mock_get:
         mock_response = mock_get.return_value
-        mock_response.content = html_content.encode('utf-8')
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [html_content.encode('utf-8')]
         mock_response.raise_for_status.return_value = None
         
         # Test the job parsing endpoint
@@ -100,9 +103,11 @@ def test_parse_job_unauthorized(client):
 def test_list_jobs(client, auth_headers):
     """Test listing job postings."""
     # First, create a job posting
-    with patch('services.scraper.requests.get') as mock_get:
+    with patch('services.scraper.requests.Session.get') as mock_get:
         mock_response = mock_get.return_value
-        mock_response.content = b'<html><h1>Test Job</h1></html>'
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b'<html><h1>Test Job</h1></html>']
         mock_response.raise_for_status.return_value = None
         
         client.post('/api/jobs/parse',
@@ -120,9 +125,11 @@ def test_list_jobs(client, auth_headers):
 def test_get_job_by_id(client, auth_headers):
     """Test getting a specific job posting by ID."""
     # First, create a job posting
-    with patch('services.scraper.requests.get') as mock_get:
+    with patch('services.scraper.requests.Session.get') as mock_get:
         mock_response = mock_get.return_value
-        mock_response.content = b'<html><h1>Test Job</h1></html>'
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b'<html><h1>Test Job</h1></html>']
         mock_response.raise_for_status.return_value = None
         
         create_response = client.post('/api/jobs/parse',
@@ -145,3 +152,524 @@ def test_get_nonexistent_job(client, auth_headers):
     
     assert response.status_code == 404
     assert 'not found' in response.json['error']
+
+def test_extract_skills_respects_word_boundaries():
+    """Test that skills only match whole words."""
+    from services.skills import extract_skills_from_text
+    
+    skills = extract_skills_from_text('Maintain and retain the Javanese gardens.')
+    assert 'AI' not in skills
+    assert 'Java' not in skills
+    
+    skills = extract_skills_from_text('Experience with AI, Java and C++ (or C#).')
+    assert skills == ['AI', 'Java', 'C++', 'C#']
+
+def test_extract_skills_canonicalizes_synonyms():
+    """Test that synonyms map to canonical taxonomy names in order of appearance."""
+    from services.skills import extract_skills_from_text
+    
+    text = 'Postgres, ReactJS and k8s on Amazon\nWeb Services; Node.js or nodejs; golang.'
+    assert extract_skills_from_text(text) == ['PostgreSQL', 'React', 'Kubernetes', 'AWS', 'Node.js', 'Go']
+    # Ambiguous English words are not treated as skills
+    assert extract_skills_from_text('We go the extra mile to express ideas') == []
+
+def test_skill_matcher_overlapping_patterns():
+    """Test the Aho-Corasick matcher with overlapping and nested patterns."""
+    from services.skills import build_matcher
+    
+    matcher = build_matcher([
+        {'name': 'Machine Learning', 'synonyms': ['ml']},
+        {'name': 'Learning', 'synonyms': []},
+        {'name': 'React', 'synonyms': []},
+        {'name': 'React Native', 'synonyms': []},
+        {'name': 'Shell', 'synonyms': ['she']},
+    ])
+    
+    assert matcher.find('Machine learning with React Native') == ['Machine Learning', 'React Native']
+    assert matcher.find('React and learning') == ['React', 'Learning']
+    assert matcher.find('the shells she sells') == ['Shell']
+    assert matcher.find('') == []
+
+def test_extract_requirements_single_pass():
+    """Test combined requirement extraction with bounded, line-limited captures."""
+    from services.scraper import extract_requirements, MAX_REQUIREMENT_LENGTH
+    
+    description = (
+        "3+ years of experience in backend development\n"
+        "Bachelor's degree in Computer Science\n"
+        "Experience with Docker and Kubernetes\n"
+        "Knowledge of " + "distributed systems " * 20 + "\n"
+        "Experience with Docker and Kubernetes"
+    )
+    requirements = extract_requirements(None, description)
+    
+    assert requirements[:3] == ['3+ years of experience', 'Computer Science', 'Docker And Kubernetes']
+    assert len(requirements) == 4
+    assert all(len(requirement) <= MAX_REQUIREMENT_LENGTH for requirement in requirements)
+    assert all('\n' not in requirement for requirement in requirements)
+    
+    # The years match must not swallow the "experience with" that follows it
+    assert extract_requirements(None, '5+ years of experience with Python and Django.') == \
+        ['5+ years of experience', 'Python And Django']
+    
+    # A capture ends at the next cue in the same clause
+    assert extract_requirements(None, 'Proficient in Python and experience with Go') == ['Python', 'Go']
+
+def test_extract_job_fields_json_ld_fast_path():
+    """Test that a JobPosting in JSON-LD is used without the selector cascade."""
+    from services.scraper import extract_job_fields
+    
+    html = b"""
+    <html><head>
+    <script type="application/ld+json">
+    {"@context": "https://schema.org", "@graph": [
+        {"@type": "Organization", "name": "Ignored"},
+        {"@type": "JobPosting", "title": "Data Engineer",
+         "hiringOrganization": {"@type": "Organization", "name": "Acme Corp"},
+         "description": "&lt;p&gt;Build pipelines with Python.&lt;/p&gt;&lt;ul&gt;&lt;li&gt;Airflow&lt;/li&gt;&lt;/ul&gt;",
+         "qualifications": "Experience with Spark"}
+    ]}
+    </script></head>
+    <body><h1>Wrong Title</h1><div class="company-name">Wrong Company</div></body></html>
+    """
+    with patch('services.scraper.extract_title') as mock_title:
+        fields = extract_job_fields(html, 'https://careers.example.com/jobs/1')
+        mock_title.assert_not_called()
+    
+    assert fields['extractor'] == 'json-ld'
+    assert fields['title'] == 'Data Engineer'
+    assert fields['company'] == 'Acme Corp'
+    assert fields['description'] == 'Build pipelines with Python.\nAirflow'
+    assert fields['extra_text'] == 'Experience with Spark'
+
+def test_extract_job_fields_domain_registry():
+    """Test registered domain extractors, subdomain lookup and cascade fallback."""
+    from services.extractors import register_extractor, get_domain_extractor, _extractors
+    from services.scraper import extract_job_fields
+    
+    @register_extractor('jobs.example.org')
+    def extract_example(soup, url):
+        return {'title': soup.select_one('.posting h2').get_text(strip=True), 'company': 'Example Org'}
+    
+    try:
+        assert get_domain_extractor('https://eu.jobs.example.org/1') is extract_example
+        assert get_domain_extractor('https://example.org/1') is None
+        
+        html = b"""
+        <html><body><div class="posting"><h2>Site Reliability Engineer</h2></div>
+        <div class="job-description">""" + b"Run production systems. " * 10 + b"""</div></body></html>
+        """
+        fields = extract_job_fields(html, 'https://jobs.example.org/1')
+        
+        assert fields['extractor'] == 'domain'
+        assert fields['title'] == 'Site Reliability Engineer'
+        assert fields['company'] == 'Example Org'
+        # Description came from the generic cascade
+        assert fields['description'].startswith('Run production systems.')
+    finally:
+        del _extractors['jobs.example.org']
+
+def test_read_capped_body_cuts_off_large_pages():
+    """Test that streamed bodies stop downloading at the byte cap."""
+    from unittest.mock import MagicMock
+    from services.scraper import read_capped_body
+    
+    pulled = []
+    def chunks(chunk_size):
+        for i in range(100):
+            pulled.append(i)
+            yield b'x' * 1000
+    
+    response = MagicMock(iter_content=chunks)
+    body = read_capped_body(response, 2500)
+    
+    assert body == b'x' * 2500
+    assert len(pulled) == 3
+
+def test_parse_html_skips_unused_markup():
+    """Test that scripts, styles and comments are dropped before parsing."""
+    from services.scraper import parse_html, extract_title
+    
+    html = (b'<html><head><title>Page</title><style>h1 {color: red}</style></head><body>'
+            b'<script>var app = "<h1>Fake</h1>";</script><!-- <h1>Old</h1> -->'
+            b'<h1 class="job-title">Platform Engineer</h1></body></html>')
+    soup = parse_html(html)
+    
+    assert soup.find('script') is None
+    assert extract_title(soup) == 'Platform Engineer'
+
+def test_reparse_sends_conditional_request(client, auth_headers):
+    """Test that re-parsing a URL uses stored validators and skips work on 304."""
+    from unittest.mock import MagicMock
+    fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures', 'job_static.html')
+    with open(fixture_path, 'rb') as f:
+        html_content = f.read()
+    
+    first = MagicMock(status_code=200, iter_content=MagicMock(return_value=[html_content]),
+                      headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2026 07:28:00 GMT'})
+    not_modified = MagicMock(status_code=304, headers={})
+    
+    with patch('services.scraper.requests.Session.get', side_effect=[first, not_modified]) as mock_get:
+        url = 'https://example.com/conditional-job'
+        response = client.post('/api/jobs/parse', json={'url': url}, headers=auth_headers)
+        assert response.status_code == 200
+        assert 'not_modified' not in response.json
+        job_id = response.json['job_posting']['id']
+        
+        # First fetch is unconditional
+        assert 'If-None-Match' not in mock_get.call_args_list[0].kwargs['headers']
+        
+        with patch('services.scraper.extract_description') as mock_extract:
+            response = client.post('/api/jobs/parse', json={'url': url, 'force': True}, headers=auth_headers)
+            mock_extract.assert_not_called()
+        
+        assert response.status_code == 200
+        assert response.json['not_modified'] is True
+        assert response.json['job_posting']['id'] == job_id
+        assert response.json['job_posting']['title'] == 'Senior Software Engineer'
+        
+        conditional_headers = mock_get.call_args_list[1].kwargs['headers']
+        assert conditional_headers['If-None-Match'] == '"v1"'
+        assert conditional_headers['If-Modified-Since'] == 'Wed, 21 Oct 2026 07:28:00 GMT'
+
+def test_http_session_is_shared():
+    """Test that scraping reuses one pooled session."""
+    from services.scraper import get_http_session, close_http_session
+    
+    session = get_http_session()
+    assert get_http_session() is session
+    assert session.get_adapter('https://example.com')._pool_maxsize > 0
+    
+    close_http_session()
+    assert get_http_session() is not session
+
+def test_parse_job_serves_fresh_posting(client, auth_headers):
+    """Test that a recently parsed URL is returned without scraping unless forced."""
+    with patch('services.scraper.requests.Session.get') as mock_get:
+        mock_response = mock_get.return_value
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b'<html><h1>Fresh Job</h1></html>']
+        mock_response.raise_for_status.return_value = None
+        
+        url = 'https://example.com/fresh-job'
+        first = client.post('/api/jobs/parse', json={'url': url}, headers=auth_headers)
+        second = client.post('/api/jobs/parse', json={'url': url}, headers=auth_headers)
+        
+        assert mock_get.call_count == 1
+        assert second.status_code == 200
+        assert second.json['cached'] is True
+        assert second.json['job_posting']['id'] == first.json['job_posting']['id']
+        
+        forced = client.post('/api/jobs/parse?force=true', json={'url': url}, headers=auth_headers)
+        assert forced.status_code == 200
+        assert 'cached' not in forced.json
+        assert mock_get.call_count == 2
+
+def test_single_flight_shares_in_flight_call():
+    """Test that concurrent calls for one key run the function once."""
+    import threading
+    from services.singleflight import SingleFlight
+    
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    
+    def slow_scrape():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return 42
+    
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('url', slow_scrape)))
+    leader.start()
+    started.wait(2)
+    followers = [threading.Thread(target=lambda: results.append(flight.do('url', slow_scrape))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    # Give the followers time to attach to the in-flight call
+    import time
+    time.sleep(0.1)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(2)
+    
+    assert len(calls) == 1
+    assert sorted(results) == [(42, False), (42, True), (42, True), (42, True)]
+    
+    # Errors are shared too, and the key is released afterwards
+    with pytest.raises(ValueError):
+        flight.do('url', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    assert flight.do('url', lambda: 7) == (7, False)
+
+def test_parse_jobs_bulk(app, client, auth_headers):
+    """Test bulk parsing with batching, per-host limits and per-URL results."""
+    import threading
+    import time
+    from unittest.mock import MagicMock
+    
+    app.config['JOB_BULK_CONCURRENCY'] = 6
+    app.config['JOB_BULK_PER_HOST'] = 2
+    app.config['JOB_BULK_COMMIT_SIZE'] = 2
+    
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+    
+    def fake_get(url, headers=None, timeout=None, stream=False):
+        host = url.split('/')[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        if url.endswith('broken'):
+            return MagicMock(status_code=500, headers={},
+                             raise_for_status=MagicMock(side_effect=requests.HTTPError('500 Server Error')))
+        return MagicMock(status_code=200, headers={}, iter_content=MagicMock(return_value=[f'<html><h1>{url}</h1></html>'.encode()]))
+    
+    urls = [f'https://a.example.com/job/{i}' for i in range(5)] + \
+           [f'https://b.example.com/job/{i}' for i in range(3)] + \
+           ['https://b.example.com/broken', 'https://a.example.com/job/0']
+    
+    with patch('services.scraper.requests.Session.get', side_effect=fake_get):
+        response = client.post('/api/jobs/parse/bulk', json={'urls': urls}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    results = response.json['results']
+    # Duplicates are dropped and order is preserved
+    assert [result['url'] for result in results] == urls[:-1]
+    assert response.json['summary'] == {'scraped': 8, 'failed': 1}
+    assert results[0]['job_posting']['title'] == 'https://a.example.com/job/0'
+    assert 'Failed to fetch URL' in results[8]['error']
+    assert max(peak.values()) <= 2
+    assert JobPosting.query.count() == 8
+    
+    # A second run serves everything fresh from the database
+    with patch('services.scraper.requests.Session.get', side_effect=fake_get) as mock_get:
+        response = client.post('/api/jobs/parse/bulk', json={'urls': urls[:8]}, headers=auth_headers)
+        mock_get.assert_not_called()
+    assert response.json['summary'] == {'cached': 8}
+
+def test_parse_jobs_bulk_validation(app, client, auth_headers):
+    """Test bulk parsing input validation."""
+    response = client.post('/api/jobs/parse/bulk', json={'urls': []}, headers=auth_headers)
+    assert response.status_code == 400
+    
+    app.config['JOB_BULK_MAX_URLS'] = 2
+    response = client.post('/api/jobs/parse/bulk',
+                          json={'urls': ['https://a.com/1', 'https://a.com/2', 'https://a.com/3']},
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+def test_parse_job_stores_features(app, client, auth_headers):
+    """Test that parsing a posting stores its features and edits rebuild them."""
+    from models import JobFeatures
+    from services.job_features import compute_job_features, ensure_job_features
+    
+    fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures', 'job_static.html')
+    with open(fixture_path, 'rb') as f:
+        html_content = f.read()
+    
+    with patch('services.scraper.requests.Session.get') as mock_get:
+        mock_response = mock_get.return_value
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [html_content]
+        
+        response = client.post('/api/jobs/parse', json={'url': 'https://example.com/job-posting'}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    job = JobPosting.query.get(response.json['job_posting']['id'])
+    features = JobFeatures.query.filter_by(job_posting_id=job.id).one().to_features()
+    assert features == compute_job_features(job.to_dict())
+    assert ('Python', 'python') in features['skill_keys']
+    assert all(len(requirement) == 2 for requirement in features['requirements'])
+    
+    # Unchanged content reuses the stored record; changed content rebuilds it
+    with patch('services.job_features.compute_job_features') as mock_compute:
+        ensure_job_features(job)
+        assert mock_compute.call_count == 0
+    
+    job.description = 'Maintain Kubernetes clusters'
+    assert 'kubernetes' in ensure_job_features(job)['tokens']
+    db.session.commit()
+    assert job.features.content_hash != features['content_hash']
+
+def test_job_duplicates_finds_reposted_description(app, client, auth_headers):
+    """Test that a reposted job description is found as a near-duplicate."""
+    from models import JobFeatures
+    
+    description = (
+        'We are hiring a data engineer to own our batch and streaming pipelines. You will build '
+        'Airflow DAGs, maintain Spark jobs on EMR, model warehouse tables in Snowflake and work '
+        'with analysts to define metrics. Experience with Python, SQL and Kafka is required and '
+        'familiarity with dbt and Terraform is a plus. The role reports to the head of data.'
+    )
+    with app.app_context():
+        jobs = [
+            JobPosting(url='https://example.com/jobs/1', title='Data Engineer', company='DataCo', description=description),
+            JobPosting(url='https://example.com/jobs/2', title='Data Engineer', company='DataCo',
+                       description=description + ' Apply by Friday.'),
+            JobPosting(url='https://example.com/jobs/3', title='Chef', company='Bistro',
+                       description='Prepare seasonal menus and run the pastry section.')
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+        job_ids = [job.id for job in jobs]
+    
+    # The lookup only reads: postings stored without signatures wait for the startup backfill
+    response = client.get(f'/api/jobs/{job_ids[0]}/duplicates', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json['duplicates'] == []
+    assert JobFeatures.query.count() == 0
+    
+    from db import backfill_features
+    with app.app_context():
+        backfill_features()
+    response = client.get(f'/api/jobs/{job_ids[0]}/duplicates', headers=auth_headers)
+    
+    assert response.status_code == 200
+    duplicates = response.json['duplicates']
+    assert [entry['job_posting']['id'] for entry in duplicates] == [job_ids[1]]
+    assert duplicates[0]['similarity'] >= 0.8
+
+def test_parse_job_rejects_url_too_long_once_canonical(app, client, auth_headers):
+    """Test that a URL whose canonical form outgrows the column is rejected before it is stored."""
+    from models import MAX_URL_LENGTH
+    
+    url = 'http://example.com/' + 'a' * (MAX_URL_LENGTH - len('http://example.com/'))
+    assert len(url) == MAX_URL_LENGTH
+    
+    with patch('api.jobs.scrape_job_posting') as mock_scrape:
+        response = client.post('/api/jobs/parse', json={'url': url}, headers=auth_headers)
+        bulk = client.post('/api/jobs/parse/bulk', json={'urls': [url]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert bulk.json['results'][0]['status'] == 'failed'
+    assert mock_scrape.call_count == 0
+    with pytest.raises(ValueError):
+        JobPosting(url=url, title='Engineer')
+
+def test_canonicalize_url():
+    """Test URL canonicalization and per-domain rules."""
+    from services.urls import canonicalize_url
+    
+    canonical = 'https://example.com/jobs/42?team=data&type=full'
+    for variant in ('http://www.Example.com:80/jobs/42/?type=full&team=data&utm_source=x',
+                    'https://EXAMPLE.com:443/jobs/42?gclid=abc&team=data&type=full#apply',
+                    'https://example.com/jobs/42/?fbclid=1&type=full&team=data&utm_campaign=spring'):
+        assert canonicalize_url(variant) == canonical
+    assert canonicalize_url('https://example.com:8443/jobs/') == 'https://example.com:8443/jobs'
+    
+    assert canonicalize_url('https://jobs.lever.co/acme/1234-abcd/apply?lever-source=LinkedIn') == \
+        'https://jobs.lever.co/acme/1234-abcd'
+    assert canonicalize_url('https://boards.greenhouse.io/acme/jobs/99?gh_src=abc&gh_jid=99') == \
+        'https://boards.greenhouse.io/acme/jobs/99?gh_jid=99'
+    assert canonicalize_url('https://www.linkedin.com/jobs/view/senior-engineer-at-acme-3712345678/?refId=x&trk=y') == \
+        'https://linkedin.com/jobs/view/3712345678'
+    assert canonicalize_url('https://www.linkedin.com/jobs/search/?currentJobId=3712345678&keywords=python') == \
+        'https://linkedin.com/jobs/view/3712345678'
+    assert canonicalize_url('https://uk.indeed.com/rc/clk?jk=abc123&fccid=f&from=serp') == \
+        'https://uk.indeed.com/viewjob?jk=abc123'
+    assert canonicalize_url(' not a url ') == 'not a url'
+
+def test_parse_job_url_variants_share_posting(client, auth_headers):
+    """Test that tracking and formatting variants of a URL resolve to one posting."""
+    with patch('services.scraper.requests.Session.get') as mock_get:
+        mock_response = mock_get.return_value
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b'<html><h1>Canonical Job</h1></html>']
+        
+        first = client.post('/api/jobs/parse', json={'url': 'https://example.com/jobs/7?utm_source=newsletter'},
+                            headers=auth_headers)
+        second = client.post('/api/jobs/parse', json={'url': 'http://www.example.com/jobs/7/'}, headers=auth_headers)
+        forced = client.post('/api/jobs/parse', json={'url': 'https://example.com/jobs/7#top', 'force': True},
+                             headers=auth_headers)
+    
+    assert first.json['job_posting']['canonical_url'] == 'https://example.com/jobs/7'
+    assert first.json['job_posting']['url'] == 'https://example.com/jobs/7?utm_source=newsletter'
+    assert second.json['cached'] is True
+    assert second.json['job_posting']['id'] == first.json['job_posting']['id']
+    assert forced.json['job_posting']['id'] == first.json['job_posting']['id']
+    assert mock_get.call_count == 2
+    assert JobPosting.query.count() == 1
+    
+    with patch('services.scraper.requests.Session.get') as mock_get:
+        response = client.post('/api/jobs/parse/bulk',
+                               json={'urls': ['https://example.com/jobs/7?gclid=1', 'https://www.example.com/jobs/7']},
+                               headers=auth_headers)
+        mock_get.assert_not_called()
+    assert [result['url'] for result in response.json['results']] == ['https://example.com/jobs/7?gclid=1']
+    assert response.json['summary'] == {'cached': 1}
+
+def test_merge_duplicate_job_postings(app):
+    """Test that the startup migration merges postings stored under variant URLs."""
+    from datetime import datetime, timedelta
+    from models import User, MatchResult, FetchMetadata
+    from db import merge_duplicate_job_postings
+    
+    user = User(email='merge@example.com')
+    user.set_password('password123')
+    older = JobPosting(url='https://example.com/jobs/1?utm_source=a', title='Old title',
+                       created_at=datetime.utcnow() - timedelta(days=2))
+    newer = JobPosting(url='http://www.example.com/jobs/1/', title='New title')
+    other = JobPosting(url='https://example.com/jobs/2', title='Other')
+    # Rows stored before canonical URLs existed
+    for job in (older, newer, other):
+        job.canonical_url = None
+    db.session.add_all([user, older, newer, other])
+    db.session.commit()
+    db.session.add_all([
+        MatchResult(user_id=user.id, job_posting_id=newer.id, score=70, missing_keywords=[], suggestions=[]),
+        FetchMetadata(url='https://example.com/jobs/1?utm_source=a', etag='"old"',
+                      fetched_at=datetime.utcnow() - timedelta(days=2)),
+        FetchMetadata(url='http://www.example.com/jobs/1/', etag='"new"')
+    ])
+    db.session.commit()
+    older_id, other_id = older.id, other.id
+    db.session.expire_all()
+    
+    merge_duplicate_job_postings()
+    
+    assert sorted(job.id for job in JobPosting.query.all()) == [older_id, other_id]
+    survivor = JobPosting.query.get(older_id)
+    assert survivor.canonical_url == 'https://example.com/jobs/1'
+    assert survivor.title == 'New title'
+    assert JobPosting.query.get(other_id).canonical_url == 'https://example.com/jobs/2'
+    assert MatchResult.query.one().job_posting_id == older_id
+    fetch_meta = FetchMetadata.query.one()
+    assert (fetch_meta.url, fetch_meta.etag) == ('https://example.com/jobs/1', '"new"')
+
+def test_parse_jobs_bulk_retries_rows_stored_concurrently(app, client, auth_headers):
+    """Test that a posting stored by another request mid-bulk is updated instead of failing the batch."""
+    from unittest.mock import MagicMock
+    from api import jobs as jobs_api
+    
+    app.config['JOB_BULK_COMMIT_SIZE'] = 2
+    real_scrape = jobs_api.scrape_job_postings
+    
+    def scrape_after_concurrent_insert(fetches, **kwargs):
+        # Another request stores the first URL after this one loaded existing postings
+        db.session.add(JobPosting(url='https://example.com/race?utm_source=x', title='Stored elsewhere'))
+        db.session.commit()
+        return real_scrape(fetches, **kwargs)
+    
+    def fake_get(url, headers=None, timeout=None, stream=False):
+        return MagicMock(status_code=200, headers={}, iter_content=MagicMock(return_value=[f'<html><h1>{url}</h1></html>'.encode()]))
+    
+    with patch('api.jobs.scrape_job_postings', side_effect=scrape_after_concurrent_insert), \
+            patch('services.scraper.requests.Session.get', side_effect=fake_get):
+        response = client.post('/api/jobs/parse/bulk',
+                               json={'urls': ['https://example.com/race', 'https://example.com/calm']},
+                               headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert response.json['summary'] == {'scraped': 2}
+    race = JobPosting.query.filter_by(canonical_url='https://example.com/race').one()
+    assert race.title == 'https://example.com/race'
+    assert response.json['results'][0]['job_posting']['id'] == race.id
+    assert JobPosting.query.count() == 2
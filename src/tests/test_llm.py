@@ -0,0 +1,181 @@
+"""Tests for LLM service helpers."""
+
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import httpx
+import openai
+from services.rate_limit import TokenBucket, RateLimiter, call_with_retries
+from services.llm import is_retryable_error, get_retry_after
+
+def make_status_error(status_code, headers=None):
+    """Build an OpenAI status error for the given HTTP status."""
+    request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    error_class = {429: openai.RateLimitError, 400: openai.BadRequestError}.get(status_code, openai.InternalServerError)
+    return error_class('error', response=response, body=None)
+
+def test_token_bucket_allows_burst_then_waits():
+    """Test that the bucket serves its capacity immediately and then throttles."""
+    now = [0.0]
+    bucket = TokenBucket(capacity=3, refill_per_second=1, clock=lambda: now[0])
+    
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    
+    now[0] += 1.0
+    assert bucket.try_acquire() == 0
+
+def test_token_bucket_clamps_oversized_requests():
+    """Test that a request larger than the bucket can still be served."""
+    bucket = TokenBucket(capacity=10, refill_per_second=1, clock=lambda: 0.0)
+    
+    assert bucket.try_acquire(50) == 0
+    assert bucket.try_acquire(1) > 0
+
+def test_rate_limiter_treats_zero_as_unlimited():
+    """Test that a limit of 0 disables that bucket instead of dividing by a zero refill rate."""
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    for _ in range(3):
+        limiter.acquire(10 ** 6)
+    
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=100)
+    assert limiter.requests is None
+    assert limiter.tokens.try_acquire(100) == 0
+
+def test_call_with_retries_retries_rate_limits():
+    """Test that 429 and 5xx responses are retried until success."""
+    fn = MagicMock(side_effect=[make_status_error(429), make_status_error(503), 'ok'])
+    sleeps = []
+    
+    result = call_with_retries(fn, is_retryable_error, max_retries=3, sleep=sleeps.append)
+    
+    assert result == 'ok'
+    assert fn.call_count == 3
+    assert len(sleeps) == 2
+
+def test_call_with_retries_gives_up():
+    """Test that non-retryable errors and exhausted retries are raised."""
+    fn = MagicMock(side_effect=make_status_error(400))
+    with pytest.raises(openai.BadRequestError):
+        call_with_retries(fn, is_retryable_error, max_retries=3, sleep=lambda s: None)
+    assert fn.call_count == 1
+    
+    fn = MagicMock(side_effect=make_status_error(500))
+    with pytest.raises(openai.InternalServerError):
+        call_with_retries(fn, is_retryable_error, max_retries=2, sleep=lambda s: None)
+    assert fn.call_count == 3
+
+def test_retry_after_header_is_honoured():
+    """Test that a Retry-After header overrides the backoff delay."""
+    error = make_status_error(429, headers={'retry-after': '7'})
+    assert get_retry_after(error) == 7.0
+    
+    fn = MagicMock(side_effect=[error, 'ok'])
+    sleeps = []
+    call_with_retries(fn, is_retryable_error, sleep=sleeps.append, retry_after=get_retry_after)
+    assert sleeps == [7.0]
+
+def test_openai_clients_are_pooled_per_key_and_base_url():
+    """Test that clients are reused per (api key, base URL) and closed on shutdown."""
+    from services.llm import get_openai_client, close_openai_clients
+    close_openai_clients()
+    
+    client = get_openai_client('sk-test', 'http://127.0.0.1:9999/v1')
+    assert get_openai_client('sk-test', 'http://127.0.0.1:9999/v1') is client
+    assert get_openai_client('sk-other', 'http://127.0.0.1:9999/v1') is not client
+    assert get_openai_client('sk-test', 'http://127.0.0.1:9998/v1') is not client
+    assert str(client.base_url).startswith('http://127.0.0.1:9999/v1')
+    assert client.max_retries == 0
+    
+    close_openai_clients()
+    assert client._client.is_closed
+    assert get_openai_client('sk-test', 'http://127.0.0.1:9999/v1') is not client
+    close_openai_clients()
+
+def test_openai_client_keeps_connect_timeout(monkeypatch):
+    """Test that the client's request timeout keeps the shorter connect timeout."""
+    from services.llm import get_openai_client, close_openai_clients
+    close_openai_clients()
+    monkeypatch.setenv('OPENAI_TIMEOUT', '45')
+    monkeypatch.setenv('OPENAI_CONNECT_TIMEOUT', '3')
+    
+    client = get_openai_client('sk-test', 'http://127.0.0.1:9999/v1')
+    for timeout in (client.timeout, client._client.timeout):
+        assert (timeout.connect, timeout.read) == (3.0, 45.0)
+    close_openai_clients()
+
+def test_score_batch_matches_fallback_response():
+    """Test that the batch scorer returns exactly what get_fallback_response returns."""
+    import random
+    from services.llm import score_batch, get_fallback_response
+    
+    rng = random.Random(1234)
+    vocabulary = [
+        'python', 'javascript', 'java', 'react', 'sql', 'postgresql', 'docker', 'kubernetes',
+        'leadership', 'experience', 'backend', 'services', 'maintain', 'ai', 'node.js', 'ci/cd',
+        'Développeur', 'straße', 'team', 'agile', 'data', 'science', 'tableau', 'excel', 'the', 'and'
+    ]
+    
+    def random_text(n):
+        return ' '.join(rng.choice(vocabulary) for _ in range(n))
+    
+    jobs = [
+        {'title': 'Backend Engineer', 'description': random_text(40), 'skills': ['Python', 'SQL', 'Java', 'AI']},
+        {'title': 'Data Scientist', 'description': random_text(80), 'skills': []},
+        {'title': None, 'description': random_text(5), 'skills': ['Node.js', 'CI/CD', 'Excel', 'React', 'Go', 'Rust']},
+        {'description': ''}
+    ]
+    resumes = [random_text(rng.randint(0, 120)) for _ in range(60)] + ['', 'PYTHON JAVA SQL']
+    
+    for job in jobs:
+        expected = [get_fallback_response(resume, job) for resume in resumes]
+        assert score_batch(resumes, job) == expected
+    
+    assert score_batch([], jobs[0]) == []
+
+def test_fallback_matches_skills_by_canonical_name():
+    """Test that taxonomy skills match aliases while unknown skills fall back to substring search."""
+    from services.llm import get_fallback_response
+    
+    job = {'title': 'Platform Engineer', 'description': '', 'skills': ['Kubernetes', 'Golang', 'Terraform Cloud']}
+    assert get_fallback_response('Ran k8s clusters with golang and Terraform Cloud', job)['missing_keywords'] == []
+    
+    # "Java" is a distinct skill from "JavaScript" rather than a substring of it
+    job = {'title': '', 'description': '', 'skills': ['Java']}
+    assert get_fallback_response('JavaScript developer', job)['missing_keywords'] == ['Java']
+
+def test_scorers_accept_stored_job_features():
+    """Test that scoring with stored job features matches scoring from the raw job."""
+    from models import JobFeatures
+    from services.job_features import compute_job_features
+    from services.llm import score_batch, get_fallback_response
+    
+    job = {
+        'title': 'Backend Engineer',
+        'description': 'Build Python services and Python tooling with PostgreSQL',
+        'skills': ['Python', 'k8s', 'Fortran 77'],
+        'requirements': ['3+ years of Python', 'Degree in CS']
+    }
+    features = compute_job_features(job)
+    record = JobFeatures(
+        content_hash=features['content_hash'],
+        tokens_json=json.dumps(features['tokens']),
+        keyword_count=features['keyword_count'],
+        skills_json=json.dumps(features['skill_keys']),
+        requirements_json=json.dumps(features['requirements'])
+    )
+    stored = record.to_features()
+    assert stored == features
+    assert features['requirements'][0] == ('3+ years of Python', ['Python'])
+    
+    resumes = ['Python and Kubernetes services', 'Fortran 77 numerics', '']
+    expected = [get_fallback_response(resume, job) for resume in resumes]
+    assert score_batch(resumes, job, job_features=stored) == expected
+    assert [get_fallback_response(resume, job, job_features=stored) for resume in resumes] == expected
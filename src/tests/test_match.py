@@ -4,10 +4,12 @@ import pytest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+from datetime import datetime, timedelta
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from app import create_app
-from models import db, User, Resume, JobPosting
+from models import db, User, Resume, JobPosting, ResumeFeatures, MatchResult
+from db import backfill_features
 
 @pytest.fixture
 def app():
@@ -257,3 +259,505 @@ def test_match_fallback_without_openai(mock_llm, client, auth_headers, test_resu
     assert match_result['score'] == 45
     assert len(match_result['missing_keywords']) > 0
     assert len(match_result['suggestions']) > 0
+
+@pytest.fixture
+def signup_headers(client):
+    """Get authentication headers for a freshly signed-up user."""
+    response = client.post('/api/auth/signup', json={
+        'email': 'async@example.com',
+        'password': 'password123'
+    })
+    
+    token = response.json['token']
+    return {'Authorization': f'Bearer {token}'}
+
+def wait_for_match_job(client, headers, job_id, timeout=5):
+    """Poll a match job until it leaves the queued/running states."""
+    import time
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = client.get(f'/api/match/jobs/{job_id}', headers=headers)
+        if response.json['job']['status'] in ('completed', 'failed'):
+            return response
+        time.sleep(0.02)
+    raise AssertionError('Match job did not finish in time')
+
+@patch('api.match.suggest_resume_additions')
+def test_match_async_returns_job_id(mock_llm, client, signup_headers):
+    """Test that async matching returns 202 and the result can be polled."""
+    mock_llm.return_value = {
+        'score': 77,
+        'missing_keywords': ['Go'],
+        'suggestions': ['Mention Go projects']
+    }
+    
+    response = client.post('/api/match',
+                          json={
+                              'resumeText': 'Python developer',
+                              'jobData': {'title': 'Backend Engineer', 'skills': ['Python', 'Go']},
+                              'async': True
+                          },
+                          headers=signup_headers)
+    
+    assert response.status_code == 202
+    job = response.json['job']
+    assert job['status'] in ('queued', 'running', 'completed')
+    assert response.headers['Location'] == f"/api/match/jobs/{job['id']}"
+    assert 'queue_depth' in response.json['stats']
+    
+    poll_response = wait_for_match_job(client, signup_headers, job['id'])
+    assert poll_response.status_code == 200
+    finished = poll_response.json['job']
+    assert finished['status'] == 'completed'
+    assert finished['match_result']['score'] == 77
+    assert poll_response.json['stats']['active_workers'] == 0
+
+@patch('api.match.suggest_resume_additions')
+def test_match_async_stores_features(mock_llm, client, signup_headers):
+    """Test that features computed before queueing an async match are stored."""
+    mock_llm.return_value = {'score': 70, 'missing_keywords': [], 'suggestions': []}
+    user = User.query.filter_by(email='async@example.com').first()
+    resume = Resume(user_id=user.id, filename='cv.pdf', filepath='/tmp/cv.pdf', text='Python developer with Flask')
+    db.session.add(resume)
+    db.session.commit()
+    resume_id = resume.id
+    
+    # Reading a resume computes its features without storing them
+    assert client.get(f'/api/resumes/{resume_id}', headers=signup_headers).status_code == 200
+    assert ResumeFeatures.query.filter_by(resume_id=resume_id).count() == 0
+    
+    response = client.post('/api/match',
+                          json={'resumeId': resume_id, 'jobData': {'title': 'Backend Engineer', 'skills': ['Python']},
+                                'async': True},
+                          headers=signup_headers)
+    assert response.status_code == 202
+    wait_for_match_job(client, signup_headers, response.json['job']['id'])
+    db.session.rollback()
+    assert ResumeFeatures.query.filter_by(resume_id=resume_id).count() == 1
+
+@patch('api.match.suggest_resume_additions')
+def test_match_async_failure_is_reported(mock_llm, client, signup_headers):
+    """Test that errors in async matching mark the job as failed."""
+    mock_llm.side_effect = RuntimeError('LLM unavailable')
+    
+    response = client.post('/api/match',
+                          json={
+                              'resumeText': 'Python developer',
+                              'jobData': {'title': 'Backend Engineer'},
+                              'async': True
+                          },
+                          headers=signup_headers)
+    
+    assert response.status_code == 202
+    finished = wait_for_match_job(client, signup_headers, response.json['job']['id']).json['job']
+    assert finished['status'] == 'failed'
+    assert 'LLM unavailable' in finished['error']
+
+def test_match_job_not_found(client, signup_headers):
+    """Test polling an unknown match job."""
+    response = client.get('/api/match/jobs/does-not-exist', headers=signup_headers)
+    
+    assert response.status_code == 404
+    assert 'Match job not found' in response.json['error']
+
+def test_match_job_stats(client, signup_headers):
+    """Test the async match queue counters endpoint."""
+    response = client.get('/api/match/jobs/stats', headers=signup_headers)
+    
+    assert response.status_code == 200
+    stats = response.json['stats']
+    assert stats['queue_depth'] == 0
+    assert stats['active_workers'] == 0
+
+@patch('api.match.suggest_resume_additions')
+def test_bulk_match_keeps_order_with_concurrency(mock_llm, app, client, signup_headers):
+    """Test that concurrent bulk matching returns results in resume order."""
+    import time
+    user = User.query.filter_by(email='async@example.com').first()
+    resumes = [
+        Resume(user_id=user.id, filename=f'resume_{i}.pdf', filepath=f'/tmp/resume_{i}.pdf', text=f'resume {i}')
+        for i in range(5)
+    ]
+    db.session.add_all(resumes)
+    db.session.commit()
+    resume_ids = [resume.id for resume in resumes]
+    
+    def slow_match(resume_text, job_data, **kwargs):
+        index = int(resume_text.split()[-1])
+        # Earlier resumes finish last
+        time.sleep(0.05 * (5 - index))
+        return {'score': index * 10, 'missing_keywords': [], 'suggestions': []}
+    
+    mock_llm.side_effect = slow_match
+    app.config['BULK_MATCH_CONCURRENCY'] = 5
+    
+    start = time.time()
+    response = client.post('/api/match/bulk',
+                          json={
+                              'resumeIds': resume_ids,
+                              'jobData': {'title': 'Backend Engineer'}
+                          },
+                          headers=signup_headers)
+    elapsed = time.time() - start
+    
+    assert response.status_code == 200
+    results = response.json['results']
+    assert [result['resume_id'] for result in results] == resume_ids
+    assert [result['match_result']['score'] for result in results] == [0, 10, 20, 30, 40]
+    # Serial execution would take 0.75s
+    assert elapsed < 0.6
+
+@patch('api.match.suggest_resume_additions')
+def test_match_uses_cache_for_repeated_requests(mock_llm, client, signup_headers):
+    """Test that a repeated resume/job pair is served from the match cache."""
+    mock_llm.return_value = {
+        'score': 88,
+        'missing_keywords': ['Kafka'],
+        'suggestions': ['Mention streaming work']
+    }
+    payload = {
+        'resumeText': 'Python   developer\nwith Flask',
+        'jobData': {'title': 'Backend Engineer', 'skills': ['Python', 'Kafka']}
+    }
+    
+    first = client.post('/api/match', json=payload, headers=signup_headers)
+    assert first.status_code == 200
+    assert first.json['match_result']['cache_hit'] is False
+    
+    # Whitespace-only differences map to the same cache entry
+    payload['resumeText'] = 'Python developer with Flask'
+    second = client.post('/api/match', json=payload, headers=signup_headers)
+    assert second.status_code == 200
+    assert second.json['match_result']['cache_hit'] is True
+    assert second.json['match_result']['score'] == 88
+    assert second.json['match_result']['missing_keywords'] == ['Kafka']
+    assert mock_llm.call_count == 1
+    
+    # Different job fields miss the cache
+    payload['jobData']['skills'] = ['Python']
+    third = client.post('/api/match', json=payload, headers=signup_headers)
+    assert third.json['match_result']['cache_hit'] is False
+    assert mock_llm.call_count == 2
+
+@patch('api.match.suggest_resume_additions')
+def test_match_cache_skips_fallback_results(mock_llm, client, signup_headers):
+    """Test that keyword fallback results are not cached."""
+    mock_llm.return_value = {
+        'score': 40,
+        'missing_keywords': [],
+        'suggestions': [],
+        'source': 'fallback'
+    }
+    payload = {'resumeText': 'Python developer', 'jobData': {'title': 'Backend Engineer'}}
+    
+    client.post('/api/match', json=payload, headers=signup_headers)
+    response = client.post('/api/match', json=payload, headers=signup_headers)
+    
+    assert response.json['match_result']['cache_hit'] is False
+    assert mock_llm.call_count == 2
+
+def test_match_cache_evicts_least_recently_used(app):
+    """Test size-based eviction of the match cache."""
+    from services.match_cache import store_cached_match, get_cached_match, evict_entries
+    from models import MatchCacheEntry
+    app.config['MATCH_CACHE_MAX_ENTRIES'] = 2
+    result = {'score': 50, 'missing_keywords': [], 'suggestions': []}
+    
+    store_cached_match('a' * 64, 'test-model', result)
+    db.session.commit()
+    store_cached_match('b' * 64, 'test-model', result)
+    db.session.commit()
+    # Touch the first entry so the second becomes least recently used
+    assert get_cached_match('a' * 64) is not None
+    db.session.commit()
+    store_cached_match('c' * 64, 'test-model', result)
+    evict_entries()
+    db.session.commit()
+    
+    keys = {entry.cache_key[0] for entry in MatchCacheEntry.query.all()}
+    assert keys == {'a', 'c'}
+
+@patch('api.match.suggest_resume_additions')
+def test_bulk_match_reports_cache_hits(mock_llm, client, signup_headers):
+    """Test that bulk matching reuses cached results and reports hit counts."""
+    user = User.query.filter_by(email='async@example.com').first()
+    resumes = [
+        Resume(user_id=user.id, filename=f'resume_{i}.pdf', filepath=f'/tmp/resume_{i}.pdf', text=f'resume {i}')
+        for i in range(3)
+    ]
+    db.session.add_all(resumes)
+    db.session.commit()
+    resume_ids = [resume.id for resume in resumes]
+    mock_llm.return_value = {'score': 65, 'missing_keywords': [], 'suggestions': []}
+    job_data = {'title': 'Backend Engineer'}
+    
+    # Warm the cache for the first resume only
+    client.post('/api/match', json={'resumeText': 'resume 0', 'jobData': job_data}, headers=signup_headers)
+    
+    with patch('api.match.evict_entries') as mock_evict:
+        response = client.post('/api/match/bulk',
+                              json={'resumeIds': resume_ids, 'jobData': job_data},
+                              headers=signup_headers)
+    
+    assert response.status_code == 200
+    # Eviction runs once for the whole request, not per stored result
+    assert mock_evict.call_count == 1
+    assert response.json['cache'] == {'hits': 1, 'misses': 2}
+    assert [result['cache_hit'] for result in response.json['results']] == [True, False, False]
+    assert mock_llm.call_count == 3
+
+@patch('api.match.suggest_resume_additions')
+def test_bulk_match_prefilter_top_k(mock_llm, client, signup_headers):
+    """Test that only the top-K prefiltered resumes are sent to the LLM."""
+    user = User.query.filter_by(email='async@example.com').first()
+    texts = [
+        'Cook with baking experience',
+        'Python Django Postgres engineer building backend services',
+        'Python engineer',
+        'Retail cashier'
+    ]
+    resumes = [
+        Resume(user_id=user.id, filename=f'resume_{i}.pdf', filepath=f'/tmp/resume_{i}.pdf', text=text)
+        for i, text in enumerate(texts)
+    ]
+    db.session.add_all(resumes)
+    db.session.commit()
+    resume_ids = [resume.id for resume in resumes]
+    mock_llm.return_value = {'score': 90, 'missing_keywords': [], 'suggestions': []}
+    job_data = {
+        'title': 'Backend Engineer',
+        'description': 'Python backend services with Django and Postgres',
+        'skills': ['Python', 'Django', 'Postgres']
+    }
+    
+    response = client.post('/api/match/bulk',
+                          json={'resumeIds': resume_ids, 'jobData': job_data, 'prefilterTopK': 2},
+                          headers=signup_headers)
+    
+    assert response.status_code == 200
+    results = response.json['results']
+    assert [result['resume_id'] for result in results] == resume_ids
+    assert [result['stage'] for result in results] == ['prefilter', 'llm', 'llm', 'prefilter']
+    assert results[1]['match_result']['score'] == 90
+    assert results[0]['match_result']['score'] == results[0]['prefilter_score']
+    assert response.json['llm_calls'] == 2
+    assert mock_llm.call_count == 2
+
+@patch('api.match.suggest_resume_additions')
+def test_bulk_match_prefilter_threshold(mock_llm, client, signup_headers):
+    """Test that resumes below the prefilter threshold skip the LLM."""
+    user = User.query.filter_by(email='async@example.com').first()
+    resumes = [
+        Resume(user_id=user.id, filename='good.pdf', filepath='/tmp/good.pdf', text='Python Django engineer'),
+        Resume(user_id=user.id, filename='poor.pdf', filepath='/tmp/poor.pdf', text='Florist')
+    ]
+    db.session.add_all(resumes)
+    db.session.commit()
+    mock_llm.return_value = {'score': 90, 'missing_keywords': [], 'suggestions': []}
+    job_data = {'title': 'Engineer', 'description': 'Python Django', 'skills': ['Python', 'Django']}
+    
+    response = client.post('/api/match/bulk',
+                          json={'resumeIds': [r.id for r in resumes], 'jobData': job_data, 'prefilterThreshold': 50},
+                          headers=signup_headers)
+    
+    assert response.status_code == 200
+    assert [result['stage'] for result in response.json['results']] == ['llm', 'prefilter']
+    assert mock_llm.call_count == 1
+    
+    response = client.post('/api/match/bulk',
+                          json={'resumeIds': [r.id for r in resumes], 'jobData': job_data, 'prefilterTopK': 0},
+                          headers=signup_headers)
+    assert response.status_code == 400
+
+NEAR_DUPLICATE_RESUME = (
+    'Senior backend engineer with eight years of experience building Python services, '
+    'REST APIs and data pipelines. Led the migration of a monolith to Flask microservices '
+    'running on Kubernetes, cut deployment times in half and mentored four junior engineers. '
+    'Designed PostgreSQL schemas, tuned slow queries and introduced Redis caching for hot paths. '
+    'Built event driven ingestion with Kafka consumers and wrote the on-call runbooks for the team.'
+)
+
+@patch('api.match.suggest_resume_additions')
+def test_bulk_match_reports_fallback_stage(mock_llm, client, signup_headers):
+    """Test that resumes scored by the keyword fallback instead of the LLM report that stage."""
+    user = User.query.filter_by(email='async@example.com').first()
+    resume = Resume(user_id=user.id, filename='resume.pdf', filepath='/tmp/resume.pdf', text='Python engineer')
+    db.session.add(resume)
+    db.session.commit()
+    mock_llm.return_value = {'score': 40, 'missing_keywords': ['Go'], 'suggestions': [], 'source': 'fallback'}
+    
+    response = client.post('/api/match/bulk',
+                          json={'resumeIds': [resume.id], 'jobData': {'title': 'Engineer', 'skills': ['Python', 'Go']}},
+                          headers=signup_headers)
+    
+    assert response.status_code == 200
+    result = response.json['results'][0]
+    assert result['stage'] == 'fallback'
+    assert result['match_result']['source'] == 'fallback'
+
+def test_minhash_estimates_similarity():
+    """Test that MinHash signatures separate near-duplicate and unrelated texts."""
+    from services.near_duplicates import compute_minhash, estimate_similarity
+    
+    original = compute_minhash(NEAR_DUPLICATE_RESUME)
+    edited = compute_minhash(NEAR_DUPLICATE_RESUME.replace('four junior', 'five junior'))
+    unrelated = compute_minhash('Pastry chef specialising in laminated doughs, sourdough and seasonal desserts.')
+    
+    assert estimate_similarity(original, original) == 1.0
+    assert estimate_similarity(original, edited) > 0.8
+    assert estimate_similarity(original, unrelated) < 0.1
+    assert compute_minhash('  ') is None
+
+@patch('api.match.suggest_resume_additions')
+def test_match_reuses_near_duplicate_resume_result(mock_llm, app, client, signup_headers):
+    """Test that a near-duplicate resume reuses the earlier match instead of calling the LLM."""
+    mock_llm.return_value = {
+        'score': 81,
+        'missing_keywords': ['Terraform'],
+        'suggestions': ['Mention infrastructure as code']
+    }
+    user = User.query.filter_by(email='async@example.com').first()
+    original = Resume(user_id=user.id, filename='v1.pdf', filepath='/tmp/v1.pdf', text=NEAR_DUPLICATE_RESUME)
+    edited = Resume(user_id=user.id, filename='v2.pdf', filepath='/tmp/v2.pdf',
+                    text=NEAR_DUPLICATE_RESUME.replace('four junior', 'five junior'))
+    job = JobPosting(url='https://example.com/backend', title='Backend Engineer', company='TechCorp',
+                     description='Python, Flask and Kafka services.', skills=['Python', 'Kafka', 'Terraform'])
+    db.session.add_all([original, edited, job])
+    db.session.commit()
+    original_id, edited_id, job_id = original.id, edited.id, job.id
+    # A one-word edit changes five of the short text's shingles
+    app.config['MATCH_REUSE_SIMILARITY'] = 0.8
+    
+    # Resumes stored without signatures are backfilled at startup
+    backfill_features()
+    duplicates = client.get(f'/api/resumes/{original_id}/duplicates', headers=signup_headers)
+    assert duplicates.status_code == 200
+    assert [entry['resume_id'] for entry in duplicates.json['duplicates']] == [edited_id]
+    assert duplicates.json['duplicates'][0]['similarity'] > 0.8
+    
+    first = client.post('/api/match', json={'resumeId': original_id, 'jobPostingId': job_id}, headers=signup_headers)
+    assert first.status_code == 200
+    assert first.json['match_result']['reused_from'] is None
+    
+    second = client.post('/api/match', json={'resumeId': edited_id, 'jobPostingId': job_id}, headers=signup_headers)
+    assert second.status_code == 200
+    result = second.json['match_result']
+    assert result['score'] == 81
+    assert result['missing_keywords'] == ['Terraform']
+    assert result['reused_from']['match_id'] == first.json['match_result']['id']
+    assert result['reused_from']['similarity'] >= app.config['MATCH_REUSE_SIMILARITY']
+    assert result['source'] == 'reused'
+    assert MatchResult.query.get(result['id']).reused_from_id == first.json['match_result']['id']
+    assert mock_llm.call_count == 1
+    
+    # Reuse can be switched off
+    app.config['MATCH_REUSE_ENABLED'] = False
+    third = client.post('/api/match', json={'resumeId': edited_id, 'jobPostingId': job_id}, headers=signup_headers)
+    assert third.json['match_result']['reused_from'] is None
+    assert mock_llm.call_count == 2
+
+@patch('api.match.suggest_resume_additions')
+def test_match_never_reuses_a_reused_result(mock_llm, app, client, signup_headers):
+    """Test that a copied result cannot be reused again, so reuse never chains across near-duplicates."""
+    mock_llm.return_value = {'score': 81, 'missing_keywords': [], 'suggestions': []}
+    user = User.query.filter_by(email='async@example.com').first()
+    edited_text = NEAR_DUPLICATE_RESUME.replace('four junior', 'five junior')
+    resumes = [
+        Resume(user_id=user.id, filename=f'v{i}.pdf', filepath=f'/tmp/v{i}.pdf', text=text)
+        for i, text in enumerate([NEAR_DUPLICATE_RESUME, edited_text, edited_text.replace('eight years', 'nine years')])
+    ]
+    job = JobPosting(url='https://example.com/backend', title='Backend Engineer', company='TechCorp',
+                     description='Python, Flask and Kafka services.', skills=['Python', 'Kafka'])
+    db.session.add_all(resumes + [job])
+    db.session.commit()
+    resume_ids, job_id = [resume.id for resume in resumes], job.id
+    app.config['MATCH_REUSE_SIMILARITY'] = 0.8
+    
+    first = client.post('/api/match', json={'resumeId': resume_ids[0], 'jobPostingId': job_id}, headers=signup_headers)
+    response = client.post('/api/match/bulk', json={'resumeIds': [resume_ids[1]], 'jobPostingId': job_id},
+                           headers=signup_headers)
+    copied = response.json['results'][0]
+    assert copied['stage'] == 'reused'
+    assert copied['match_result']['source'] == 'reused'
+    assert copied['match_result']['reused_from_id'] == first.json['match_result']['id']
+    
+    # With the LLM result out of reach, only the copy on the middle resume is left
+    MatchResult.query.filter_by(id=first.json['match_result']['id']).update(
+        {'created_at': datetime.utcnow() - timedelta(seconds=app.config['MATCH_CACHE_TTL'] + 60)}
+    )
+    db.session.commit()
+    third = client.post('/api/match', json={'resumeId': resume_ids[2], 'jobPostingId': job_id}, headers=signup_headers)
+    assert third.json['match_result']['reused_from'] is None
+    assert third.json['match_result']['source'] == 'llm'
+    assert mock_llm.call_count == 2
+
+def test_duplicates_rejects_bad_threshold(client, signup_headers):
+    """Test threshold validation on the duplicates endpoint."""
+    for threshold in ('2', '0.5'):
+        response = client.get(f'/api/resumes/1/duplicates?threshold={threshold}', headers=signup_headers)
+        assert response.status_code == 400
+
+@patch('api.match.suggest_resume_additions')
+def test_match_never_reuses_fallback_results(mock_llm, app, client, signup_headers):
+    """Test that keyword fallback matches and matches from another model are not reused."""
+    mock_llm.return_value = {
+        'score': 45,
+        'missing_keywords': ['Terraform'],
+        'suggestions': ['Add more keywords'],
+        'source': 'fallback'
+    }
+    user = User.query.filter_by(email='async@example.com').first()
+    original = Resume(user_id=user.id, filename='v1.pdf', filepath='/tmp/v1.pdf', text=NEAR_DUPLICATE_RESUME)
+    edited = Resume(user_id=user.id, filename='v2.pdf', filepath='/tmp/v2.pdf',
+                    text=NEAR_DUPLICATE_RESUME.replace('four junior', 'five junior'))
+    third = Resume(user_id=user.id, filename='v3.pdf', filepath='/tmp/v3.pdf',
+                   text=NEAR_DUPLICATE_RESUME.replace('eight years', 'nine years'))
+    job = JobPosting(url='https://example.com/backend', title='Backend Engineer', company='TechCorp',
+                     description='Python, Flask and Kafka services.', skills=['Python', 'Kafka', 'Terraform'])
+    db.session.add_all([original, edited, third, job])
+    db.session.commit()
+    app.config['MATCH_REUSE_SIMILARITY'] = 0.8
+    
+    first = client.post('/api/match', json={'resumeId': original.id, 'jobPostingId': job.id}, headers=signup_headers)
+    assert first.json['match_result']['source'] == 'fallback'
+    
+    second = client.post('/api/match', json={'resumeId': edited.id, 'jobPostingId': job.id}, headers=signup_headers)
+    assert second.json['match_result']['reused_from'] is None
+    assert mock_llm.call_count == 2
+    
+    # LLM results from a different model are not reused either
+    mock_llm.return_value = {'score': 81, 'missing_keywords': [], 'suggestions': []}
+    with patch('api.match.get_model_name', return_value='other-model'):
+        client.post('/api/match', json={'resumeId': edited.id, 'jobPostingId': job.id}, headers=signup_headers)
+    fourth = client.post('/api/match', json={'resumeId': third.id, 'jobPostingId': job.id}, headers=signup_headers)
+    assert fourth.json['match_result']['reused_from'] is None
+    assert mock_llm.call_count == 4
+
+@patch('api.match.suggest_resume_additions')
+def test_match_reuse_requires_same_job_skills(mock_llm, app, client, signup_headers):
+    """Test that postings sharing a description but not a skill list don't share matches."""
+    app.config['MATCH_REUSE_SIMILARITY'] = 0.8
+    mock_llm.return_value = {'score': 81, 'missing_keywords': [], 'suggestions': []}
+    description = NEAR_DUPLICATE_RESUME.replace('Senior backend engineer with', 'We want an engineer with')
+    user = User.query.filter_by(email='async@example.com').first()
+    resume = Resume(user_id=user.id, filename='v1.pdf', filepath='/tmp/v1.pdf', text=NEAR_DUPLICATE_RESUME)
+    jobs = [
+        JobPosting(url='https://example.com/backend', title='Backend Engineer', description=description,
+                   skills=['Python', 'Kafka']),
+        JobPosting(url='https://example.com/backend-2', title='Backend Engineer',
+                   description=description + ' Apply by Friday.', skills=['Python', 'Kafka']),
+        JobPosting(url='https://example.com/backend-go', title='Backend Engineer', description=description,
+                   skills=['Go', 'Kafka'])
+    ]
+    db.session.add_all([resume] + jobs)
+    db.session.commit()
+    
+    client.post('/api/match', json={'resumeId': resume.id, 'jobPostingId': jobs[0].id}, headers=signup_headers)
+    same_skills = client.post('/api/match', json={'resumeId': resume.id, 'jobPostingId': jobs[1].id},
+                              headers=signup_headers)
+    other_skills = client.post('/api/match', json={'resumeId': resume.id, 'jobPostingId': jobs[2].id},
+                               headers=signup_headers)
+    
+    assert same_skills.json['match_result']['reused_from'] is not None
+    assert other_skills.json['match_result']['reused_from'] is None
+    assert mock_llm.call_count == 2
@@ -0,0 +1,572 @@
+"""Tests for resume upload and storage."""
+
+import pytest
+import io
+import os
+import sys
+from unittest.mock import patch
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from models import db, User, Resume, StoredFile
+
+@pytest.fixture
+def app(tmp_path):
+    """Create test application with uploads in a temporary directory."""
+    app, socketio = create_app('testing')
+    app.config['UPLOAD_DIR'] = str(tmp_path)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    """Get authentication headers for testing."""
+    response = client.post('/api/auth/signup', json={
+        'email': 'resumes@example.com',
+        'password': 'password123'
+    })
+
+    token = response.json['token']
+    return {'Authorization': f'Bearer {token}'}
+
+def make_pdf(text):
+    """Build a minimal single-page PDF containing `text`."""
+    stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf
+
+def upload(client, auth_headers, content, filename):
+    """Upload bytes as a resume file."""
+    return client.post('/api/resumes', headers=auth_headers, data={
+        'file': (io.BytesIO(content), filename)
+    }, content_type='multipart/form-data')
+
+def test_identical_uploads_share_storage_and_extraction(app, client, auth_headers, tmp_path):
+    """Test that identical content is stored and extracted once and deleted when unreferenced."""
+    content = b'%PDF-1.4 identical resume bytes'
+    pool = app.extensions['extraction_pool']
+
+    with patch.object(pool, 'extract', return_value='Python developer') as mock_extract:
+        first = upload(client, auth_headers, content, 'resume.pdf')
+        second = upload(client, auth_headers, content, 'resume_copy.pdf')
+        other = upload(client, auth_headers, b'%PDF-1.4 different bytes', 'other.pdf')
+
+    assert first.status_code == 201 and second.status_code == 201 and other.status_code == 201
+    assert mock_extract.call_count == 2
+    assert second.json['resume']['text'] == 'Python developer'
+
+    resumes = {resume.filename: resume for resume in Resume.query.all()}
+    shared_path = resumes['resume.pdf'].filepath
+    assert resumes['resume_copy.pdf'].filepath == shared_path
+    digest = resumes['resume.pdf'].content_hash
+    assert shared_path == os.path.join(str(tmp_path), digest[:2], digest[2:4], digest + '.pdf')
+    assert StoredFile.query.filter_by(sha256=digest).one().ref_count == 2
+
+    # The blob survives until its last reference is deleted
+    client.delete(f"/api/resumes/{first.json['resume']['id']}", headers=auth_headers)
+    assert os.path.exists(shared_path)
+    assert StoredFile.query.filter_by(sha256=digest).one().ref_count == 1
+
+    response = client.delete(f"/api/admin/resumes/{second.json['resume']['id']}")
+    assert response.status_code == 200
+    assert not os.path.exists(shared_path)
+    assert StoredFile.query.filter_by(sha256=digest).first() is None
+    assert os.path.exists(resumes['other.pdf'].filepath)
+
+def test_failed_delete_keeps_the_blob(app, client, auth_headers):
+    """Test that a blob is only removed from disk once the delete has been committed."""
+    pool = app.extensions['extraction_pool']
+    with patch.object(pool, 'extract', return_value='Python developer'):
+        response = upload(client, auth_headers, b'%PDF-1.4 only copy', 'resume.pdf')
+    resume = Resume.query.get(response.json['resume']['id'])
+    path, digest = resume.filepath, resume.content_hash
+
+    with patch.object(db.session, 'commit', side_effect=RuntimeError('database is locked')):
+        response = client.delete(f'/api/resumes/{resume.id}', headers=auth_headers)
+    assert response.status_code == 500
+    assert os.path.exists(path)
+    assert StoredFile.query.filter_by(sha256=digest).one().ref_count == 1
+
+    assert client.delete(f'/api/resumes/{resume.id}', headers=auth_headers).status_code == 200
+    assert not os.path.exists(path)
+
+def test_failed_upload_removes_its_blob_and_record(app, client, auth_headers):
+    """Test that an upload failing after its blob was stored leaves no file or record behind."""
+    pool = app.extensions['extraction_pool']
+    with patch.object(pool, 'extract', return_value='Python developer'), \
+            patch('api.resumes.ensure_resume_features', side_effect=RuntimeError('boom')):
+        response = upload(client, auth_headers, b'%PDF-1.4 failing upload', 'resume.pdf')
+
+    assert response.status_code == 500
+    assert Resume.query.count() == 0
+    assert StoredFile.query.count() == 0
+    assert not any(files for _, _, files in os.walk(app.config['UPLOAD_DIR']))
+
+def test_upload_keeps_legacy_delete_behavior(app, client, auth_headers, tmp_path):
+    """Test that resumes stored before content addressing still delete their own file."""
+    legacy_path = tmp_path / 'legacy_resume.pdf'
+    legacy_path.write_bytes(b'legacy')
+    user = User.query.filter_by(email='resumes@example.com').one()
+    resume = Resume(user_id=user.id, filename='legacy_resume.pdf', filepath=str(legacy_path), text='old')
+    db.session.add(resume)
+    db.session.commit()
+
+    response = client.delete(f'/api/resumes/{resume.id}', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert not legacy_path.exists()
+
+def test_upload_extracts_from_memory_in_one_pass(app, client, auth_headers, tmp_path):
+    """Test that an upload is extracted from the received bytes by a worker process."""
+    with patch('api.resumes.MAX_FILE_SIZE', 4096):
+        response = upload(client, auth_headers, make_pdf('Senior Python Developer'), 'cv.pdf')
+        too_large = upload(client, auth_headers, make_pdf('x' * 5000), 'big.pdf')
+
+    assert response.status_code == 201
+    assert response.json['resume']['text'] == 'Senior Python Developer'
+    assert too_large.status_code == 400
+    assert StoredFile.query.count() == 1
+
+def test_extract_text_from_bytes_matches_file(tmp_path):
+    """Test that the in-memory extractors agree with the path-based one."""
+    from services.extract import extract_text_from_bytes, extract_text_from_file
+
+    content = make_pdf('Data Engineer')
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(content)
+
+    assert extract_text_from_bytes(memoryview(content), '.pdf') == extract_text_from_file(str(path)) == 'Data Engineer'
+    assert extract_text_from_bytes(content, '.txt') is None
+
+def test_pdf_extraction_page_budget_and_progress():
+    """Test per-page progress and early stop on the page and character budgets."""
+    import pypdf
+    from services.extract import extract_text_from_bytes, extract_text_from_pdf_stream
+
+    writer = pypdf.PdfWriter()
+    for text in ['Page one', 'Page two', 'Page three']:
+        writer.append(pypdf.PdfReader(io.BytesIO(make_pdf(text))))
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    content = buffer.getvalue()
+
+    progress = []
+    text = extract_text_from_bytes(content, '.pdf', on_page=lambda page, total: progress.append((page, total)))
+    assert text == 'Page one\nPage two\nPage three'
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+    progress = []
+    text = extract_text_from_pdf_stream(io.BytesIO(content), max_pages=2,
+                                        on_page=lambda page, total: progress.append((page, total)))
+    assert text == 'Page one\nPage two'
+    assert progress == [(1, 2), (2, 2)]
+
+    assert extract_text_from_pdf_stream(io.BytesIO(content), max_chars=12) == 'Page one\nPag'
+
+def test_upload_emits_page_progress(app, client, auth_headers):
+    """Test that upload extraction progress is forwarded from the worker as socket events."""
+    with patch('api.resumes.emit_progress_update') as mock_emit:
+        response = upload(client, auth_headers, make_pdf('Backend Engineer'), 'cv.pdf')
+
+    assert response.status_code == 201
+    assert response.json['resume']['text'] == 'Backend Engineer'
+    step, progress, message = mock_emit.call_args.args[2:]
+    assert (step, progress) == ('extract', 100)
+    assert message == 'Extracted page 1 of 1 from cv.pdf'
+
+def make_zip(members):
+    """Build a ZIP archive from (name, bytes) pairs."""
+    import zipfile
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+def test_upload_resume_archive(app, client, auth_headers):
+    """Test ZIP ingestion: parallel extraction, dedup, skips, batched commits and progress."""
+    app.config['RESUME_ARCHIVE_COMMIT_SIZE'] = 2
+    archive = make_zip([
+        ('candidates/alice.pdf', make_pdf('Alice Python')),
+        ('candidates/bob.pdf', make_pdf('Bob Java')),
+        ('candidates/bob_copy.pdf', make_pdf('Bob Java')),
+        ('candidates/notes.txt', b'not a resume'),
+        ('__MACOSX/candidates/._alice.pdf', b'metadata'),
+        ('candidates/', b''),
+        ('carol.pdf', make_pdf('Carol Go')),
+    ])
+
+    with patch('api.resumes.emit_progress_update') as mock_emit:
+        response = client.post('/api/resumes/archive', headers=auth_headers, data={
+            'file': (io.BytesIO(archive), 'candidates.zip')
+        }, content_type='multipart/form-data')
+
+    assert response.status_code == 201
+    body = response.json
+    assert [resume['filename'] for resume in body['resumes']] == ['alice.pdf', 'bob.pdf', 'bob_copy.pdf', 'carol.pdf']
+    assert [resume['text'] for resume in body['resumes']] == ['Alice Python', 'Bob Java', 'Bob Java', 'Carol Go']
+    assert body['skipped'] == [{'filename': 'candidates/notes.txt', 'error': 'File type not allowed'}]
+    assert body['summary'] == {'uploaded': 4, 'skipped': 1, 'extraction_failed': 0}
+
+    assert Resume.query.count() == 4
+    assert StoredFile.query.count() == 3
+    progress = [call.args[3] for call in mock_emit.call_args_list]
+    assert len(progress) == 5 and progress[-1] == 100
+
+def test_upload_resume_archive_limits(app, client, auth_headers):
+    """Test that archives over the member or size limits are rejected before extraction."""
+    app.config['RESUME_ARCHIVE_MAX_MEMBERS'] = 2
+    archive = make_zip([(f'resume{i}.pdf', make_pdf(f'Candidate {i}')) for i in range(3)])
+    response = client.post('/api/resumes/archive', headers=auth_headers, data={
+        'file': (io.BytesIO(archive), 'candidates.zip')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert 'at most 2' in response.json['error']
+
+    app.config['RESUME_ARCHIVE_MAX_MEMBERS'] = 10
+    app.config['RESUME_ARCHIVE_MAX_BYTES'] = 1000
+    archive = make_zip([('resume.pdf', b'0' * 5000)])
+    response = client.post('/api/resumes/archive', headers=auth_headers, data={
+        'file': (io.BytesIO(archive), 'candidates.zip')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+
+    response = client.post('/api/resumes/archive', headers=auth_headers, data={
+        'file': (io.BytesIO(b'not a zip'), 'candidates.zip')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert Resume.query.count() == 0
+
+def test_upload_resume_archive_failure_keeps_committed_batches(app, client, auth_headers, tmp_path):
+    """Test that a failure mid-archive reports stored resumes and removes files of the rolled-back batch."""
+    import hashlib
+    from services.file_store import blob_path
+    from services.resume_features import ensure_resume_features
+
+    app.config['RESUME_ARCHIVE_COMMIT_SIZE'] = 1
+    alice, bob = make_pdf('Alice Python'), make_pdf('Bob Java')
+    archive = make_zip([('alice.pdf', alice), ('bob.pdf', bob)])
+    calls = []
+
+    def fail_second(resume):
+        calls.append(resume)
+        if len(calls) == 2:
+            raise RuntimeError('features unavailable')
+        return ensure_resume_features(resume)
+
+    with patch('api.resumes.ensure_resume_features', side_effect=fail_second):
+        response = client.post('/api/resumes/archive', headers=auth_headers, data={
+            'file': (io.BytesIO(archive), 'candidates.zip')
+        }, content_type='multipart/form-data')
+
+    assert response.status_code == 500
+    body = response.json
+    assert body['detail'] == 'features unavailable'
+    assert [resume['filename'] for resume in body['resumes']] == ['alice.pdf']
+    assert body['summary']['uploaded'] == 1
+    assert [resume.filename for resume in Resume.query.all()] == ['alice.pdf']
+    assert [stored.sha256 for stored in StoredFile.query.all()] == [hashlib.sha256(alice).hexdigest()]
+    assert os.path.exists(blob_path(str(tmp_path), hashlib.sha256(alice).hexdigest(), '.pdf'))
+    assert not os.path.exists(blob_path(str(tmp_path), hashlib.sha256(bob).hexdigest(), '.pdf'))
+
+def test_compute_resume_features():
+    """Test that sections, years of experience and canonical skills are derived from resume text."""
+    from services.resume_features import compute_resume_features
+
+    text = (
+        'Jane Doe\n'
+        'Summary\n'
+        'Backend engineer.\n'
+        'Experience\n'
+        'Acme Corp 2012 - 2016\n'
+        'Globex 2015 - 2019\n'
+        'Education\n'
+        'BSc Computer Science 2008 - 2012\n'
+        'Skills\n'
+        'Python, PostgreSQL, k8s\n'
+    )
+    features = compute_resume_features(text)
+
+    assert set(features['sections']) == {'experience', 'education', 'skills'}
+    start, end = features['sections']['experience']
+    assert text[start:end].startswith('Experience') and 'Education' not in text[start:end]
+    # Overlapping roles merge; education years are outside the experience section
+    assert features['years_experience'] == 7
+    assert {'Python', 'PostgreSQL', 'Kubernetes'} <= set(features['skills'])
+    assert 'python' in features['tokens']
+
+    assert compute_resume_features('8+ years of professional experience')['years_experience'] == 8
+    assert compute_resume_features('')['years_experience'] is None
+
+def test_resume_features_recomputed_only_when_text_changes(app, auth_headers):
+    """Test that stored features are reused until the resume text changes."""
+    from services.resume_features import ensure_resume_features, load_resume_features
+
+    user = User.query.filter_by(email='resumes@example.com').one()
+    resume = Resume(user_id=user.id, filename='a.pdf', filepath='a.pdf', text='Python developer')
+    db.session.add(resume)
+    ensure_resume_features(resume)
+    db.session.commit()
+
+    with patch('services.resume_features.compute_resume_features') as mock_compute:
+        assert load_resume_features([resume])[0]['skills'] == ['Python']
+        assert mock_compute.call_count == 0
+
+    resume.text = 'Java developer'
+    features = load_resume_features([resume])[0]
+    db.session.commit()
+    assert features['skills'] == ['Java']
+    assert resume.features.to_features()['skills'] == ['Java']
+
+def test_bm25_top_k_matches_exhaustive_ranking():
+    """Test that pruned top-K retrieval returns the same ranking as scoring every document."""
+    import random
+    from services.resume_index import BM25Index
+    
+    rng = random.Random(7)
+    vocabulary = [f'term{i}' for i in range(60)]
+    index = BM25Index()
+    for doc_id in range(300):
+        # Skewed term distribution so some terms are rare and others common
+        words = [vocabulary[min(int(rng.expovariate(0.08)), 59)] for _ in range(rng.randint(5, 80))]
+        index.add(doc_id, ' '.join(words))
+    for doc_id in range(0, 300, 7):
+        index.remove(doc_id)
+    
+    def exhaustive(query, k):
+        average_length = index.total_length / len(index)
+        scores = {}
+        for doc_id, terms in index.doc_terms.items():
+            score = 0.0
+            for term in set(query):
+                tf = terms.get(term, 0)
+                if tf:
+                    norm = index.k1 * (1 - index.b + index.b * index.doc_lengths[doc_id] / average_length)
+                    score += index.idf(term) * tf * (index.k1 + 1) / (tf + norm)
+            if score:
+                scores[doc_id] = score
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+    
+    for _ in range(25):
+        query = rng.sample(vocabulary, rng.randint(1, 8))
+        k = rng.randint(1, 20)
+        expected = exhaustive(query, k)
+        result = index.top_k(query, k)
+        assert [doc_id for doc_id, _ in result] == [doc_id for doc_id, _ in expected]
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected])
+    
+    assert index.top_k(['missing'], 5) == []
+
+def test_top_resumes_endpoint_tracks_uploads_and_deletes(app, client, auth_headers):
+    """Test that the resume index ranks uploads for a job and forgets deleted resumes."""
+    from models import JobPosting
+    
+    job = JobPosting(url='https://example.com/job', title='Kubernetes Platform Engineer',
+                     description='Operate Kubernetes clusters with Terraform')
+    job.skills = ['Kubernetes', 'Terraform']
+    db.session.add(job)
+    db.session.commit()
+    
+    ids = {}
+    for name, text in [('platform', 'Kubernetes Terraform Kubernetes operator'), ('frontend', 'React CSS designer'),
+                       ('ops', 'Terraform modules')]:
+        response = upload(client, auth_headers, make_pdf(text), f'{name}.pdf')
+        ids[name] = response.json['resume']['id']
+    
+    response = client.get(f'/api/jobs/{job.id}/top-resumes?k=2', headers=auth_headers)
+    assert response.status_code == 200
+    assert [result['resume_id'] for result in response.json['results']] == [ids['platform'], ids['ops']]
+    assert response.json['indexed'] == 3
+    
+    client.delete(f"/api/resumes/{ids['platform']}", headers=auth_headers)
+    response = client.get(f'/api/jobs/{job.id}/top-resumes', headers=auth_headers)
+    assert [result['resume_id'] for result in response.json['results']] == [ids['ops']]
+    
+    assert client.get(f'/api/jobs/{job.id}/top-resumes?k=0', headers=auth_headers).status_code == 400
+    assert client.get('/api/jobs/999/top-resumes', headers=auth_headers).status_code == 404
+
+def test_resume_index_persists_and_reconciles(app, auth_headers, tmp_path):
+    """Test that a saved index is reloaded and only changed resumes are re-indexed."""
+    import services.resume_index as resume_index
+    
+    user = User.query.filter_by(email='resumes@example.com').one()
+    kept = Resume(user_id=user.id, filename='a.pdf', filepath='a.pdf', text='Python backend developer')
+    dropped = Resume(user_id=user.id, filename='b.pdf', filepath='b.pdf', text='Python data scientist')
+    db.session.add_all([kept, dropped])
+    db.session.commit()
+    
+    index_dir = str(tmp_path / 'index')
+    registry = resume_index.ResumeIndexRegistry(index_dir=index_dir)
+    assert len(registry.get(user.id)) == 2
+    registry.save()
+    assert os.path.exists(registry.snapshot_path(user.id))
+    
+    # Changes made while no process had the index loaded
+    db.session.delete(dropped)
+    added = Resume(user_id=user.id, filename='c.pdf', filepath='c.pdf', text='Go backend developer')
+    db.session.add(added)
+    db.session.commit()
+    
+    reloaded = resume_index.ResumeIndexRegistry(index_dir=index_dir)
+    with patch.object(resume_index, 'tokenize', wraps=resume_index.tokenize) as mock_tokenize:
+        index = reloaded.get(user.id)
+        assert mock_tokenize.call_count == 1
+    assert set(index.doc_terms) == {kept.id, added.id}
+    assert [doc_id for doc_id, _ in reloaded.top_resumes(user.id, 'backend python', 2)] == [kept.id, added.id]
+
+def test_top_jobs_ranks_filters_and_tracks_parsed_postings(app, client, auth_headers):
+    """Test that postings are ranked for a resume, filtered, and kept current as jobs are parsed and deleted."""
+    from datetime import datetime, timedelta
+    from models import JobPosting, JobFeatures
+    
+    def add_job(title, company, skills, requirements, age_days=0):
+        job = JobPosting(url=f'https://example.com/{title}', title=title, company=company,
+                         created_at=datetime.utcnow() - timedelta(days=age_days))
+        job.skills = skills
+        job.requirements = requirements
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+    
+    platform = add_job('Platform Engineer', 'Acme', ['Kubernetes', 'Python'], ['Operate Kubernetes clusters'])
+    frontend = add_job('Frontend Developer', 'Globex', ['React', 'CSS'], ['Build React components'])
+    legacy = add_job('Python Developer', 'Initech', ['Python'], ['Maintain Python services'], age_days=90)
+    
+    response = upload(client, auth_headers, make_pdf('Platform engineer who can operate Python and Kubernetes clusters'), 'me.pdf')
+    resume_id = response.json['resume']['id']
+    
+    response = client.get(f'/api/resumes/{resume_id}/top-jobs', headers=auth_headers)
+    assert response.status_code == 200
+    # Loading the index reads features; postings stored without them are not written to
+    assert JobFeatures.query.count() == 0
+    results = response.json['results']
+    assert [result['job_posting_id'] for result in results] == [platform, legacy]
+    assert results[0]['score'] == 100
+    assert results[0]['matching_skills'] == ['Kubernetes', 'Python']
+    assert results[0]['job_posting']['title'] == 'Platform Engineer'
+    
+    response = client.get(f'/api/resumes/{resume_id}/top-jobs?company=initech', headers=auth_headers)
+    assert [result['job_posting_id'] for result in response.json['results']] == [legacy]
+    response = client.get(f'/api/resumes/{resume_id}/top-jobs?days=30', headers=auth_headers)
+    assert [result['job_posting_id'] for result in response.json['results']] == [platform]
+    
+    # Parsing a posting adds it to the loaded index; deleting one removes it
+    with patch('api.jobs.scrape_job_posting', return_value={
+        'title': 'Python Platform Engineer', 'company': 'Hooli', 'description': '',
+        'skills': ['Python', 'Kubernetes'], 'requirements': ['Run Kubernetes clusters with Python'],
+        'etag': None, 'last_modified': None
+    }):
+        parsed = client.post('/api/jobs/parse', json={'url': 'https://example.com/new'}, headers=auth_headers)
+    new_job = parsed.json['job_posting']['id']
+    client.delete(f'/api/jobs/{platform}', headers=auth_headers)
+    
+    response = client.get(f'/api/resumes/{resume_id}/top-jobs?k=1', headers=auth_headers)
+    assert [result['job_posting_id'] for result in response.json['results']] == [new_job]
+    assert frontend not in [result['job_posting_id'] for result in response.json['results']]
+    
+    assert client.get(f'/api/resumes/{resume_id}/top-jobs?days=-1', headers=auth_headers).status_code == 400
+    assert client.get('/api/resumes/999/top-jobs', headers=auth_headers).status_code == 404
+
+def test_job_index_compacts_updated_postings(app):
+    """Test that re-indexed postings replace their old rows and compaction keeps scores."""
+    from models import JobPosting
+    from services.job_index import JobIndex
+    
+    jobs = []
+    for i in range(5):
+        job = JobPosting(url=f'https://example.com/{i}', title=f'Engineer {i}', company='Acme')
+        job.skills = ['Python'] if i % 2 else ['Java']
+        db.session.add(job)
+        jobs.append(job)
+    db.session.commit()
+    
+    index = JobIndex()
+    resume = {'skills': ['Python'], 'tokens': ['engineer']}
+    assert len(index.top_jobs(resume, 10)) == 5
+    
+    for _ in range(40):
+        for job in jobs:
+            index.upsert(job)
+    assert len(index) == 5
+    before = index.top_jobs(resume, 10)
+    index._compact()
+    assert len(index.job_ids) == 5
+    assert index.top_jobs(resume, 10) == before
+    assert [entry['job_posting_id'] for entry in before[:2]] == [jobs[3].id, jobs[1].id]
+
+def test_job_index_counts_skills_named_in_requirements(app):
+    """Test that canonical skills parsed from requirement lines are indexed as skills."""
+    from models import JobPosting
+    from services.job_index import JobIndex
+    
+    job = JobPosting(url='https://example.com/data', title='Data Engineer', company='Acme')
+    job.skills = ['Python']
+    job.requirements = ['3+ years with Kubernetes']
+    db.session.add(job)
+    db.session.commit()
+    
+    index = JobIndex()
+    result = index.top_jobs({'skills': ['Kubernetes', 'Python'], 'tokens': []}, 1)[0]
+    assert result['matching_skills'] == ['Kubernetes', 'Python']
+
+def test_job_index_ignores_boilerplate_terms_and_breaks_ties_by_recency(app):
+    """Test that requirement boilerplate does not score and ties at the k-th place go to newer postings."""
+    from models import JobPosting
+    from services.job_index import JobIndex
+    
+    jobs = []
+    for i in range(6):
+        job = JobPosting(url=f'https://example.com/tie-{i}', title='Engineer', company='Acme')
+        job.requirements = ['5+ years of strong experience']
+        db.session.add(job)
+        jobs.append(job)
+    db.session.commit()
+    
+    index = JobIndex()
+    assert index.top_jobs({'skills': [], 'tokens': ['years', 'strong', 'experience']}, 3) == []
+    results = index.top_jobs({'skills': [], 'tokens': ['engineer']}, 3)
+    assert [result['job_posting_id'] for result in results] == [jobs[5].id, jobs[4].id, jobs[3].id]
+
+def test_archive_upload_limit_applies_only_to_archive_route(app, client, auth_headers):
+    """Test that only the archive route accepts bodies over the global limit."""
+    app.config['MAX_CONTENT_LENGTH'] = 2000
+    app.config['RESUME_ARCHIVE_MAX_UPLOAD'] = 10 * 1024 * 1024
+    archive = make_zip([('padding.txt', os.urandom(4000)), ('alice.pdf', make_pdf('Alice Python'))])
+
+    response = client.post('/api/resumes/archive', headers=auth_headers, data={
+        'file': (io.BytesIO(archive), 'candidates.zip')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 201
+
+    response = client.post('/api/auth/login', json={'email': 'test@example.com', 'password': 'x' * 4000})
+    assert response.status_code == 413
+
+    app.config['RESUME_ARCHIVE_MAX_UPLOAD'] = 2000
+    response = client.post('/api/resumes/archive', headers=auth_headers, data={
+        'file': (io.BytesIO(archive), 'candidates.zip')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 413
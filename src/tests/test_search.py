@@ -0,0 +1,106 @@
+"""Tests for full-text search."""
+
+import pytest
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from models import db, User, Resume, JobPosting
+from services.search import parse_search_query, to_fts5_query, to_tsquery, InvalidSearchQuery
+
+@pytest.fixture
+def app():
+    """Create test application."""
+    app, socketio = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    """Get authentication headers for testing."""
+    response = client.post('/api/auth/signup', json={
+        'email': 'search@example.com',
+        'password': 'password123'
+    })
+
+    token = response.json['token']
+    return {'Authorization': f'Bearer {token}'}
+
+def add_resume(email, filename, text):
+    """Store a resume for the user with `email`, creating the user if needed."""
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        user = User(email=email)
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.flush()
+    resume = Resume(user_id=user.id, filename=filename, filepath=filename, text=text)
+    db.session.add(resume)
+    db.session.commit()
+    return resume.id
+
+def test_parse_search_query():
+    """Test that phrases, prefixes and OR are parsed and punctuation cannot inject operators."""
+    clauses = parse_search_query('"Machine Learning" kube* OR docker NEAR(x) -')
+    assert clauses == [('phrase', ['machine', 'learning']), ('term', 'kube', True), ('or',),
+                       ('term', 'docker', False), ('phrase', ['near', 'x'])]
+    assert to_fts5_query(clauses) == '"machine learning" "kube"* OR "docker" "near x"'
+    assert to_tsquery(clauses) == '(machine <-> learning) & kube:* | docker & (near <-> x)'
+    
+    with pytest.raises(InvalidSearchQuery):
+        parse_search_query('OR "" *')
+
+def test_search_resumes_phrase_prefix_and_snippets(app, client, auth_headers):
+    """Test ranked resume search with phrase and prefix queries, escaped highlights and per-user scoping."""
+    kube = add_resume('search@example.com', 'kube.pdf', 'Ran Kubernetes clusters. Kubernetes operator <b>author</b>.')
+    ml = add_resume('search@example.com', 'ml.pdf', 'Machine learning engineer with Kubernetes exposure')
+    add_resume('search@example.com', 'learning.pdf', 'Learning about machine tools')
+    add_resume('other@example.com', 'other.pdf', 'Kubernetes expert')
+    
+    response = client.get('/api/search?q=kubernetes&type=resumes', headers=auth_headers)
+    assert response.status_code == 200
+    results = response.json['resumes']
+    assert [result['id'] for result in results] == [kube, ml]
+    assert '<mark>Kubernetes</mark>' in results[0]['snippet']
+    assert '&lt;b&gt;author&lt;/b&gt;' in results[0]['snippet']
+    assert 'text' not in results[0]
+    assert 'jobs' not in response.json
+    
+    response = client.get('/api/search', query_string={'q': '"machine learning"', 'type': 'resumes'}, headers=auth_headers)
+    assert [result['id'] for result in response.json['resumes']] == [ml]
+    
+    response = client.get('/api/search?q=kube*&type=resumes', headers=auth_headers)
+    assert {result['id'] for result in response.json['resumes']} == {kube, ml}
+
+def test_search_stays_in_sync_with_writes(app, client, auth_headers):
+    """Test that inserts, updates and deletes are reflected in search results."""
+    job = JobPosting(url='https://example.com/job', title='Site Reliability Engineer', company='Acme',
+                     description='Keep Terraform modules tidy')
+    db.session.add(job)
+    db.session.commit()
+    
+    response = client.get('/api/search?q=terraform', headers=auth_headers)
+    assert [result['id'] for result in response.json['jobs']] == [job.id]
+    assert response.json['resumes'] == []
+    
+    job.description = 'Keep Ansible playbooks tidy'
+    db.session.commit()
+    assert client.get('/api/search?q=terraform&type=jobs', headers=auth_headers).json['jobs'] == []
+    assert len(client.get('/api/search?q=ansible&type=jobs', headers=auth_headers).json['jobs']) == 1
+    
+    resume_id = add_resume('search@example.com', 'a.pdf', 'Ansible automation')
+    assert len(client.get('/api/search?q=ansible', headers=auth_headers).json['resumes']) == 1
+    client.delete(f'/api/resumes/{resume_id}', headers=auth_headers)
+    assert client.get('/api/search?q=ansible', headers=auth_headers).json['resumes'] == []
+    
+    assert client.get('/api/search?q=%22%22', headers=auth_headers).status_code == 400
+    assert client.get('/api/search?q=x&type=users', headers=auth_headers).status_code == 400